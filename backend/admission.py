@@ -0,0 +1,236 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database import SessionLocal
+from models import TenantQuota
+
+# WHY: weights reflect relative cost; a model call is an order of magnitude dearer than a rule check.
+DEFAULT_ENDPOINT_COSTS: Dict[str, float] = {
+    "/ai-insights": 10.0,
+    "/ai-insights/stream": 10.0,
+    "/ai-insights/batch": 25.0,
+    "/health/ai": 1.0,
+    "/upload": 5.0,
+    "/upload/batch": 10.0,
+    "/jobs/upload": 5.0,
+    "/jobs/portfolio-score": 5.0,
+    "/portfolio/score": 5.0,
+    "/forecast": 2.0,
+    "/forecast/runway": 5.0,
+    "/anomalies/detect": 3.0,
+    "/bookkeeping/categorize": 2.0,
+    "/bookkeeping/rollup": 2.0,
+    "/working-capital": 2.0,
+    "/gst/check": 1.0,
+}
+
+
+class AdmissionController:
+    # WHY: one runaway client must not exhaust model quota or CPU for every tenant. Each tenant
+    # (a registered API key, else the client IP) gets a token bucket; requests spend their
+    # endpoint's weight and are refused with a Retry-After once the bucket is empty. State is an
+    # LRU of [tokens, updated_at] refilled lazily on access, so admitting a request and evicting
+    # the least recently seen tenant are both O(1) under one lock. With persist=True buckets are
+    # loaded from SQLite on first sight and written back in batches by flush(), so quotas survive
+    # restarts without a database write per request.
+    def __init__(
+        self,
+        rate_per_second: float = 1.0,
+        burst: float = 60.0,
+        costs: Optional[Dict[str, float]] = None,
+        max_tenants: int = 100_000,
+        persist: bool = False,
+        session_factory=SessionLocal,
+        api_keys: Optional[Iterable[str]] = None,
+    ):
+        self._rate = max(float(rate_per_second), 1e-6)
+        self._burst = max(float(burst), 1.0)
+        self._costs = dict(DEFAULT_ENDPOINT_COSTS if costs is None else costs)
+        self._max_tenants = max(1, int(max_tenants))
+        self._persist = persist
+        self._session_factory = session_factory
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._api_keys = {_digest(key) for key in (api_keys or ()) if key}
+        self._dirty: set = set()
+        self._rejected: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def cost(self, path: str, refresh: bool = False) -> float:
+        # WHY: a cached /health/ai read is cheap, but ?refresh=true makes a live model call.
+        if path == "/health/ai" and refresh:
+            return self._costs.get("/ai-insights", self._costs.get(path, 0.0))
+        return self._costs.get(path, 0.0)
+
+    def tenant_for(self, api_key: Optional[str], client_host: Optional[str]) -> str:
+        """
+        Bucket key for a request: the API key when it is one the server issued, otherwise the
+        client IP. Unverified identities (unknown keys, a user_id parameter) are ignored, so
+        rotating them neither escapes the quota nor spends another tenant's bucket.
+        """
+        if api_key:
+            digest = _digest(api_key)
+            if digest in self._api_keys:
+                return "key:" + digest
+        return f"ip:{client_host or 'unknown'}"
+
+    def needs_load(self, tenant: str) -> bool:
+        return self._persist and tenant not in self._buckets
+
+    def load(self, tenant: str, now: Optional[float] = None) -> None:
+        """
+        Read the tenant's persisted bucket into memory (persist mode only). Blocking; async callers
+        run it in a threadpool before admit() so the SQLite read stays off the event loop.
+        """
+        if not self.needs_load(tenant):
+            return
+        loaded = self._load(tenant)
+        now = time.time() if now is None else now
+        with self._lock:
+            if tenant not in self._buckets:
+                self._insert(tenant, loaded or [self._burst, now])
+
+    def admit(self, tenant: str, cost: float, now: Optional[float] = None) -> Tuple[bool, float, float]:
+        """
+        Spend cost tokens from the tenant's bucket. Returns (allowed, retry_after_seconds,
+        tokens_remaining); retry_after is 0 when allowed.
+        """
+        if cost <= 0:
+            return True, 0.0, self._burst
+        # A request dearer than the whole bucket would never pass; cap it at a full bucket.
+        cost = min(float(cost), self._burst)
+        now = time.time() if now is None else now
+        self.load(tenant, now)
+        with self._lock:
+            bucket = self._buckets.get(tenant)
+            if bucket is None:
+                bucket = self._insert(tenant, [self._burst, now])
+            else:
+                self._buckets.move_to_end(tenant)
+            tokens = min(self._burst, bucket[0] + max(0.0, now - bucket[1]) * self._rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            bucket[0], bucket[1] = tokens, now
+            if self._persist:
+                self._dirty.add(tenant)
+            if not allowed:
+                self._rejected[tenant] = self._rejected.get(tenant, 0) + 1
+        retry_after = 0.0 if allowed else (cost - tokens) / self._rate
+        return allowed, retry_after, tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            rejected = sorted(self._rejected.items(), key=lambda item: -item[1])
+            return {
+                "tenants": len(self._buckets),
+                "rejected": sum(count for _, count in rejected),
+                "top_rejected": [{"tenant": tenant, "rejected": count} for tenant, count in rejected[:10]],
+            }
+
+    def flush(self) -> int:
+        """
+        Write changed buckets to SQLite (persist mode only). Returns the number written.
+        """
+        if not self._persist:
+            return 0
+        with self._lock:
+            dirty = {tenant: list(self._buckets[tenant]) for tenant in self._dirty if tenant in self._buckets}
+            self._dirty.clear()
+        if not dirty:
+            return 0
+        db = self._session_factory()
+        try:
+            for tenant, (tokens, updated_at) in dirty.items():
+                db.merge(TenantQuota(tenant=tenant, tokens=tokens, updated_at=updated_at))
+            db.commit()
+        finally:
+            db.close()
+        return len(dirty)
+
+    def start(self, interval_seconds: float = 5.0) -> None:
+        if not self._persist or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(float(interval_seconds),), name="admission-flush", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.flush()
+
+    def _run(self, interval_seconds: float) -> None:
+        while not self._stop.wait(interval_seconds):
+            try:
+                self.flush()
+            except Exception as exc:
+                # WHY: a failed flush only loses recent spend; keep admitting and retry next interval.
+                print("🔥 ADMISSION FLUSH ERROR:", str(exc))
+
+    def _load(self, tenant: str) -> Optional[List[float]]:
+        db = self._session_factory()
+        try:
+            row = db.get(TenantQuota, tenant)
+            return [float(row.tokens), float(row.updated_at)] if row is not None else None
+        finally:
+            db.close()
+
+    def _insert(self, tenant: str, bucket: List[float]) -> List[float]:
+        # Caller holds the lock. WHY: evict the least recently seen tenant in O(1); a dirty bucket
+        # evicted before a flush only forgets its recent spend, which errs toward admitting.
+        while len(self._buckets) >= self._max_tenants:
+            evicted, _ = self._buckets.popitem(last=False)
+            self._dirty.discard(evicted)
+            self._rejected.pop(evicted, None)
+        self._buckets[tenant] = bucket
+        return bucket
+
+
+def _digest(api_key: str) -> str:
+    # WHY: API keys are hashed so raw credentials never sit in memory dumps or the quota table.
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+def _parse_costs(value: str) -> Dict[str, float]:
+    costs = {}
+    for item in value.split(","):
+        path, _, cost = item.partition("=")
+        if path.strip() and cost.strip():
+            costs[path.strip()] = float(cost)
+    return costs
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def admission_enabled() -> bool:
+    return (os.getenv("ADMISSION_CONTROL") or "false").strip().lower() in {"1", "true", "yes"}
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            rate_per_second=float(os.getenv("ADMISSION_RATE_PER_SECOND") or 1.0),
+            burst=float(os.getenv("ADMISSION_BURST") or 60),
+            costs={**DEFAULT_ENDPOINT_COSTS, **_parse_costs(os.getenv("ADMISSION_COSTS") or "")},
+            max_tenants=int(os.getenv("ADMISSION_MAX_TENANTS") or 100_000),
+            persist=(os.getenv("ADMISSION_BACKEND") or "memory").strip().lower() == "sqlite",
+            api_keys=[key.strip() for key in (os.getenv("ADMISSION_API_KEYS") or "").split(",")],
+        )
+    return _controller
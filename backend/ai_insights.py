@@ -1,18 +1,41 @@
+import hashlib
+import json
 import os
-from typing import List, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
 
-try:
-    from google import genai
-except Exception:  # pragma: no cover - optional dependency in dev
-    genai = None
+from circuit_breaker import CircuitBreaker
+from instrumentation import get_recorder
+from integrations.llm_api import LLMProvider
+from integrations.registry import get_llm_provider
 
+# Tokens reserved for the "Conversation:" header and the closing instruction in the prompt.
+_PROMPT_OVERHEAD_TOKENS = 32
+# Expected output tokens per business in a batch answer, used to size batches.
+_BATCH_TOKENS_PER_ANSWER = 150
 
-# WHY: lazy-init the client so missing API keys don't break non-AI flows.
-def _get_gemini_client():
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key or not genai:
-        return None
-    return genai.Client(api_key=api_key)
+
+def _get_provider() -> Optional[LLMProvider]:
+    # WHY: resolve lazily so missing API keys don't break non-AI flows.
+    return get_llm_provider()
+
+
+_breaker: Optional[CircuitBreaker] = None
+
+
+def get_ai_circuit_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("AI_BREAKER_FAILURES") or 5),
+            window_seconds=float(os.getenv("AI_BREAKER_WINDOW_SECONDS") or 60),
+            reset_timeout_seconds=float(os.getenv("AI_BREAKER_RESET_SECONDS") or 30),
+            slow_call_ms=float(os.getenv("AI_SLOW_CALL_MS") or 8000),
+        )
+    return _breaker
 
 
 # WHY: allow minimal AI usage without breaking existing behavior (default = always).
@@ -34,22 +57,262 @@ def generate_insights(
     """
     Conversational AI for financial insights with safe local fallback.
     """
+    ai_mode = _resolve_ai_mode(ai_mode)
+    if ai_mode == "off":
+        # WHY: explicit off mode avoids any external API usage.
+        return _local_insights(metrics, language)
 
     # -----------------------------
-    # LANGUAGE INSTRUCTION
+    # AUTO MODE: ONLY CALL AI WHEN NEEDED
     # -----------------------------
-    if language == "hi":
-        lang_instr = "Respond ONLY in Hindi. Use simple language for Indian SME owners."
-    elif language == "ta":
-        lang_instr = "Respond ONLY in Tamil. Use simple Tamil for Indian SME owners."
-    else:
-        lang_instr = "Respond ONLY in English. Use simple language."
+    if ai_mode == "auto" and not _should_call_ai(metrics, conversation or []):
+        # WHY: avoid spend when the user hasn't asked for guidance.
+        return _local_insights(metrics, language)
 
-    ai_mode = _resolve_ai_mode(ai_mode)
-    if ai_mode == "off":
-        # WHY: explicit off mode avoids any external API usage.
+    provider = _get_provider()
+    if not provider:
+        # WHY: fallback if API key is missing or quota is exceeded.
+        return _local_insights(metrics, language)
+
+    breaker = get_ai_circuit_breaker()
+    if not breaker.allow_request():
+        # WHY: while the circuit is open, skip the doomed provider call and answer locally at once.
         return _local_insights(metrics, language)
 
+    # -----------------------------
+    # PROVIDER API CALL
+    # -----------------------------
+    started = time.perf_counter()
+    try:
+        text = provider.generate(
+            _build_prompt(metrics, conversation, language),
+            temperature=0.4,
+            max_output_tokens=700,
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
+        breaker.record_success(latency_ms)
+        get_recorder().record("ai_insights.provider", latency_ms)
+        return text
+    except Exception as exc:
+        # WHY: never crash the API due to external provider failures.
+        breaker.record_failure(repr(exc))
+        _debug_log(f"{provider.name} call failed:", exc)
+        return _local_insights(metrics, language)
+
+
+def stream_insights(
+    metrics: dict,
+    conversation: list,
+    language: str = "en",
+    ai_mode: Optional[str] = None,
+) -> Iterator[dict]:
+    """
+    Streaming variant of generate_insights. Yields {"event", "data"} dicts: "chunk" events with
+    model text as it arrives, a "fallback" event with local insights if the provider fails
+    mid-way, and a final "done" event with timing (ttft_ms, total_ms).
+    """
+    started = time.perf_counter()
+    ai_mode = _resolve_ai_mode(ai_mode)
+    provider = None
+    breaker = get_ai_circuit_breaker()
+    if ai_mode != "off" and not (ai_mode == "auto" and not _should_call_ai(metrics, conversation or [])):
+        provider = _get_provider()
+        if provider and not breaker.allow_request():
+            provider = None
+
+    if not provider:
+        # WHY: same fallback rules as generate_insights, delivered over the same stream.
+        text = _local_insights(metrics, language)
+        first_token_at = time.perf_counter()
+        yield {"event": "chunk", "data": {"text": text}}
+        yield {"event": "done", "data": _stream_timing("local", started, first_token_at)}
+        return
+
+    first_token_at = None
+    source = provider.name
+    try:
+        stream = provider.stream(
+            _build_prompt(metrics, conversation, language),
+            temperature=0.4,
+            max_output_tokens=700,
+        )
+        for text in stream:
+            if not text:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+                get_recorder().record("ai_insights.stream.ttft", (first_token_at - started) * 1000)
+            yield {"event": "chunk", "data": {"text": text}}
+        breaker.record_success((time.perf_counter() - started) * 1000)
+    except Exception as exc:
+        # WHY: a provider failure mid-stream still ends with usable guidance for the user.
+        breaker.record_failure(repr(exc))
+        _debug_log(f"{provider.name} stream failed:", exc)
+        source = "local"
+        yield {"event": "fallback", "data": {"text": _local_insights(metrics, language)}}
+
+    timing = _stream_timing(source, started, first_token_at)
+    get_recorder().record("ai_insights.stream.total", timing["total_ms"])
+    yield {"event": "done", "data": timing}
+
+
+def _stream_timing(source: str, started: float, first_token_at: Optional[float]) -> dict:
+    now = time.perf_counter()
+    return {
+        "source": source,
+        "ttft_ms": round(((first_token_at or now) - started) * 1000, 2),
+        "total_ms": round((now - started) * 1000, 2),
+    }
+
+
+def generate_batch_insights(
+    items: List[dict],
+    language: str = "en",
+    ai_mode: Optional[str] = None,
+) -> dict:
+    """
+    Short narratives for many businesses using few model calls. Each item is {"id", "metrics"};
+    items are packed into multi-business prompts under a token budget, answers are parsed back
+    per id, and any item the model misses falls back to _local_insights.
+    """
+    started = time.perf_counter()
+    entries = [
+        (str(item.get("id", index)), item.get("metrics") or {})
+        for index, item in enumerate(items or [])
+    ]
+    answers: dict = {}
+    prompt_tokens = 0
+    batches = _pack_batches(entries, language)
+
+    provider = _get_provider() if _resolve_ai_mode(ai_mode) != "off" else None
+    if provider and batches:
+        workers = max(1, min(int(os.getenv("AI_BATCH_CONCURRENCY") or 4), len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for batch_prompt, parsed in executor.map(lambda batch: _run_batch(provider, batch, language), batches):
+                prompt_tokens += estimate_tokens(batch_prompt)
+                answers.update(parsed)
+
+    results = []
+    fallbacks = 0
+    for item_id, metrics in entries:
+        text = answers.get(item_id)
+        if text:
+            results.append({"id": item_id, "insights": text, "source": provider.name})
+        else:
+            # WHY: one unparseable or missing answer must not fail the whole portfolio.
+            fallbacks += 1
+            results.append({"id": item_id, "insights": _local_insights(metrics, language), "source": "local"})
+
+    elapsed = time.perf_counter() - started
+    get_recorder().record("ai_insights.batch", elapsed * 1000)
+    return {
+        "results": results,
+        "stats": {
+            "items": len(entries),
+            "model_calls": len(batches) if provider else 0,
+            "fallbacks": fallbacks,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "items_per_second": round(len(entries) / elapsed, 2) if elapsed > 0 else None,
+            "prompt_tokens": prompt_tokens,
+            "prompt_tokens_per_item": round(prompt_tokens / len(entries), 2) if entries and provider else 0,
+        },
+    }
+
+
+def _batch_header(language: str) -> str:
+    return (
+        "You are an AI financial advisor for Indian SMEs.\n"
+        f"{_language_instruction(language)}\n"
+        "For EACH business below write a 2-3 sentence insight with one concrete action.\n"
+        'Reply with ONLY a JSON array like [{"id": "<id>", "insight": "<text>"}], one object per business.\n\n'
+        "Businesses:\n"
+    )
+
+
+def _batch_line(item_id: str, metrics: dict) -> str:
+    return (
+        f"[{item_id}] Revenue ₹{metrics.get('revenue')}; Expenses ₹{metrics.get('expenses')}; "
+        f"Profit Margin {metrics.get('profit_margin')}%; Cash Flow ₹{metrics.get('cash_flow')}; "
+        f"Creditworthiness {metrics.get('creditworthiness')}; Risks {metrics.get('risks')}"
+    )
+
+
+def _pack_batches(entries: List[Tuple[str, dict]], language: str) -> List[List[Tuple[str, str]]]:
+    # WHY: the shared instructions are sent once per batch instead of once per business; batches are
+    # bounded both by prompt size and by how many answers fit in the output token limit.
+    prompt_budget = int(os.getenv("AI_BATCH_PROMPT_TOKENS") or 6000)
+    max_items = max(1, _batch_output_tokens() // _BATCH_TOKENS_PER_ANSWER)
+    header_tokens = estimate_tokens(_batch_header(language))
+
+    batches: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    used = header_tokens
+    for item_id, metrics in entries:
+        line = _batch_line(item_id, metrics)
+        cost = estimate_tokens(line) + 1
+        if current and (used + cost > prompt_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], header_tokens
+        current.append((item_id, line))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _run_batch(provider: LLMProvider, batch: List[Tuple[str, str]], language: str) -> Tuple[str, dict]:
+    prompt = _batch_header(language) + "\n".join(line for _, line in batch)
+    breaker = get_ai_circuit_breaker()
+    if not breaker.allow_request():
+        return prompt, {}
+    started = time.perf_counter()
+    try:
+        text = provider.generate(prompt, temperature=0.4, max_output_tokens=_batch_output_tokens())
+        breaker.record_success((time.perf_counter() - started) * 1000)
+    except Exception as exc:
+        breaker.record_failure(repr(exc))
+        _debug_log(f"{provider.name} batch call failed:", exc)
+        return prompt, {}
+    expected = {item_id for item_id, _ in batch}
+    return prompt, {k: v for k, v in _parse_batch_answer(text).items() if k in expected}
+
+
+def _parse_batch_answer(text: str) -> dict:
+    # WHY: models often wrap JSON in code fences or add prose; extract the array and ignore the rest.
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        parsed = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    answers = {}
+    for entry in parsed if isinstance(parsed, list) else []:
+        if isinstance(entry, dict) and entry.get("id") is not None and isinstance(entry.get("insight"), str):
+            insight = entry["insight"].strip()
+            if insight:
+                answers[str(entry["id"])] = insight
+    return answers
+
+
+def _batch_output_tokens() -> int:
+    return int(os.getenv("AI_BATCH_OUTPUT_TOKENS") or 4000)
+
+
+def _language_instruction(language: str) -> str:
+    if language == "hi":
+        return "Respond ONLY in Hindi. Use simple language for Indian SME owners."
+    if language == "ta":
+        return "Respond ONLY in Tamil. Use simple Tamil for Indian SME owners."
+    return "Respond ONLY in English. Use simple language."
+
+
+def _build_prompt(metrics: dict, conversation: list, language: str) -> str:
+    # -----------------------------
+    # LANGUAGE INSTRUCTION
+    # -----------------------------
+    lang_instr = _language_instruction(language)
+
     # -----------------------------
     # SYSTEM PROMPT
     # -----------------------------
@@ -70,45 +333,167 @@ Financial Summary:
     # -----------------------------
     # BUILD CONVERSATION FOR GEMINI
     # -----------------------------
-    conversation_lines = []
-    for msg in conversation or []:
-        role = "User" if msg.get("role") == "user" else "Assistant"
-        conversation_lines.append(f"{role}: {msg.get('text', '')}")
-    conversation_text = "\n".join(conversation_lines)
+    # WHY: cap prompt size so latency and token cost stay flat as a chat grows.
+    conversation_text = build_conversation_context(
+        conversation or [],
+        budget_tokens=_max_prompt_tokens() - estimate_tokens(system_prompt) - _PROMPT_OVERHEAD_TOKENS,
+    )
+    return (
+        f"{system_prompt}\n\n"
+        "Conversation:\n"
+        f"{conversation_text}\n\n"
+        "Please respond clearly with actionable guidance."
+    )
 
-    # -----------------------------
-    # AUTO MODE: ONLY CALL AI WHEN NEEDED
-    # -----------------------------
-    if ai_mode == "auto" and not _should_call_ai(metrics, conversation or []):
-        # WHY: avoid spend when the user hasn't asked for guidance.
-        return _local_insights(metrics, language)
 
-    client = _get_gemini_client()
-    if not client:
-        # WHY: fallback if API key is missing or quota is exceeded.
-        return _local_insights(metrics, language)
+def _debug_log(message: str, exc: Exception) -> None:
+    if (os.getenv("AI_DEBUG_LOG") or "").strip().lower() in {"1", "true", "yes"}:
+        print(f"AI_DEBUG_LOG: {message}", repr(exc))
 
-    # -----------------------------
-    # GEMINI API CALL
-    # -----------------------------
-    try:
-        model_name = os.getenv("GEMINI_MODEL") or "gemini-2.5-flash"
-        response = client.models.generate_content(
-            model=model_name,
-            contents=(
-                f"{system_prompt}\n\n"
-                "Conversation:\n"
-                f"{conversation_text}\n\n"
-                "Please respond clearly with actionable guidance."
-            ),
-            config={"temperature": 0.4, "max_output_tokens": 700},
-        )
-        return (response.text or "").strip()
-    except Exception as exc:
-        # WHY: never crash the API due to external provider failures.
-        if (os.getenv("AI_DEBUG_LOG") or "").strip().lower() in {"1", "true", "yes"}:
-            print("AI_DEBUG_LOG: Gemini call failed:", repr(exc))
-        return _local_insights(metrics, language)
+
+def estimate_tokens(text: str) -> int:
+    # WHY: cheap provider-independent estimate (~4 characters per token) for budgeting prompts.
+    return (len(text or "") + 3) // 4
+
+
+def _max_prompt_tokens() -> int:
+    return int(os.getenv("AI_MAX_PROMPT_TOKENS") or 3000)
+
+
+def _recent_turns() -> int:
+    return int(os.getenv("AI_RECENT_TURNS") or 6)
+
+
+def _summary_tokens() -> int:
+    return int(os.getenv("AI_SUMMARY_TOKENS") or 400)
+
+
+def build_conversation_context(
+    conversation: List[dict],
+    budget_tokens: int,
+    recent_turns: Optional[int] = None,
+) -> str:
+    """
+    Keep the most recent turns verbatim and fold older turns into a cached running summary,
+    so the conversation part of the prompt never exceeds budget_tokens.
+    """
+    lines = [_format_turn(msg) for msg in conversation]
+    keep = _recent_turns() if recent_turns is None else recent_turns
+    budget_tokens = max(budget_tokens, 1)
+
+    # WHY: recent turns get the budget first; older ones are summarized instead of resent.
+    split = max(len(lines) - keep, 0)
+    recent = lines[split:]
+    while len(recent) > 1 and _lines_tokens(recent) > budget_tokens:
+        recent = recent[1:]
+        split += 1
+    remaining = budget_tokens - _lines_tokens(recent)
+
+    summary = _running_summary(lines[:split])
+    summary_text = ""
+    if summary:
+        summary_text = "Summary of earlier conversation:\n" + "\n".join(f"- {item}" for item in summary)
+        summary_text = _truncate_to_tokens(summary_text, max(remaining - 1, 0))
+        remaining -= _lines_tokens([summary_text]) if summary_text else 0
+
+    if remaining < 0 and recent:
+        # WHY: a single oversized message is truncated rather than breaking the prompt budget.
+        last_budget = estimate_tokens(recent[-1]) + remaining
+        recent[-1] = _truncate_to_tokens(recent[-1], max(last_budget, 0))
+
+    return "\n".join(part for part in [summary_text, *recent] if part)
+
+
+def _lines_tokens(lines: List[str]) -> int:
+    # One extra token per line covers the newline separator.
+    return sum(estimate_tokens(line) + 1 for line in lines)
+
+
+def _format_turn(msg: dict) -> str:
+    role = "User" if msg.get("role") == "user" else "Assistant"
+    return f"{role}: {msg.get('text', '')}"
+
+
+# WHY: chat clients resend the whole history each turn; caching the summary per history prefix
+# means each older turn is summarized once and later turns only fold in what is new. The cache is
+# shared by threadpool requests (including streaming generators), so every access holds the lock.
+_SUMMARY_CACHE: "OrderedDict[bytes, Tuple[str, ...]]" = OrderedDict()
+_SUMMARY_CACHE_MAX = 1024
+_SUMMARY_LOCK = threading.Lock()
+# A chat turn moves the summarized prefix by a line or two, so only the last few prefixes are keyed.
+_SUMMARY_WINDOW = 32
+
+
+def _running_summary(lines: List[str]) -> Tuple[str, ...]:
+    if not lines:
+        return ()
+    keys = _prefix_keys(lines, len(lines) - _SUMMARY_WINDOW)
+
+    # Reuse the longest cached prefix in the window, then fold in the remaining turns one by one.
+    start, summary = 0, ()
+    with _SUMMARY_LOCK:
+        for index in range(len(keys) - 1, -1, -1):
+            if keys[index] is None:
+                break
+            cached = _SUMMARY_CACHE.get(keys[index])
+            if cached is not None:
+                start, summary = index + 1, cached
+                _SUMMARY_CACHE.move_to_end(keys[index])
+                break
+
+    folded = []
+    for index in range(start, len(lines)):
+        summary = _fold_turn(summary, lines[index])
+        if keys[index] is not None:
+            folded.append((keys[index], summary))
+    with _SUMMARY_LOCK:
+        for key, value in folded:
+            _SUMMARY_CACHE[key] = value
+            _SUMMARY_CACHE.move_to_end(key)
+        while len(_SUMMARY_CACHE) > _SUMMARY_CACHE_MAX:
+            _SUMMARY_CACHE.popitem(last=False)
+    return summary
+
+
+def _prefix_keys(lines: List[str], first_keyed: int) -> List[Optional[bytes]]:
+    # Chained digest of every prefix from first_keyed on (None before it). WHY: the unkeyed head is
+    # hashed in one C-level update instead of a digest copy per line, so per-turn hashing no longer
+    # grows with per-prefix work; the bytes match line-by-line updates, so keys stay stable.
+    first = max(first_keyed, 0)
+    digest = hashlib.sha1()
+    if first:
+        digest.update(("\x00".join(lines[:first]) + "\x00").encode("utf-8"))
+    keys: List[Optional[bytes]] = [None] * first
+    for line in lines[first:]:
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\x00")
+        keys.append(digest.copy().digest())
+    return keys
+
+
+def _fold_turn(summary: Tuple[str, ...], line: str) -> Tuple[str, ...]:
+    role, _, text = line.partition(": ")
+    text = " ".join(text.split())
+    if not text:
+        return summary
+    # WHY: keep the gist (first sentence) of each turn; user questions matter more than replies.
+    first_sentence = text.split(". ")[0]
+    limit = 160 if role == "User" else 80
+    if len(first_sentence) > limit:
+        first_sentence = first_sentence[: limit - 3].rstrip() + "..."
+    items = summary + (f"{'User asked' if role == 'User' else 'Assistant said'}: {first_sentence}",)
+    while len(items) > 1 and sum(estimate_tokens(item) for item in items) > _summary_tokens():
+        items = items[1:]
+    return items
+
+
+def _truncate_to_tokens(text: str, tokens: int) -> str:
+    max_chars = tokens * 4
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 3:
+        return ""
+    return text[: max_chars - 3].rstrip() + "..."
 
 
 def _should_call_ai(metrics: dict, messages: List[dict]) -> bool:
@@ -167,21 +552,97 @@ def _local_insights(metrics: dict, language: str) -> str:
     )
 
 
-def check_ai_health() -> dict:
-    # WHY: lightweight health check to confirm Gemini connectivity and configuration.
-    client = _get_gemini_client()
-    if not client:
-        return {"status": "fallback", "reason": "Gemini client not configured"}
-    try:
-        model_name = os.getenv("GEMINI_MODEL") or "gemini-2.5-flash"
-        response = client.models.generate_content(
-            model=model_name,
-            contents="Return only the word OK.",
-            config={"temperature": 0.0, "max_output_tokens": 5},
+def check_ai_health(refresh: bool = False) -> dict:
+    # WHY: lightweight health check to confirm AI provider connectivity and configuration.
+    # Serves the background prober's cached result; refresh=True forces a live probe.
+    prober = get_ai_health_prober()
+    result = prober.refresh() if refresh else prober.current()
+    result["circuit"] = get_ai_circuit_breaker().snapshot()
+    return result
+
+
+class AIHealthProber:
+    # WHY: uptime probes hit /health/ai constantly; a paid model call per hit is slow and costly,
+    # so a background thread refreshes the status on an interval and requests read the cache.
+    def __init__(self, probe: Callable[[], dict], interval_seconds: float = 60.0):
+        self._probe = probe
+        self._interval_seconds = float(interval_seconds)
+        self._lock = threading.Lock()
+        self._cached: Optional[dict] = None
+        self._checked_at: Optional[float] = None
+        self._latency_ms: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> dict:
+        started = time.perf_counter()
+        result = self._probe()
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._cached = dict(result)
+            self._checked_at = time.time()
+            self._latency_ms = latency_ms
+        get_recorder().record("ai_health.probe", latency_ms)
+        return self.current()
+
+    def current(self) -> dict:
+        with self._lock:
+            if self._cached is None:
+                return {
+                    "status": "unknown",
+                    "reason": "No health probe has completed yet. Use ?refresh=true to probe now.",
+                    "checked_at": None,
+                    "age_seconds": None,
+                    "last_latency_ms": None,
+                }
+            return {
+                **self._cached,
+                "checked_at": self._checked_at,
+                "age_seconds": round(time.time() - self._checked_at, 3),
+                "last_latency_ms": round(self._latency_ms, 2),
+            }
+
+    def start(self) -> None:
+        if self._interval_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ai-health-prober", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as exc:
+                # WHY: keep probing even if a single probe raises unexpectedly.
+                _debug_log("AI health probe failed:", exc)
+            self._stop.wait(self._interval_seconds)
+
+
+_prober: Optional[AIHealthProber] = None
+
+
+def get_ai_health_prober() -> AIHealthProber:
+    global _prober
+    if _prober is None:
+        _prober = AIHealthProber(
+            probe=_probe_ai_health,
+            interval_seconds=float(os.getenv("AI_HEALTH_INTERVAL_SECONDS") or 60),
         )
-        text = (response.text or "").strip()
-        if text.lower().startswith("ok"):
-            return {"status": "ok"}
-        return {"status": "fallback", "reason": f"Unexpected response: {text}"}
+    return _prober
+
+
+def _probe_ai_health() -> dict:
+    provider = _get_provider()
+    if not provider:
+        return {"status": "fallback", "reason": "AI provider not configured"}
+    try:
+        return {**provider.ping(), "provider": provider.name}
     except Exception as exc:
-        return {"status": "fallback", "reason": repr(exc)}
+        return {"status": "fallback", "provider": provider.name, "reason": repr(exc)}
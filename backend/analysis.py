@@ -1,6 +1,11 @@
+import hashlib
+
+import numpy as np
 import pandas as pd
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from instrumentation import memory_stage
 
 
 DEFAULT_ANALYSIS_CONFIG: Dict[str, float] = {
@@ -33,22 +38,132 @@ _DEBIT_COLUMNS = ["debit", "dr", "withdrawal", "outflow", "cash_out", "money_out
 _INFLOW_COLUMNS = ["cash_in", "inflow", "money_in", "receipts"]
 _OUTFLOW_COLUMNS = ["cash_out", "outflow", "money_out", "payments"]
 
+_DATE_COLUMNS = [
+    "date",
+    "txn_date",
+    "transaction_date",
+    "value_date",
+    "posting_date",
+    "posted_date",
+    "booking_date",
+]
+_PERIOD_FREQUENCIES = {"month": "M", "quarter": "Q"}
+# WHY: one mistyped year (e.g. 1900) must not reindex into centuries of empty periods; dated rows
+# further than this from the median period are reported as out of range instead.
+_MAX_PERIODS_FROM_MEDIAN = {"month": 120, "quarter": 40}
+_NUMERIC_DATE = r"^\s*(\d{1,2})[/.\-](\d{1,2})[/.\-]\d{2,4}"
+
+# WHY: shared by the scalar analysis and the vectorized portfolio path so labels never drift.
+_RISK_LABELS = {
+    "risk_low_margin": "Low profit margin",
+    "risk_negative_cash_flow": "Negative cash flow",
+    "risk_high_expenses": "High operating expenses",
+}
+_NO_RISK_LABEL = "No major financial risks detected"
+
+_PRODUCTS = {
+    "invoice_financing": {
+        "product": "Invoice Financing",
+        "provider": "NBFC",
+        "reason": "Helps manage short-term cash flow gaps caused by delayed receivables.",
+    },
+    "working_capital_loan": {
+        "product": "Working Capital Loan",
+        "provider": "Bank",
+        "reason": "Supports daily operational expenses and stabilizes business cash flow.",
+    },
+    "business_overdraft": {
+        "product": "Business Overdraft",
+        "provider": "Bank",
+        "reason": "Provides flexible credit access for short-term liquidity needs.",
+    },
+    "savings_deposit": {
+        "product": "Savings / Term Deposit",
+        "provider": "Bank",
+        "reason": "Suitable for financially stable businesses with surplus cash.",
+    },
+}
+_PRODUCT_COLUMNS = {
+    "rec_invoice_financing": "invoice_financing",
+    "rec_working_capital_loan": "working_capital_loan",
+    "rec_business_overdraft": "business_overdraft",
+    "rec_savings_deposit": "savings_deposit",
+}
+
+# WHY: the roles each source format reads, so a stored column mapping can stand in for detection.
+MAPPING_ROLES = ("amount", "type", "credit", "debit", "inflow", "outflow", "description", "date")
+_FORMAT_ROLES = {
+    "amount+type": ("amount", "type"),
+    "credit+debit": ("credit", "debit"),
+    "cash_in+cash_out": ("inflow", "outflow"),
+    "signed_amount": ("amount",),
+}
+
+# WHY: only rows that read like own-account movements are eligible for transfer matching, so a sale
+# and an unrelated same-day payment of the same amount are never netted away.
+_TRANSFER_PATTERN = r"\b(?:transfer|trf|xfer|self|own a/?c|sweep|inter[- ]?account)\b"
+_STATEMENT_COLUMNS = ["date", "description", "cash_in", "cash_out", "source_file"]
+
 _CREDIT_ALIASES = {"credit", "cr", "income", "inflow", "receipt", "receipts"}
 _DEBIT_ALIASES = {"debit", "dr", "expense", "outflow", "payment", "payments"}
 
 
-def analyze_financials(df: pd.DataFrame, config: Optional[Dict[str, float]] = None) -> dict:
+def analyze_financials(
+    df: pd.DataFrame,
+    config: Optional[Dict[str, float]] = None,
+    include_transactions: bool = True,
+    period: Optional[str] = None,
+    rolling_window: Optional[int] = None,
+) -> dict:
     """
     Takes a pandas DataFrame from uploaded CSV and returns financial analysis results.
+    Pass period="month" or "quarter" to also get per-period metrics (and optional rolling windows).
+    """
+    result, _ = analyze_financials_with_frame(
+        df, config, include_transactions, period=period, rolling_window=rolling_window
+    )
+    return result
+
+
+def analyze_financials_with_frame(
+    df: pd.DataFrame,
+    config: Optional[Dict[str, float]] = None,
+    include_transactions: bool = True,
+    period: Optional[str] = None,
+    rolling_window: Optional[int] = None,
+) -> Tuple[dict, Optional[pd.DataFrame]]:
+    """
+    Same as analyze_financials, but also returns the compact normalized transaction frame
+    (description, cash_in, cash_out) so callers can page through rows later.
+    """
+    return analyze_normalized_with_frame(
+        _normalize_cash_flows(df), config, include_transactions, period=period, rolling_window=rolling_window
+    )
+
+
+def analyze_normalized_with_frame(
+    normalized: dict,
+    config: Optional[Dict[str, float]] = None,
+    include_transactions: bool = True,
+    period: Optional[str] = None,
+    rolling_window: Optional[int] = None,
+) -> Tuple[dict, Optional[pd.DataFrame]]:
+    """
+    Analysis over an already-normalized result (from _normalize_cash_flows or merge_statements),
+    so consolidated multi-file uploads reuse the single-file metrics unchanged.
     """
-    normalized = _normalize_cash_flows(df)
     if normalized["status"] != "ok":
         # WHY: return friendly, structured messages so API callers (Swagger) can act without stack traces.
-        return normalized
+        return normalized, None
 
-    df = normalized["data"]
+    normalized_df = normalized["data"]
+    df = compact_transaction_frame(normalized_df)
     source_format = normalized.get("source_format")
-    transactions = _build_transaction_rows(df)
+    # WHY: summary-only callers skip building one dict per row, which dominates memory on large files.
+    transactions = None
+    if include_transactions:
+        with memory_stage("rows"):
+            transactions = _build_transaction_rows(df)
     cfg = {**DEFAULT_ANALYSIS_CONFIG, **(config or {})}
 
     # ---------------------------------------------
@@ -94,16 +209,16 @@ def analyze_financials(df: pd.DataFrame, config: Optional[Dict[str, float]] = No
     risks = []
 
     if profit_margin < cfg["profit_margin_low_risk"]:
-        risks.append("Low profit margin")
+        risks.append(_RISK_LABELS["risk_low_margin"])
 
     if cash_flow < 0:
-        risks.append("Negative cash flow")
+        risks.append(_RISK_LABELS["risk_negative_cash_flow"])
 
     if total_expenses > total_revenue * cfg["expense_ratio_risk"]:
-        risks.append("High operating expenses")
+        risks.append(_RISK_LABELS["risk_high_expenses"])
 
     if not risks:
-        risks.append("No major financial risks detected")
+        risks.append(_NO_RISK_LABEL)
 
     # ---------------------------------------------
     # 7. PRODUCT RECOMMENDATIONS
@@ -115,7 +230,7 @@ def analyze_financials(df: pd.DataFrame, config: Optional[Dict[str, float]] = No
     # ---------------------------------------------
     # 8. FINAL RESPONSE (JSON SAFE)
     # ---------------------------------------------
-    return {
+    result = {
         "source_format": source_format,
         "revenue": round(total_revenue, 2),
         "expenses": round(total_expenses, 2),
@@ -124,8 +239,6 @@ def analyze_financials(df: pd.DataFrame, config: Optional[Dict[str, float]] = No
         "health_score": health_score,
         "creditworthiness": creditworthiness,
         "risks": [str(r) for r in risks],
-        # WHY: include raw transaction rows for downstream features without breaking summary metrics.
-        "transactions": transactions,
         "recommended_products": [
             {
                 "product": str(p["product"]),
@@ -135,6 +248,117 @@ def analyze_financials(df: pd.DataFrame, config: Optional[Dict[str, float]] = No
             for p in recommended_products
         ],
     }
+    if period:
+        result["period_metrics"] = period_metrics(normalized_df, period, cfg, rolling_window)
+    if transactions is not None:
+        # WHY: include raw transaction rows for downstream features without breaking summary metrics.
+        result["transactions"] = transactions
+    else:
+        result["transaction_count"] = int(len(df))
+    return result, df
+
+
+def period_metrics(
+    df: pd.DataFrame,
+    period: str = "month",
+    config: Optional[Dict[str, float]] = None,
+    rolling_window: Optional[int] = None,
+) -> dict:
+    """
+    Per-month or per-quarter metrics from a normalized frame (cash_in/cash_out plus a date column).
+    """
+    if period not in _PERIOD_FREQUENCIES:
+        return {"status": "error", "message": f"Unsupported period '{period}'. Use month or quarter."}
+    cfg = {**DEFAULT_ANALYSIS_CONFIG, **(config or {})}
+    date_col = _pick_column(df.columns, _DATE_COLUMNS)
+    if not date_col:
+        return {
+            "status": "unavailable",
+            "message": "No date column detected, so per-period metrics cannot be computed.",
+            "expected_columns": _DATE_COLUMNS,
+        }
+
+    # WHY: parse dates once and aggregate all periods in a single groupby so cost stays linear in rows.
+    dates = _parse_dates(df[date_col])
+    dated = dates.notna()
+    keys = dates[dated].dt.to_period(_PERIOD_FREQUENCIES[period])
+    ordinals = keys.array.asi8
+    in_range = np.ones(len(keys), dtype=bool)
+    if len(ordinals):
+        in_range = np.abs(ordinals - np.median(ordinals)) <= _MAX_PERIODS_FROM_MEDIAN[period]
+    grouped = (
+        df.loc[dated, ["cash_in", "cash_out"]][in_range]
+        .groupby(keys[in_range].rename("period"), sort=True)
+        .agg(revenue=("cash_in", "sum"), expenses=("cash_out", "sum"), transaction_count=("cash_in", "size"))
+    )
+    if not grouped.empty:
+        # WHY: fill empty periods so rolling windows span calendar periods, not just active ones.
+        full_range = pd.period_range(grouped.index.min(), grouped.index.max(), freq=grouped.index.freq)
+        grouped = grouped.reindex(full_range, fill_value=0)
+
+    revenue = grouped["revenue"].to_numpy(dtype=float)
+    expenses = grouped["expenses"].to_numpy(dtype=float)
+    items = _period_items(grouped.index, revenue, expenses, cfg)
+    for item, count in zip(items, grouped["transaction_count"].tolist()):
+        item["transaction_count"] = int(count)
+
+    if rolling_window and rolling_window > 1:
+        rolled = grouped[["revenue", "expenses"]].rolling(rolling_window, min_periods=1).sum()
+        rolling_items = _period_items(
+            grouped.index,
+            rolled["revenue"].to_numpy(dtype=float),
+            rolled["expenses"].to_numpy(dtype=float),
+            cfg,
+        )
+        for item, rolling in zip(items, rolling_items):
+            rolling.pop("period")
+            item["rolling"] = rolling
+
+    return {
+        "status": "ok",
+        "granularity": period,
+        "date_column": date_col,
+        "rolling_window": rolling_window if rolling_window and rolling_window > 1 else None,
+        "undated_rows": int((~dated).sum()),
+        "out_of_range_rows": int((~in_range).sum()),
+        "periods": items,
+    }
+
+
+def _period_items(index: pd.Index, revenue, expenses, cfg: Dict[str, float]) -> List[dict]:
+    profit_margin, cash_flow, health_scores = _score_arrays(revenue, expenses, cfg)
+    return [
+        {
+            "period": str(label),
+            "revenue": round(float(rev), 2),
+            "expenses": round(float(exp), 2),
+            "profit_margin": round(float(margin), 2),
+            "cash_flow": round(float(flow), 2),
+            "health_score": int(score),
+            "creditworthiness": evaluate_creditworthiness(int(score)),
+        }
+        for label, rev, exp, margin, flow, score in zip(
+            index, revenue, expenses, profit_margin, cash_flow, health_scores
+        )
+    ]
+
+
+def _score_arrays(revenue: np.ndarray, expenses: np.ndarray, cfg: Dict[str, float]):
+    # WHY: array form of the health score in analyze_financials so many periods score in one pass.
+    cash_flow = revenue - expenses
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_margin = np.where(revenue > 0, cash_flow / revenue * 100, 0.0)
+    health_scores = (
+        np.where(
+            profit_margin > cfg["profit_margin_high"],
+            40,
+            np.where(profit_margin > cfg["profit_margin_medium"], 25, 10),
+        )
+        + np.where(cash_flow > 0, 40, 15)
+        + np.where(revenue > 0, 20, 0)
+    )
+    health_scores = np.minimum(health_scores, int(cfg["health_score_max"]))
+    return profit_margin, cash_flow, health_scores
 
 
 def evaluate_creditworthiness(score: int) -> str:
@@ -150,37 +374,171 @@ def recommend_financial_products(cash_flow, profit_margin, creditworthiness):
     products = []
 
     if cash_flow < 0:
-        products.append({
-            "product": "Invoice Financing",
-            "provider": "NBFC",
-            "reason": "Helps manage short-term cash flow gaps caused by delayed receivables."
-        })
+        products.append(dict(_PRODUCTS["invoice_financing"]))
 
     if profit_margin < 10:
-        products.append({
-            "product": "Working Capital Loan",
-            "provider": "Bank",
-            "reason": "Supports daily operational expenses and stabilizes business cash flow."
-        })
+        products.append(dict(_PRODUCTS["working_capital_loan"]))
 
     if creditworthiness == "High":
-        products.append({
-            "product": "Business Overdraft",
-            "provider": "Bank",
-            "reason": "Provides flexible credit access for short-term liquidity needs."
-        })
+        products.append(dict(_PRODUCTS["business_overdraft"]))
 
     if not products:
-        products.append({
-            "product": "Savings / Term Deposit",
-            "provider": "Bank",
-            "reason": "Suitable for financially stable businesses with surplus cash."
-        })
+        products.append(dict(_PRODUCTS["savings_deposit"]))
 
     return products
 
 
-def _normalize_cash_flows(df: pd.DataFrame) -> dict:
+def score_portfolio(metrics, config: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Array-based health score, creditworthiness, risk flags and product recommendations for many
+    businesses at once. Takes a DataFrame (or dict of columns) with revenue and expenses per business
+    and matches analyze_financials / evaluate_creditworthiness / recommend_financial_products exactly.
+    """
+    frame = pd.DataFrame(metrics)
+    if "revenue" not in frame.columns or "expenses" not in frame.columns:
+        raise ValueError("Portfolio metrics must contain 'revenue' and 'expenses' columns")
+    cfg = {**DEFAULT_ANALYSIS_CONFIG, **(config or {})}
+
+    revenue = pd.to_numeric(frame["revenue"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    expenses = pd.to_numeric(frame["expenses"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    profit_margin, cash_flow, health_scores = _score_arrays(revenue, expenses, cfg)
+    creditworthiness = np.select(
+        [health_scores >= 75, health_scores >= 50], ["High", "Medium"], default="Low"
+    )
+
+    risk_low_margin = profit_margin < cfg["profit_margin_low_risk"]
+    risk_negative_cash_flow = cash_flow < 0
+    risk_high_expenses = expenses > revenue * cfg["expense_ratio_risk"]
+
+    rec_invoice_financing = cash_flow < 0
+    rec_working_capital_loan = profit_margin < 10
+    rec_business_overdraft = creditworthiness == "High"
+    rec_savings_deposit = ~(rec_invoice_financing | rec_working_capital_loan | rec_business_overdraft)
+
+    scored = pd.DataFrame(
+        {
+            "revenue": revenue,
+            "expenses": expenses,
+            "profit_margin": profit_margin,
+            "cash_flow": cash_flow,
+            "health_score": health_scores.astype(int),
+            "creditworthiness": creditworthiness,
+            "risk_low_margin": risk_low_margin,
+            "risk_negative_cash_flow": risk_negative_cash_flow,
+            "risk_high_expenses": risk_high_expenses,
+            "rec_invoice_financing": rec_invoice_financing,
+            "rec_working_capital_loan": rec_working_capital_loan,
+            "rec_business_overdraft": rec_business_overdraft,
+            "rec_savings_deposit": rec_savings_deposit,
+        },
+        index=frame.index,
+    )
+    if "business_id" in frame.columns:
+        scored.insert(0, "business_id", frame["business_id"])
+    return scored
+
+
+def portfolio_records(scored: pd.DataFrame) -> List[dict]:
+    """
+    Convert score_portfolio output into the same JSON shape analyze_financials uses per business.
+    Records with the same flags share one risk list and one product list; treat them as read-only.
+    """
+    risk_columns = [column for column in _RISK_LABELS if column in scored.columns]
+    product_columns = [column for column in _PRODUCT_COLUMNS if column in scored.columns]
+    # WHY: only 2**k flag combinations exist (8 risk, 16 product), so their lists are built once
+    # and each business just indexes them by its flag bits instead of assembling lists per row.
+    risk_lists = [
+        [_RISK_LABELS[column] for bit, column in enumerate(risk_columns) if code >> bit & 1] or [_NO_RISK_LABEL]
+        for code in range(2 ** len(risk_columns))
+    ]
+    product_lists = [
+        [dict(_PRODUCTS[_PRODUCT_COLUMNS[column]]) for bit, column in enumerate(product_columns) if code >> bit & 1]
+        for code in range(2 ** len(product_columns))
+    ]
+    columns = [
+        _round_cents(scored["revenue"]),
+        _round_cents(scored["expenses"]),
+        _round_cents(scored["profit_margin"]),
+        _round_cents(scored["cash_flow"]),
+        scored["health_score"].astype(int).tolist(),
+        scored["creditworthiness"].astype(str).tolist(),
+        [risk_lists[code] for code in _flag_codes(scored, risk_columns).tolist()],
+        [product_lists[code] for code in _flag_codes(scored, product_columns).tolist()],
+    ]
+    if "business_id" not in scored.columns:
+        return [
+            {
+                "revenue": revenue,
+                "expenses": expenses,
+                "profit_margin": margin,
+                "cash_flow": flow,
+                "health_score": score,
+                "creditworthiness": tier,
+                "risks": risks,
+                "recommended_products": products,
+            }
+            for revenue, expenses, margin, flow, score, tier, risks, products in zip(*columns)
+        ]
+    # WHY: a second literal rather than prepending business_id to each record avoids a dict copy per row.
+    records = [
+        {
+            "business_id": business_id,
+            "revenue": revenue,
+            "expenses": expenses,
+            "profit_margin": margin,
+            "cash_flow": flow,
+            "health_score": score,
+            "creditworthiness": tier,
+            "risks": risks,
+            "recommended_products": products,
+        }
+        for business_id, revenue, expenses, margin, flow, score, tier, risks, products in zip(
+            scored["business_id"].tolist(), *columns
+        )
+    ]
+    return records
+
+
+def _round_cents(values: pd.Series) -> List[float]:
+    # WHY: same result as round(value, 2) per element at array speed. np.round scales by 100, so it
+    # can only disagree when the scaled value sits within a few ulps of a .5 boundary (or is too
+    # large to hold cents); those rare rows fall back to Python's correctly rounded round().
+    array = values.to_numpy(dtype=float)
+    scaled = array * 100
+    rounded = (np.round(scaled) / 100).tolist()
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) <= np.abs(scaled) * 1e-12 + 1e-9
+    for index in np.flatnonzero(near_half | ~np.isfinite(scaled)).tolist():
+        rounded[index] = round(float(array[index]), 2)
+    return rounded
+
+
+def _flag_codes(scored: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    codes = np.zeros(len(scored), dtype=np.int64)
+    for bit, column in enumerate(columns):
+        codes |= scored[column].to_numpy(dtype=bool).astype(np.int64) << bit
+    return codes
+
+
+def normalize_header(name) -> str:
+    return str(name).strip().lower().replace(" ", "_")
+
+
+def header_signature(columns) -> str:
+    # WHY: uploads with the same (normalized, ordered) header share one stored column mapping.
+    joined = "\x1f".join(normalize_header(column) for column in columns)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()[:32]
+
+
+def normalize_cash_flows(df: pd.DataFrame, mapping: Optional[dict] = None) -> dict:
+    """
+    Normalize an uploaded frame to cash_in/cash_out. With a stored mapping ({"source_format",
+    "columns": {role: header}}) the candidate-column scans are skipped and the mapped columns are
+    used directly; the ok result reports the resolved {role: column} under "columns".
+    """
+    return _normalize_cash_flows(df, mapping)
+
+
+def _normalize_cash_flows(df: pd.DataFrame, mapping: Optional[dict] = None) -> dict:
     # WHY: keep CSV format flexibility inside a single normalization layer.
     if df is None or not isinstance(df, pd.DataFrame) or df.empty:
         return _clarification(
@@ -199,12 +557,40 @@ def _normalize_cash_flows(df: pd.DataFrame) -> dict:
         .str.replace(" ", "_")
     )
 
-    amount_col = _pick_column(working_df.columns, _AMOUNT_COLUMNS)
-    type_col = _pick_column(working_df.columns, _TYPE_COLUMNS)
-    credit_col = _pick_column(working_df.columns, _CREDIT_COLUMNS)
-    debit_col = _pick_column(working_df.columns, _DEBIT_COLUMNS)
-    inflow_col = _pick_column(working_df.columns, _INFLOW_COLUMNS)
-    outflow_col = _pick_column(working_df.columns, _OUTFLOW_COLUMNS)
+    if mapping:
+        roles = {
+            role: normalize_header(column)
+            for role, column in (mapping.get("columns") or {}).items()
+            if role in MAPPING_ROLES and column
+        }
+        if any(column not in working_df.columns for column in roles.values()):
+            return _clarification(
+                "The saved column mapping does not match this file's columns.",
+                clarifications=["Confirm the column mapping again for this file layout."],
+                sample_columns=list(working_df.columns),
+            )
+        # WHY: mapped description/date columns are exposed under the canonical names downstream uses.
+        for role in ("description", "date"):
+            if roles.get(role) and roles[role] != role:
+                working_df[role] = working_df[roles[role]]
+    else:
+        roles = {
+            "amount": _pick_column(working_df.columns, _AMOUNT_COLUMNS),
+            "type": _pick_column(working_df.columns, _TYPE_COLUMNS),
+            "credit": _pick_column(working_df.columns, _CREDIT_COLUMNS),
+            "debit": _pick_column(working_df.columns, _DEBIT_COLUMNS),
+            "inflow": _pick_column(working_df.columns, _INFLOW_COLUMNS),
+            "outflow": _pick_column(working_df.columns, _OUTFLOW_COLUMNS),
+            "description": "description" if "description" in working_df.columns else None,
+            "date": _pick_column(working_df.columns, _DATE_COLUMNS),
+        }
+
+    amount_col = roles.get("amount")
+    type_col = roles.get("type")
+    credit_col = roles.get("credit")
+    debit_col = roles.get("debit")
+    inflow_col = roles.get("inflow")
+    outflow_col = roles.get("outflow")
 
     # Case A: amount + type (income/expense/credit/debit)
     if amount_col and type_col:
@@ -236,19 +622,19 @@ def _normalize_cash_flows(df: pd.DataFrame) -> dict:
 
         working_df["cash_in"] = cash_in.abs()
         working_df["cash_out"] = cash_out.abs()
-        return _ok(working_df, source_format="amount+type")
+        return _ok(working_df, "amount+type", roles)
 
     # Case B: credit + debit columns
     if credit_col and debit_col:
         working_df["cash_in"] = _coerce_numeric(working_df[credit_col]).abs()
         working_df["cash_out"] = _coerce_numeric(working_df[debit_col]).abs()
-        return _ok(working_df, source_format="credit+debit")
+        return _ok(working_df, "credit+debit", roles)
 
     # Case C: explicit inflow/outflow columns
     if inflow_col and outflow_col:
         working_df["cash_in"] = _coerce_numeric(working_df[inflow_col]).abs()
         working_df["cash_out"] = _coerce_numeric(working_df[outflow_col]).abs()
-        return _ok(working_df, source_format="cash_in+cash_out")
+        return _ok(working_df, "cash_in+cash_out", roles)
 
     # Case D: single amount column with signed values
     if amount_col and not type_col:
@@ -260,7 +646,7 @@ def _normalize_cash_flows(df: pd.DataFrame) -> dict:
         if positive.any() and negative.any():
             working_df["cash_in"] = working_df["amount"].where(positive, 0)
             working_df["cash_out"] = working_df["amount"].where(negative, 0).abs()
-            return _ok(working_df, source_format="signed_amount")
+            return _ok(working_df, "signed_amount", roles)
 
         # WHY: all non-negative with no type is ambiguous (could be revenue-only or mixed).
         return _clarification(
@@ -281,6 +667,111 @@ def _normalize_cash_flows(df: pd.DataFrame) -> dict:
     )
 
 
+def normalize_statement(df: pd.DataFrame, source_file: str) -> dict:
+    """
+    Normalize one statement of a multi-file upload to date/description/cash_in/cash_out/source_file.
+    Each file keeps its own detected format; clarification results are returned tagged with the file.
+    """
+    return statement_from_normalized(_normalize_cash_flows(df), source_file)
+
+
+def statement_from_normalized(normalized: dict, source_file: str) -> dict:
+    # Same as normalize_statement for a frame that was already normalized (e.g. via a stored mapping).
+    if normalized["status"] != "ok":
+        return {**normalized, "file": source_file}
+    data = normalized["data"]
+    date_col = _pick_column(data.columns, _DATE_COLUMNS)
+    statement = pd.DataFrame(
+        {
+            "date": _parse_dates(data[date_col]) if date_col else pd.NaT,
+            "description": data["description"].astype(str) if "description" in data.columns else "",
+            "cash_in": data["cash_in"].astype(float),
+            "cash_out": data["cash_out"].astype(float),
+            "source_file": source_file,
+        },
+        index=data.index,
+    ).reset_index(drop=True)
+    return {**_ok(statement, normalized["source_format"]), "file": source_file}
+
+
+def merge_statements(statements: List[dict], remove_transfers: bool = True) -> dict:
+    """
+    Merge normalize_statement results into one normalized frame. Rows repeated across files
+    (overlapping statement periods) are dropped by row hash, and with remove_transfers, transfers
+    between the uploaded accounts (same day and amount, out of one file and into another) are removed.
+    """
+    for statement in statements:
+        if statement["status"] != "ok":
+            return statement
+    if not statements:
+        return _clarification("No statements were uploaded.", ["Please upload at least one CSV file."], [])
+
+    frames = [statement["data"] for statement in statements]
+    merged = pd.concat(frames, ignore_index=True)[_STATEMENT_COLUMNS]
+    file_index = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+
+    duplicate = _cross_file_duplicates(merged, file_index)
+    merged = merged[~duplicate]
+    file_index = file_index[~duplicate]
+    transfer = _matched_transfers(merged, file_index) if remove_transfers else np.zeros(len(merged), dtype=bool)
+    merged = merged[~transfer].reset_index(drop=True)
+
+    formats = sorted({statement["source_format"] for statement in statements})
+    result = _ok(merged, source_format=formats[0] if len(formats) == 1 else "mixed")
+    result["files"] = [
+        {"file": statement["file"], "source_format": statement["source_format"], "rows": int(len(statement["data"]))}
+        for statement in statements
+    ]
+    result["duplicates_removed"] = int(duplicate.sum())
+    result["transfers_removed"] = int(transfer.sum())
+    return result
+
+
+def _cross_file_duplicates(frame: pd.DataFrame, file_index: np.ndarray) -> np.ndarray:
+    # WHY: the k-th copy of a row inside one file is a real transaction; only a k-th copy that another
+    # file already contributed is a duplicate. Pairing (row hash, occurrence) keeps that distinction.
+    keys = pd.DataFrame(
+        {
+            "day": frame["date"].dt.normalize(),
+            "description": frame["description"].str.lower().str.split().str.join(" "),
+            "cash_in": frame["cash_in"].round(2),
+            "cash_out": frame["cash_out"].round(2),
+        }
+    )
+    row_hash = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    occurrence = pd.Series(row_hash).groupby([file_index, row_hash]).cumcount().to_numpy()
+    return pd.DataFrame({"hash": row_hash, "occurrence": occurrence}).duplicated().to_numpy()
+
+
+def _matched_transfers(frame: pd.DataFrame, file_index: np.ndarray) -> np.ndarray:
+    eligible = (
+        frame["description"].str.contains(_TRANSFER_PATTERN, case=False, regex=True) & frame["date"].notna()
+    ).to_numpy()
+    outflow = eligible & (frame["cash_out"].to_numpy() > 0) & (frame["cash_in"].to_numpy() == 0)
+    inflow = eligible & (frame["cash_in"].to_numpy() > 0) & (frame["cash_out"].to_numpy() == 0)
+    positions = np.arange(len(frame))
+    day = frame["date"].dt.normalize()
+
+    def _legs(mask: np.ndarray, column: str) -> pd.DataFrame:
+        legs = pd.DataFrame(
+            {"day": day[mask].to_numpy(), "amount": frame[column].to_numpy()[mask].round(2)}
+        )
+        legs["hash"] = pd.util.hash_pandas_object(legs, index=False).to_numpy()
+        legs["occurrence"] = legs.groupby("hash").cumcount()
+        legs["file"] = file_index[mask]
+        legs["position"] = positions[mask]
+        return legs[["hash", "occurrence", "file", "position"]]
+
+    # WHY: pair the n-th outgoing leg with the n-th incoming leg of the same day/amount hash; a pair
+    # only counts as an internal transfer when the two legs come from different accounts (files).
+    pairs = _legs(outflow, "cash_out").merge(_legs(inflow, "cash_in"), on=["hash", "occurrence"])
+    pairs = pairs[pairs["file_x"] != pairs["file_y"]]
+    matched = np.zeros(len(frame), dtype=bool)
+    matched[pairs["position_x"].to_numpy()] = True
+    matched[pairs["position_y"].to_numpy()] = True
+    return matched
+
+
 def _pick_column(columns: pd.Index, candidates: List[str]) -> Optional[str]:
     for name in candidates:
         if name in columns:
@@ -288,6 +779,18 @@ def _pick_column(columns: pd.Index, candidates: List[str]) -> Optional[str]:
     return None
 
 
+def _parse_dates(values: pd.Series) -> pd.Series:
+    # WHY: bank exports mostly write DD/MM/YYYY; pandas reads 05/01 as May 1st unless told otherwise.
+    # Day-first is assumed for numeric dates unless only the second field ever exceeds 12.
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    parts = values.astype(str).str.extract(_NUMERIC_DATE).dropna().astype(int)
+    if parts.empty:
+        return pd.to_datetime(values, errors="coerce")
+    dayfirst = bool((parts[0] > 12).any() or not (parts[1] > 12).any())
+    return pd.to_datetime(values, errors="coerce", dayfirst=dayfirst)
+
+
 def _coerce_numeric(series: pd.Series) -> pd.Series:
     return pd.to_numeric(series, errors="coerce").fillna(0)
 
@@ -300,12 +803,16 @@ def _normalize_type_value(value: str) -> Optional[str]:
     return None
 
 
-def _ok(df: pd.DataFrame, source_format: str) -> dict:
-    return {
+def _ok(df: pd.DataFrame, source_format: str, roles: Optional[Dict[str, Optional[str]]] = None) -> dict:
+    result = {
         "status": "ok",
         "data": df,
         "source_format": source_format,
     }
+    if roles is not None:
+        used = _FORMAT_ROLES[source_format] + ("description", "date")
+        result["columns"] = {role: roles[role] for role in used if roles.get(role)}
+    return result
 
 
 def _clarification(message: str, clarifications: List[str], sample_columns: List[str]) -> dict:
@@ -322,23 +829,52 @@ def _clarification(message: str, clarifications: List[str], sample_columns: List
     }
 
 
+def compact_transaction_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # WHY: keep only the columns needed to rebuild transaction rows so stored results stay small.
+    columns = [col for col in ("description", "cash_in", "cash_out") if col in df.columns]
+    return df[columns].reset_index(drop=True)
+
+
+def iter_transaction_rows(
+    df: pd.DataFrame,
+    start: int = 0,
+    stop: Optional[int] = None,
+    chunk_size: int = 10_000,
+) -> Iterator[dict]:
+    # WHY: build rows chunk by chunk so streaming responses never hold the full row list in memory.
+    if df is None or df.empty:
+        return
+    stop = len(df) if stop is None else min(stop, len(df))
+    for chunk_start in range(max(start, 0), stop, chunk_size):
+        chunk = df.iloc[chunk_start:min(chunk_start + chunk_size, stop)]
+        yield from _build_transaction_rows(chunk)
+
+
 def _build_transaction_rows(df: pd.DataFrame) -> List[dict]:
     # WHY: provide a consistent transaction payload for the frontend to reuse.
     if df is None or df.empty:
         return []
-    description_col = "description" if "description" in df.columns else None
+    cash_in = _row_values(df, "cash_in")
+    cash_out = _row_values(df, "cash_out")
+    if "description" in df.columns:
+        descriptions = [str(value) for value in df["description"].tolist()]
+    else:
+        descriptions = [""] * len(df)
 
     rows: List[dict] = []
-    for _, row in df.iterrows():
-        cash_in = float(row.get("cash_in", 0) or 0)
-        cash_out = float(row.get("cash_out", 0) or 0)
-        amount = cash_in - cash_out
-        tx_type = "credit" if amount >= 0 else "debit"
+    for description, inflow, outflow in zip(descriptions, cash_in, cash_out):
+        amount = inflow - outflow
         rows.append(
             {
-                "description": str(row.get(description_col, "")) if description_col else "",
+                "description": description,
                 "amount": round(amount, 2),
-                "type": tx_type,
+                "type": "credit" if amount >= 0 else "debit",
             }
         )
     return rows
+
+
+def _row_values(df: pd.DataFrame, column: str) -> List[float]:
+    if column not in df.columns:
+        return [0.0] * len(df)
+    return [float(value) for value in df[column].fillna(0).tolist()]
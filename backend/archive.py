@@ -0,0 +1,173 @@
+import os
+import re
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+import pandas as pd
+
+from security import EncryptionManager, get_encryption_manager
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except Exception:  # pragma: no cover - pyarrow may not be installed in dev
+    pa = None
+    pa_ipc = None
+
+ARCHIVE_COLUMNS = ["id", "date", "description", "amount", "category"]
+_MONTH_FILE = re.compile(r"^month=(\d{4}-\d{2})\.arrow(\.enc)?$")
+
+
+class TransactionArchive:
+    # WHY: closed months never change, so they move to one zstd-compressed Arrow IPC file per
+    # user/month. Plain files are memory-mapped and only the requested columns are decompressed;
+    # with FINAI_DATA_KEY set the file is Fernet-encrypted (.arrow.enc) and must be decrypted into
+    # memory first, but column projection still skips decoding the other columns.
+    def __init__(self, root: str, encryption: Optional[EncryptionManager] = None):
+        self.root = root
+        self._encryption = encryption or EncryptionManager(None)
+        self._lock = threading.Lock()
+
+    def write_month(self, user_id: int, month: str, frame: pd.DataFrame) -> str:
+        _require_pyarrow()
+        table = pa.Table.from_pandas(_archive_frame(frame), schema=_schema(), preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa_ipc.new_file(sink, table.schema, options=pa_ipc.IpcWriteOptions(compression="zstd")) as writer:
+            writer.write_table(table, max_chunksize=64 * 1024)
+        payload = sink.getvalue().to_pybytes()
+
+        directory = self._user_dir(user_id)
+        os.makedirs(directory, exist_ok=True)
+        encrypted = self._encryption.enabled
+        path = os.path.join(directory, f"month={month}.arrow" + (".enc" if encrypted else ""))
+        stale = os.path.join(directory, f"month={month}.arrow" + ("" if encrypted else ".enc"))
+        with self._lock:
+            # WHY: write then rename so readers never see a half-written month.
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as handle:
+                handle.write(self._encryption.encrypt_bytes(payload) if encrypted else payload)
+            os.replace(temp_path, path)
+            if os.path.exists(stale):
+                os.remove(stale)
+        return path
+
+    def archive_closed_months(self, user_id: int, frame: pd.DataFrame, as_of=None) -> List[str]:
+        """
+        Write every month strictly before as_of's month (default: now) as its own archive file,
+        replacing any earlier archive of that month. Returns the months written.
+        """
+        frame = _archive_frame(frame)
+        current = pd.Timestamp(as_of or datetime.utcnow()).to_period("M")
+        months = frame["date"].dt.to_period("M")
+        closed = months < current
+        written = []
+        for month, rows in frame[closed].groupby(months[closed], sort=True):
+            self.write_month(user_id, str(month), rows)
+            written.append(str(month))
+        return written
+
+    def months(self, user_id: int, start_month: Optional[str] = None, end_month: Optional[str] = None) -> List[str]:
+        directory = self._user_dir(user_id)
+        if not os.path.isdir(directory):
+            return []
+        found = {match.group(1) for match in map(_MONTH_FILE.match, os.listdir(directory)) if match}
+        return sorted(
+            month
+            for month in found
+            if (not start_month or month >= start_month) and (not end_month or month <= end_month)
+        )
+
+    def read(
+        self,
+        user_id: int,
+        columns: Optional[List[str]] = None,
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Scan archived months in [start_month, end_month] (inclusive, "YYYY-MM"), reading only the
+        given columns. Month pruning happens on file names, so unrelated months are never opened.
+        """
+        _require_pyarrow()
+        columns = list(columns or ARCHIVE_COLUMNS)
+        unknown = [column for column in columns if column not in ARCHIVE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown archive columns: {', '.join(unknown)}")
+        field_indices = [ARCHIVE_COLUMNS.index(column) for column in columns]
+
+        tables = []
+        for month in self.months(user_id, start_month, end_month):
+            tables.append(self._read_month(user_id, month, field_indices))
+        if not tables:
+            return _schema().empty_table().select(columns).to_pandas()
+        return pa.concat_tables(tables).to_pandas()
+
+    def _read_month(self, user_id: int, month: str, field_indices: List[int]):
+        options = pa_ipc.IpcReadOptions(included_fields=field_indices)
+        path = os.path.join(self._user_dir(user_id), f"month={month}.arrow")
+        if os.path.exists(path):
+            with pa.memory_map(path, "r") as source:
+                return pa_ipc.open_file(source, options=options).read_all()
+        with open(path + ".enc", "rb") as handle:
+            payload = self._encryption.decrypt_bytes(handle.read())
+        return pa_ipc.open_file(pa.BufferReader(payload), options=options).read_all()
+
+    def _user_dir(self, user_id: int) -> str:
+        return os.path.join(self.root, f"user={int(user_id)}")
+
+
+def archive_user_transactions(db, user_id: int, archive: TransactionArchive, as_of=None) -> List[str]:
+    """
+    Copy a user's closed months from the transactions table into the archive.
+    """
+    from models import Transaction
+
+    rows = (
+        db.query(Transaction.id, Transaction.date, Transaction.description, Transaction.amount, Transaction.category)
+        .filter(Transaction.user_id == user_id)
+        .all()
+    )
+    frame = pd.DataFrame(rows, columns=ARCHIVE_COLUMNS)
+    return archive.archive_closed_months(user_id, frame, as_of=as_of)
+
+
+def _archive_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    data = {}
+    for column in ARCHIVE_COLUMNS:
+        data[column] = frame[column] if column in frame.columns else None
+    archived = pd.DataFrame(data, index=frame.index)
+    archived["id"] = pd.to_numeric(archived["id"], errors="coerce").astype("Int64")
+    archived["date"] = pd.to_datetime(archived["date"], errors="coerce").astype("datetime64[ms]")
+    archived["amount"] = pd.to_numeric(archived["amount"], errors="coerce").fillna(0.0).astype(float)
+    archived["description"] = archived["description"].astype("string")
+    archived["category"] = archived["category"].astype("string")
+    return archived[archived["date"].notna()]
+
+
+def _schema():
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("date", pa.timestamp("ms")),
+            ("description", pa.string()),
+            ("amount", pa.float64()),
+            ("category", pa.string()),
+        ]
+    )
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow is required for the transaction archive")
+
+
+_archive: Optional[TransactionArchive] = None
+
+
+def get_archive() -> TransactionArchive:
+    global _archive
+    if _archive is None:
+        root = os.getenv("ARCHIVE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive")
+        _archive = TransactionArchive(root, get_encryption_manager())
+    return _archive
@@ -0,0 +1,44 @@
+"""
+Per-turn prompt size and build time for long chat sessions, with and without compaction.
+
+Prompt tokens are the main driver of model latency and cost, so a flat compacted size means
+flat per-turn latency. Run from the backend directory:
+    python -m benchmarks.bench_conversation_context --turns 2000
+"""
+import argparse
+import time
+
+from ai_insights import _format_turn, build_conversation_context, estimate_tokens
+
+
+def _message(turn: int) -> dict:
+    role = "user" if turn % 2 == 0 else "assistant"
+    text = (
+        f"Question {turn}: how should I plan cash flow for next quarter? Please be specific."
+        if role == "user"
+        else f"Answer {turn}: Keep a buffer of two months of expenses. Review receivables weekly. " * 3
+    )
+    return {"role": role, "text": text}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--budget", type=int, default=2500)
+    args = parser.parse_args()
+
+    checkpoints = {10, 50, 100, 500, 1000, 2000, args.turns}
+    conversation = []
+    print(f"{'turns':>6} {'naive_tokens':>13} {'compact_tokens':>15} {'build_ms':>9}")
+    for turn in range(1, args.turns + 1):
+        conversation.append(_message(turn))
+        started = time.perf_counter()
+        context = build_conversation_context(conversation, budget_tokens=args.budget)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if turn in checkpoints:
+            naive = "\n".join(_format_turn(msg) for msg in conversation)
+            print(f"{turn:>6} {estimate_tokens(naive):>13} {estimate_tokens(context):>15} {elapsed_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
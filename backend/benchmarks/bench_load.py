@@ -0,0 +1,232 @@
+"""
+Concurrent load test for the API with a weighted traffic mix and the fake LLM provider.
+
+Drives the ASGI app in-process through httpx (no server needed) or, with --base-url, a running
+uvicorn started with AI_PROVIDER=fake. Reports throughput and p50/p95/p99 latency per endpoint and
+writes them as JSON so results can be compared across releases. Run from the backend directory:
+    python -m benchmarks.bench_load --concurrency 16 --duration 20 --output load_results.json
+    python -m benchmarks.bench_load --mix upload=1,ai_insights=1 --requests 500
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from instrumentation import percentile
+
+DEFAULT_MIX = "upload=3,ai_insights=3,forecast=2,integrations=2"
+
+_METRICS = {
+    "revenue": 1_250_000.0,
+    "expenses": 980_000.0,
+    "profit_margin": 21.6,
+    "cash_flow": 270_000.0,
+    "health_score": 80,
+    "creditworthiness": "High",
+    "risks": ["Customer concentration"],
+}
+
+
+def _statement_csv(rows: int, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+            "description": [f"Vendor {index % 250}" for index in range(rows)],
+            "amount": np.round(rng.normal(0, 25_000, rows), 2),
+        }
+    )
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, date_format="%Y-%m-%d")
+    return buffer.getvalue().encode("utf-8")
+
+
+def _scenarios(upload_csv: bytes) -> Dict[str, List[Callable]]:
+    # Each scenario lists request variants returning (label, pending request); one is picked per request.
+    def upload(client):
+        files = {"file": ("statement.csv", upload_csv, "text/csv")}
+        return "POST /upload", client.post("/upload", params={"mode": "summary"}, files=files)
+
+    def ai_insights(client):
+        body = {"metrics": _METRICS, "message": "How do I improve cash flow next quarter?"}
+        return "POST /ai-insights", client.post("/ai-insights", json=body)
+
+    def forecast(client):
+        amounts = [100_000 + 2_500 * month for month in range(24)]
+        return "POST /forecast", client.post("/forecast", json={"amounts": amounts, "growth_rate": 0.05})
+
+    def integrations_status(client):
+        return "GET /integrations/status", client.get("/integrations/status")
+
+    def banking_accounts(client):
+        return "GET /integrations/banking/accounts", client.get("/integrations/banking/accounts")
+
+    def gstr1(client):
+        body = {"gstin": "29ABCDE1234F1Z5", "period": "2025-01", "invoices": []}
+        return "POST /integrations/gst/gstr1", client.post("/integrations/gst/gstr1", json=body)
+
+    return {
+        "upload": [upload],
+        "ai_insights": [ai_insights],
+        "forecast": [forecast],
+        "integrations": [integrations_status, banking_accounts, gstr1],
+    }
+
+
+def _parse_mix(value: str, known: List[str]) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in known:
+            raise SystemExit(f"Unknown scenario '{name}'. Choose from: {', '.join(known)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    scenarios: dict,
+    mix: Dict[str, float],
+    rng: random.Random,
+    deadline: float,
+    budget: List[int],
+    samples: Dict[str, List[Tuple[float, bool]]],
+) -> None:
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        if budget[0] <= 0:
+            return
+        budget[0] -= 1
+        variant = rng.choice(scenarios[rng.choices(names, weights)[0]])
+        label, request = variant(client)
+        started = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        samples.setdefault(label, []).append(((time.perf_counter() - started) * 1000, ok))
+
+
+def _client(base_url: Optional[str], timeout: float) -> httpx.AsyncClient:
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=timeout)
+    # WHY: import lazily so the fake provider env vars are set before the app reads them.
+    import main
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://loadtest", timeout=timeout)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    scenarios = _scenarios(_statement_csv(args.rows, args.seed))
+    mix = _parse_mix(args.mix, list(scenarios))
+    samples: Dict[str, List[Tuple[float, bool]]] = {}
+    async with _client(args.base_url, args.timeout) as client:
+        if args.warmup:
+            warm_rng = random.Random(args.seed)
+            await _worker(client, scenarios, mix, warm_rng, time.perf_counter() + 60, [args.warmup], {})
+        rng = random.Random(args.seed)
+        budget = [args.requests if args.requests else float("inf")]
+        started = time.perf_counter()
+        deadline = started + (args.duration if not args.requests else float("inf"))
+        await asyncio.gather(
+            *(
+                _worker(client, scenarios, mix, random.Random(rng.random()), deadline, budget, samples)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+    return _report(samples, elapsed, args, mix)
+
+
+def _report(samples: Dict[str, List[Tuple[float, bool]]], elapsed: float, args, mix: Dict[str, float]) -> dict:
+    def _describe(entries: List[Tuple[float, bool]]) -> dict:
+        latencies = sorted(latency for latency, _ in entries)
+        return {
+            "requests": len(entries),
+            "errors": sum(1 for _, ok in entries if not ok),
+            "throughput_rps": round(len(entries) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        }
+
+    everything = [entry for entries in samples.values() for entry in entries]
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "target": args.base_url or "in-process ASGI",
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": None if args.requests else args.duration,
+            "requests": args.requests,
+            "mix": mix,
+            "upload_rows": args.rows,
+            "fake_latency_ms": None if args.base_url else args.fake_latency_ms,
+            "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "overall": _describe(everything),
+        "endpoints": {label: _describe(entries) for label, entries in sorted(samples.items())},
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted scenarios, e.g. upload=3,ai_insights=1")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run (ignored with --requests)")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests instead")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests sent first")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per uploaded statement")
+    parser.add_argument("--fake-latency-ms", type=float, default=300.0, help="Fake LLM latency (in-process only)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="load_results.json")
+    args = parser.parse_args()
+
+    if not args.base_url:
+        # WHY: never spend real model quota under load; the fake provider models Gemini latency.
+        os.environ["AI_PROVIDER"] = "fake"
+        os.environ["AI_FAKE_LATENCY_MS"] = str(args.fake_latency_ms)
+        os.environ.setdefault("AI_FAKE_SEED", str(args.seed))
+
+    report = asyncio.run(run(args))
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+
+    print(f"{'endpoint':<36} {'reqs':>6} {'errs':>5} {'rps':>8} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+    for label, stats in [*report["endpoints"].items(), ("overall", report["overall"])]:
+        print(
+            f"{label:<36} {stats['requests']:>6} {stats['errors']:>5} {stats['throughput_rps']:>8.2f} "
+            f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+    print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
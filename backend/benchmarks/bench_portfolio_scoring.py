@@ -0,0 +1,77 @@
+"""
+Throughput of the /portfolio/score path versus scoring each business with analyze_financials.
+
+The scalar side calls analyze_financials once per business (on a sample, extrapolated to the full
+portfolio because it is slow); the endpoint side times score_portfolio + portfolio_records as the
+endpoint runs them, then the full HTTP round trip through the app. Run from the backend directory:
+    python -m benchmarks.bench_portfolio_scoring --businesses 50000 --scalar-sample 2000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis import analyze_financials, portfolio_records, score_portfolio
+
+_COMPARED_KEYS = ("profit_margin", "cash_flow", "health_score", "creditworthiness", "risks", "recommended_products")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--businesses", type=int, default=50_000)
+    parser.add_argument("--scalar-sample", type=int, default=2_000, help="Businesses scored one at a time")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    revenue = np.round(rng.uniform(0, 1_000_000, args.businesses), 2)
+    expenses = np.round(revenue * rng.uniform(0.5, 1.3, args.businesses), 2)
+    businesses = [
+        {"business_id": index, "revenue": r, "expenses": e}
+        for index, (r, e) in enumerate(zip(revenue.tolist(), expenses.tolist()))
+    ]
+    n = len(businesses)
+    sample = businesses[: max(1, min(args.scalar_sample, n))]
+
+    started = time.perf_counter()
+    scalar = [
+        analyze_financials(
+            pd.DataFrame({"credit": [business["revenue"]], "debit": [business["expenses"]]}),
+            include_transactions=False,
+        )
+        for business in sample
+    ]
+    scalar_seconds = (time.perf_counter() - started) / len(sample) * n
+
+    started = time.perf_counter()
+    scored = score_portfolio(pd.DataFrame(businesses))
+    score_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    records = portfolio_records(scored)
+    records_seconds = time.perf_counter() - started
+
+    # WHY: import lazily; the app pulls in every integration and is only needed for the HTTP timing.
+    from fastapi.testclient import TestClient
+
+    import main as app_module
+
+    with TestClient(app_module.app) as client:
+        started = time.perf_counter()
+        response = client.post("/portfolio/score", json={"businesses": businesses})
+        endpoint_seconds = time.perf_counter() - started
+    response.raise_for_status()
+
+    mismatches = sum(
+        1 for expected, record in zip(scalar, records) if any(expected[key] != record[key] for key in _COMPARED_KEYS)
+    )
+    vector_seconds = score_seconds + records_seconds
+    print(f"analyze_financials per business: {scalar_seconds * 1000:.1f} ms (extrapolated from {len(sample)})")
+    print(f"score_portfolio:                 {score_seconds * 1000:.1f} ms")
+    print(f"portfolio_records:               {records_seconds * 1000:.1f} ms")
+    print(f"endpoint path (score + records): {vector_seconds * 1000:.1f} ms ({n / vector_seconds:,.0f} businesses/s)")
+    print(f"POST /portfolio/score round trip: {endpoint_seconds * 1000:.1f} ms")
+    print(f"mismatches in sample: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Parse time per upload format and engine (CSV: pyarrow vs pandas C parser, XLSX: calamine vs
+openpyxl read-only, Parquet: pyarrow), including normalization into cash flows.
+
+Run from the backend directory:
+    python -m benchmarks.bench_readers --rows 500000 --xlsx-rows 50000
+"""
+import argparse
+import io
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis import analyze_financials
+from readers import _XLSX_ENGINES, read_table
+
+
+def _ledger(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    vendors = np.array(["Acme Traders", "Office Rent", "City Power", "Payroll", "Sales Invoice"])
+    return pd.DataFrame(
+        {
+            "date": (pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D")).strftime(
+                "%Y-%m-%d"
+            ),
+            "description": vendors[rng.integers(0, len(vendors), rows)],
+            "amount": np.round(rng.normal(0, 5000, rows), 2),
+        }
+    )
+
+
+def _encode(frame: pd.DataFrame, file_format: str) -> bytes:
+    buffer = io.BytesIO()
+    if file_format == "csv":
+        frame.to_csv(buffer, index=False)
+    elif file_format == "xlsx":
+        frame.to_excel(buffer, index=False)
+    else:
+        frame.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _time(payload: bytes, engine, repeats: int):
+    parse, total = [], []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        df, info = read_table(io.BytesIO(payload), engine=engine)
+        parsed = time.perf_counter()
+        analyze_financials(df, include_transactions=False)
+        parse.append((parsed - started) * 1000)
+        total.append((time.perf_counter() - started) * 1000)
+    return statistics.median(parse), statistics.median(total), info["engine"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--xlsx-rows", type=int, default=50_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ("csv", args.rows, ["pandas", "pyarrow"]),
+        ("parquet", args.rows, [None]),
+        # XLSX writing and reading are far slower, so it gets its own (smaller) row count.
+        ("xlsx", args.xlsx_rows, _XLSX_ENGINES),
+    ]
+    for file_format, rows, engines in cases:
+        payload = _encode(_ledger(rows), file_format)
+        for engine in engines:
+            parse_ms, total_ms, used = _time(payload, engine, args.repeats)
+            print(
+                f"{file_format:8} {used:9} rows {rows:>9,} size {len(payload) / 1e6:7.1f} MB | "
+                f"parse {parse_ms:9.1f} ms | parse+analyze {total_ms:9.1f} ms | {rows / parse_ms * 1000:,.0f} rows/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare FastAPI's default response encoding with the app's FastJSONResponse path.
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialization --rows 200000 --snapshots 100
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from analysis import analyze_financials
+from serialization import dumps, orjson
+
+
+def _upload_payload(rows: int) -> dict:
+    rng = np.random.default_rng(7)
+    amounts = rng.normal(0, 5000, rows).round(2)
+    df = pd.DataFrame({"description": [f"Txn {i}" for i in range(rows)], "amount": amounts})
+    return analyze_financials(df)
+
+
+def _snapshot_payload(rows: int) -> dict:
+    start = datetime(2025, 1, 1)
+    return {
+        "items": [
+            {
+                "id": i,
+                "user_id": 1,
+                "source": "banking",
+                "reference": f"REF-{i}",
+                "status": "ok",
+                "balance": float(i) * 10.5,
+                "details": None,
+                "created_at": start + timedelta(minutes=i),
+            }
+            for i in range(rows)
+        ]
+    }
+
+
+def _default_path(content) -> bytes:
+    # Mirrors FastAPI's jsonable_encoder + starlette JSONResponse.render.
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _time(fn, content, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--snapshots", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payloads = {
+        f"/upload ({args.rows} rows)": _upload_payload(args.rows),
+        f"/integrations/snapshots ({args.snapshots} rows)": _snapshot_payload(args.snapshots),
+    }
+    print(f"encoder: {'orjson' if orjson else 'stdlib json'}")
+    for name, content in payloads.items():
+        baseline = _time(_default_path, content, args.repeat)
+        fast = _time(dumps, content, args.repeat)
+        print(f"{name}: default={baseline:.1f} ms fast={fast:.1f} ms speedup={baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Query latency of the FTS5 transaction search versus a LIKE '%x%' scan on a large ledger.
+
+Run from the backend directory (builds a throwaway SQLite file):
+    python -m benchmarks.bench_transaction_search --rows 2000000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from models import Base
+from services.search_service import ensure_transaction_search_index, search_transactions
+
+# A few very common counterparties plus a long tail, like a real ledger.
+_COMMON = ["Acme Traders", "Office Rent", "City Power", "Payroll"]
+_TAIL = [f"{first} {second}" for first in ("Zenith", "Sharma", "Kaveri", "Nova", "Patel", "Orbit", "Lotus", "Indus")
+         for second in (f"Supplier{k:03d}" for k in range(250))]
+_VENDORS = _COMMON + _TAIL
+_PREFIXES = ["UPI", "NEFT", "IMPS", "CARD", "CHQ"]
+_QUERIES = ["acme trad", "payrol", "zenith supplier01", "sharma supplier123"]
+
+
+def _populate(engine, rows: int, users: int) -> float:
+    rng = np.random.default_rng(7)
+    common = rng.random(rows) < 0.4
+    vendors = np.where(common, rng.integers(0, len(_COMMON), rows), rng.integers(len(_COMMON), len(_VENDORS), rows))
+    prefixes = rng.integers(0, len(_PREFIXES), rows)
+    refs = rng.integers(100000, 999999, rows)
+    amounts = np.round(rng.normal(0, 20000, rows), 2)
+    user_ids = rng.integers(1, users + 1, rows)
+    start = datetime(2020, 1, 1)
+    offsets = rng.integers(0, 5 * 365, rows)
+
+    started = time.perf_counter()
+    insert = text(
+        "INSERT INTO transactions (description, amount, category, date, user_id) "
+        "VALUES (:description, :amount, NULL, :date, :user_id)"
+    )
+    batch_size = 50_000
+    with engine.begin() as conn:
+        for begin in range(0, rows, batch_size):
+            end = min(begin + batch_size, rows)
+            conn.execute(
+                insert,
+                [
+                    {
+                        "description": f"{_PREFIXES[prefixes[i]]}/{_VENDORS[vendors[i]]}/{refs[i]}",
+                        "amount": float(amounts[i]),
+                        "date": (start + timedelta(days=int(offsets[i]))).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                        "user_id": int(user_ids[i]),
+                    }
+                    for i in range(begin, end)
+                ],
+            )
+    return time.perf_counter() - started
+
+
+def _time(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        if not ensure_transaction_search_index(engine):
+            raise SystemExit("SQLite build has no FTS5 support")
+        insert_seconds = _populate(engine, args.rows, args.users)
+        print(f"inserted {args.rows:,} rows (FTS kept in sync by triggers) in {insert_seconds:.1f} s")
+
+        db = sessionmaker(bind=engine)()
+        try:
+            for query in _QUERIES:
+                fts_ms = _time(lambda: search_transactions(db, query, user_id=1, limit=50), args.repeats)
+                filtered_ms = _time(
+                    lambda: search_transactions(
+                        db, query, user_id=1, min_amount=1000, start_date=datetime(2023, 1, 1), limit=50
+                    ),
+                    args.repeats,
+                )
+                words = query.split()
+                like_sql = " AND ".join(f"lower(description) LIKE :p{i}" for i in range(len(words)))
+                like_ms = _time(
+                    lambda: db.execute(
+                        text(f"SELECT id FROM transactions WHERE user_id = 1 AND {like_sql} ORDER BY id DESC LIMIT 51"),
+                        {f"p{i}": f"%{word}%" for i, word in enumerate(words)},
+                    ).all(),
+                    args.repeats,
+                )
+                deep = search_transactions(db, query, user_id=1, limit=50)
+                for _ in range(20):
+                    if not deep["next_cursor"]:
+                        break
+                    cursor = int(deep["next_cursor"])
+                    deep = search_transactions(db, query, user_id=1, cursor=cursor, limit=50)
+                page_ms = _time(
+                    lambda: search_transactions(db, query, user_id=1, cursor=cursor, limit=50), args.repeats
+                )
+                print(
+                    f"{query!r:22} fts {fts_ms:8.2f} ms | fts+filters {filtered_ms:8.2f} ms | "
+                    f"page 20 {page_ms:8.2f} ms | LIKE scan {like_ms:8.2f} ms"
+                )
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    # WHY: stop paying a full failed request on every call while a provider is down or rate-limited.
+    # Failures (and calls slower than slow_call_ms) inside window_seconds open the circuit; after
+    # reset_timeout_seconds a single probe is let through to decide whether to close it again.
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        window_seconds: float = 60.0,
+        reset_timeout_seconds: float = 30.0,
+        slow_call_ms: float = 8000.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._failure_threshold = max(1, int(failure_threshold))
+        self._window_seconds = float(window_seconds)
+        self._reset_timeout_seconds = float(reset_timeout_seconds)
+        self._slow_call_ms = float(slow_call_ms)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures: Deque[float] = deque()
+        self._latencies: Deque[float] = deque(maxlen=50)
+        self._opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if now - self._opened_at < self._reset_timeout_seconds:
+                    return False
+                self._state = HALF_OPEN
+                self._probe_started_at = None
+            # HALF_OPEN: one probe at a time; a probe that never reported back is treated as stale.
+            if self._probe_started_at is None or now - self._probe_started_at >= self._reset_timeout_seconds:
+                self._probe_started_at = now
+                return True
+            return False
+
+    def record_success(self, latency_ms: float) -> None:
+        with self._lock:
+            self._latencies.append(float(latency_ms))
+            if latency_ms > self._slow_call_ms:
+                self._record_failure_locked(f"slow call ({latency_ms:.0f} ms)")
+                return
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._failures.clear()
+                self._opened_at = None
+                self._probe_started_at = None
+
+    def record_failure(self, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._record_failure_locked(error)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            self._trim_failures(now)
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = max(self._reset_timeout_seconds - (now - self._opened_at), 0.0)
+            latencies = list(self._latencies)
+            return {
+                "state": self._state,
+                "recent_failures": len(self._failures),
+                "failure_threshold": self._failure_threshold,
+                "retry_in_seconds": round(retry_in, 2) if retry_in is not None else None,
+                "avg_latency_ms": round(sum(latencies) / len(latencies), 2) if latencies else None,
+                "last_error": self._last_error,
+            }
+
+    def _record_failure_locked(self, error: Optional[str]) -> None:
+        now = self._clock()
+        self._last_error = error
+        if self._state == HALF_OPEN:
+            self._open(now)
+            return
+        self._failures.append(now)
+        self._trim_failures(now)
+        if len(self._failures) >= self._failure_threshold:
+            self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_started_at = None
+
+    def _trim_failures(self, now: float) -> None:
+        while self._failures and now - self._failures[0] > self._window_seconds:
+            self._failures.popleft()
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from analysis import MAPPING_ROLES, header_signature, normalize_cash_flows, normalize_header
+from database import SessionLocal
+from ingestion import IngestionError
+from instrumentation import memory_stage
+from models import ColumnMapping
+from readers import read_header, read_table
+
+_NUMERIC_ROLES = ("amount", "credit", "debit", "inflow", "outflow")
+
+
+class ColumnMappingRegistry:
+    # WHY: remember how each upload layout (header signature) maps onto our roles, per user, so
+    # repeat uploads skip column detection and type inference and nonstandard layouts only need
+    # confirming once. Hot entries live in an LRU cache; SQLite is the durable copy.
+    def __init__(self, persist: bool = True, max_entries: int = 10_000):
+        self._persist = persist
+        self._max_entries = max(1, int(max_entries))
+        self._cache: "OrderedDict[Tuple[Optional[int], str], Optional[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, signature: str, user_id: Optional[int] = None) -> Optional[dict]:
+        key = (user_id, signature)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        mapping = _load_mapping(signature, user_id) if self._persist else None
+        # WHY: cache misses too, so unknown layouts don't cost a query on every upload.
+        self._remember(key, mapping)
+        return mapping
+
+    def put(self, signature: str, mapping: dict, user_id: Optional[int] = None, confirmed: bool = False) -> dict:
+        if confirmed and user_id is None:
+            # WHY: a confirmed mapping overrides detection, so an anonymous one would silently remap
+            # every anonymous upload with that header; confirmations only apply to their owner.
+            raise ValueError("A confirmed column mapping needs a user_id.")
+        mapping = {**mapping, "confirmed": bool(confirmed)}
+        existing = self.get(signature, user_id)
+        if existing and existing.get("confirmed") and not confirmed:
+            # A user-confirmed mapping is never replaced by an auto-detected one.
+            return existing
+        if self._persist:
+            _save_mapping(signature, mapping, user_id, confirmed)
+        self._remember((user_id, signature), mapping)
+        return mapping
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _remember(self, key: Tuple[Optional[int], str], mapping: Optional[dict]) -> None:
+        with self._lock:
+            self._cache[key] = mapping
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+
+def mapping_from_detection(df: pd.DataFrame, normalized: dict) -> dict:
+    """
+    Turn a successful detection ({role: normalized column}) into a stored mapping that uses the
+    file's original header names, plus the dtypes to parse those columns with next time.
+    """
+    originals = {normalize_header(column): str(column) for column in df.columns}
+    columns = {role: originals[column] for role, column in normalized["columns"].items() if column in originals}
+    dtypes = {}
+    for role, column in columns.items():
+        if role in _NUMERIC_ROLES:
+            # Only pin numeric columns that parsed as numbers; "1,000"-style text stays inferred.
+            if pd.api.types.is_numeric_dtype(df[column]):
+                dtypes[column] = "float64"
+        else:
+            dtypes[column] = "string"
+    return {"source_format": normalized["source_format"], "columns": columns, "dtypes": dtypes}
+
+
+def build_confirmed_mapping(headers: List[str], columns: Dict[str, str]) -> dict:
+    """
+    Validate a user-supplied {role: header} mapping and derive its source format.
+    Raises ValueError with a user-facing message when the mapping cannot work.
+    """
+    unknown_roles = [role for role in columns if role not in MAPPING_ROLES]
+    if unknown_roles:
+        raise ValueError(f"Unknown roles: {', '.join(unknown_roles)}. Use: {', '.join(MAPPING_ROLES)}.")
+    missing = [column for column in columns.values() if column not in headers]
+    if missing:
+        raise ValueError(f"Columns not found in the file header: {', '.join(missing)}.")
+    if "amount" in columns and "type" in columns:
+        source_format = "amount+type"
+    elif "credit" in columns and "debit" in columns:
+        source_format = "credit+debit"
+    elif "inflow" in columns and "outflow" in columns:
+        source_format = "cash_in+cash_out"
+    elif "amount" in columns:
+        source_format = "signed_amount"
+    else:
+        raise ValueError("Map amount (+ type), credit + debit, or inflow + outflow columns.")
+    return {"source_format": source_format, "columns": dict(columns), "dtypes": {}}
+
+
+def parse_with_registry(
+    source: BinaryIO, user_id: Optional[int] = None, max_rows: Optional[int] = None
+) -> Tuple[Optional[pd.DataFrame], dict, dict]:
+    """
+    Parse and normalize an upload, reusing the stored mapping for its header signature when there
+    is one (exact usecols/dtypes, no detection). On a miss, detection runs and a successful result
+    is learned. Returns (frame, normalized result,
+    {"signature", "mapping": reused|learned|None, "headers"}).
+    """
+    registry = get_column_registry()
+    _, headers = read_header(source)
+    signature = header_signature(headers)
+    mapping = registry.get(signature, user_id) if headers else None
+    if mapping:
+        try:
+            usecols = list(dict.fromkeys(mapping["columns"].values()))
+            with memory_stage("parse"):
+                df, _ = read_table(source, max_rows=max_rows, usecols=usecols, dtypes=mapping.get("dtypes"))
+            with memory_stage("normalize"):
+                normalized = normalize_cash_flows(df, mapping)
+            if normalized["status"] == "ok":
+                return df, normalized, {"signature": signature, "mapping": "reused", "headers": headers}
+        except IngestionError as e:
+            if e.status_code == 413:
+                raise
+        except Exception:
+            # A stale mapping (e.g. a value that no longer parses as a number) falls back to detection.
+            pass
+        source.seek(0)
+
+    with memory_stage("parse"):
+        df, _ = read_table(source, max_rows=max_rows)
+    with memory_stage("normalize"):
+        normalized = normalize_cash_flows(df)
+    if normalized["status"] == "ok" and headers:
+        registry.put(signature, mapping_from_detection(df, normalized), user_id)
+        return df, normalized, {"signature": signature, "mapping": "learned", "headers": headers}
+    return df, normalized, {"signature": signature, "mapping": None, "headers": headers}
+
+
+def _load_mapping(signature: str, user_id: Optional[int]) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        row = _mapping_query(db, signature, user_id).first()
+        return json.loads(row.mapping) if row else None
+    finally:
+        db.close()
+
+
+def _save_mapping(signature: str, mapping: dict, user_id: Optional[int], confirmed: bool) -> None:
+    db = SessionLocal()
+    try:
+        row = _mapping_query(db, signature, user_id).first() or ColumnMapping(signature=signature, user_id=user_id)
+        row.mapping = json.dumps(mapping)
+        row.confirmed = confirmed
+        row.updated_at = datetime.utcnow()
+        db.add(row)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _mapping_query(db, signature: str, user_id: Optional[int]):
+    owner = ColumnMapping.user_id.is_(None) if user_id is None else ColumnMapping.user_id == user_id
+    return db.query(ColumnMapping).filter(ColumnMapping.signature == signature, owner)
+
+
+_registry: Optional[ColumnMappingRegistry] = None
+
+
+def get_column_registry() -> ColumnMappingRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ColumnMappingRegistry(
+            persist=(os.getenv("COLUMN_MAPPING_BACKEND") or "sqlite").strip().lower() == "sqlite",
+            max_entries=int(os.getenv("COLUMN_MAPPING_CACHE_ENTRIES") or 10_000),
+        )
+    return _registry
@@ -0,0 +1,156 @@
+import gzip
+import os
+import tempfile
+import zipfile
+from typing import BinaryIO, Optional, Tuple
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZIP_MAGIC = b"PK\x03\x04"
+_PARQUET_MAGIC = b"PAR1"
+_CHUNK_BYTES = 1024 * 1024
+
+
+class IngestionError(ValueError):
+    # WHY: carry the HTTP status with the message so every upload endpoint maps it the same way.
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def upload_limits() -> dict:
+    return {
+        "max_bytes": int(os.getenv("UPLOAD_MAX_BYTES") or 200 * 1024 * 1024),
+        "max_rows": int(os.getenv("UPLOAD_MAX_ROWS") or 2_000_000),
+        "spool_threshold": int(os.getenv("UPLOAD_SPOOL_THRESHOLD") or 8 * 1024 * 1024),
+        "max_files": int(os.getenv("UPLOAD_MAX_FILES") or 10),
+    }
+
+
+def ingest_upload(
+    source: BinaryIO,
+    filename: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    spool_threshold: Optional[int] = None,
+) -> Tuple[BinaryIO, dict]:
+    """
+    Stream an upload (plain, .gz or .zip) into a spooled temp file, decompressing on the fly.
+    Stops with a 413 IngestionError as soon as the decompressed size or line count passes its cap,
+    so oversized files (and compression bombs) are rejected before any parsing. Returns the spooled
+    file rewound to the start plus ingestion stats; the caller closes it.
+    """
+    limits = upload_limits()
+    max_bytes = limits["max_bytes"] if max_bytes is None else max_bytes
+    max_rows = limits["max_rows"] if max_rows is None else max_rows
+    spool_threshold = limits["spool_threshold"] if spool_threshold is None else spool_threshold
+
+    compression = _detect_compression(source, filename)
+    spooled = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+    try:
+        if compression == "gzip":
+            stream = gzip.GzipFile(fileobj=source, mode="rb")
+            total_bytes, lines = _copy_limited(stream, spooled, max_bytes, max_rows)
+        elif compression == "zip":
+            total_bytes, lines = _copy_zip_member(source, spooled, max_bytes, max_rows)
+        else:
+            # Binary formats (xlsx, parquet) are row-checked by the reader; newlines mean nothing there.
+            row_cap = None if compression == "binary" else max_rows
+            if compression == "binary":
+                _check_archive_size(source, max_bytes)
+            total_bytes, lines = _copy_limited(source, spooled, max_bytes, row_cap)
+    except (OSError, EOFError, zipfile.BadZipFile) as e:
+        spooled.close()
+        raise IngestionError(f"Unable to decompress the uploaded {compression} file: {e}") from e
+    except IngestionError:
+        spooled.close()
+        raise
+
+    spooled.seek(0)
+    return spooled, {
+        "compression": "none" if compression == "binary" else compression,
+        "bytes": total_bytes,
+        "lines": lines,
+        "spooled_to_disk": bool(getattr(spooled, "_rolled", False)),
+    }
+
+
+def _detect_compression(source: BinaryIO, filename: Optional[str]) -> str:
+    head = source.read(4)
+    source.seek(0)
+    name = (filename or "").lower()
+    if head.startswith(_GZIP_MAGIC) or name.endswith(".gz"):
+        return "gzip"
+    if head.startswith(_PARQUET_MAGIC):
+        return "binary"
+    if head.startswith(_ZIP_MAGIC):
+        return "binary" if _is_office_document(source) else "zip"
+    return "none"
+
+
+def _is_office_document(source: BinaryIO) -> bool:
+    # WHY: .xlsx files are zip containers too; they are passed through untouched for the reader layer.
+    try:
+        with zipfile.ZipFile(source) as archive:
+            return "[Content_Types].xml" in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+    finally:
+        source.seek(0)
+
+
+def _check_archive_size(source: BinaryIO, max_bytes: int) -> None:
+    # WHY: an .xlsx is a zip container; its sheets expand far beyond the upload size. zipfile never
+    # yields more than a member's declared file_size, so the summed sizes bound what the reader inflates.
+    if not source.read(4).startswith(_ZIP_MAGIC):
+        source.seek(0)
+        return
+    source.seek(0)
+    try:
+        with zipfile.ZipFile(source) as archive:
+            expanded = sum(info.file_size for info in archive.infolist())
+    finally:
+        source.seek(0)
+    if expanded > max_bytes:
+        raise _too_large(max_bytes)
+
+
+def _copy_zip_member(source: BinaryIO, target: BinaryIO, max_bytes: int, max_rows: int) -> Tuple[int, int]:
+    with zipfile.ZipFile(source) as archive:
+        members = [
+            info
+            for info in archive.infolist()
+            if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+        ]
+        if len(members) != 1:
+            raise IngestionError("Zip uploads must contain exactly one statement file.")
+        member = members[0]
+        # WHY: the declared size lets honest oversized archives fail without decompressing anything;
+        # _copy_limited still counts real bytes in case the header lies.
+        if member.file_size > max_bytes:
+            raise _too_large(max_bytes)
+        with archive.open(member) as stream:
+            return _copy_limited(stream, target, max_bytes, max_rows)
+
+
+def _copy_limited(stream: BinaryIO, target: BinaryIO, max_bytes: int, max_rows: Optional[int]) -> Tuple[int, int]:
+    total_bytes = 0
+    lines = 0
+    while True:
+        chunk = stream.read(_CHUNK_BYTES)
+        if not chunk:
+            break
+        total_bytes += len(chunk)
+        if total_bytes > max_bytes:
+            raise _too_large(max_bytes)
+        # Newlines are an upper bound on rows (quoted fields may span lines), which keeps the check cheap.
+        lines += chunk.count(b"\n")
+        if max_rows is not None and lines > max_rows + 1:
+            raise IngestionError(f"Upload exceeds the {max_rows:,} row limit.", status_code=413)
+        target.write(chunk)
+    return total_bytes, lines
+
+
+def _too_large(max_bytes: int) -> IngestionError:
+    return IngestionError(f"Upload exceeds the {max_bytes:,} byte limit.", status_code=413)
+
@@ -0,0 +1,214 @@
+import os
+import threading
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, List, Optional
+
+
+class LatencyRecorder:
+    # WHY: keep recent latency samples in-process so hot paths can be measured without extra infra.
+    def __init__(self, max_samples: int = 1024, unit: str = "ms"):
+        self._max_samples = max_samples
+        self._unit = unit
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self._max_samples)
+            samples.append(float(value_ms))
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def summary(self, name: Optional[str] = None) -> Dict[str, dict]:
+        with self._lock:
+            names = [name] if name else list(self._samples)
+            snapshot = {key: sorted(self._samples.get(key, ())) for key in names}
+            counts = {key: self._counts.get(key, 0) for key in names}
+        return {key: _describe(values, counts[key], self._unit) for key, values in snapshot.items() if values}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+def _describe(values: list, count: int, unit: str = "ms") -> dict:
+    return {
+        "count": count,
+        f"p50_{unit}": round(percentile(values, 50), 2),
+        f"p95_{unit}": round(percentile(values, 95), 2),
+        f"p99_{unit}": round(percentile(values, 99), 2),
+        f"max_{unit}": round(values[-1], 2),
+    }
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+_recorder = LatencyRecorder()
+
+
+def get_recorder() -> LatencyRecorder:
+    return _recorder
+
+
+_MB = 1024 * 1024
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    def __init__(self, stage: str, used_bytes: int, budget_bytes: int):
+        super().__init__(
+            f"Analysis stopped during {stage}: it needed {used_bytes / _MB:,.1f} MB, over the "
+            f"{budget_bytes / _MB:,.0f} MB memory budget. Try a smaller file or summary mode."
+        )
+        self.stage = stage
+        self.used_bytes = used_bytes
+        self.budget_bytes = budget_bytes
+
+
+class MemoryScope:
+    # Peak Python allocations while one request (or job) ran, relative to what was allocated when it began.
+    def __init__(self, name: str, baseline: int):
+        self.name = name
+        self.baseline = baseline
+        self.peak = baseline
+        self.stages: Dict[str, int] = {}
+        self.exceeded: Optional[MemoryBudgetExceeded] = None
+        self.shared = False  # another scope overlapped this one, so its peak is not its own
+        self.over_budget_bytes = 0  # set when this scope was picked to shed load; raised at its next stage
+
+    @property
+    def peak_bytes(self) -> int:
+        return max(0, self.peak - self.baseline)
+
+
+_scope: ContextVar[Optional[MemoryScope]] = ContextVar("memory_scope", default=None)
+
+
+class MemoryProfiler:
+    # WHY: opt-in (tracemalloc slows allocation-heavy code noticeably) accounting of peak
+    # allocations per request and per pipeline stage, for sizing workers and catching regressions.
+    # tracemalloc is process-wide and cannot attribute allocations to a thread, so the budget caps
+    # the whole process: it is measured from the oldest active scope's baseline, and when the peak
+    # passes it the newest active scope (the last one admitted) is rejected. Overlapping scopes are
+    # marked shared, since their per-scope figures include each other's work; profile with one
+    # worker for exact numbers. The budget is checked at stage boundaries, so an oversized
+    # analysis stops before its next, usually larger, stage (row building, serialization).
+    def __init__(self, enabled: bool = False, budget_bytes: Optional[int] = None, max_samples: int = 1024):
+        self._budget_bytes = budget_bytes
+        self._enabled = bool(enabled or budget_bytes)
+        self._recorder = LatencyRecorder(max_samples=max_samples, unit="mb")
+        self._lock = threading.Lock()
+        self._active: List[MemoryScope] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @contextmanager
+    def request(self, name: str) -> Iterator[Optional[MemoryScope]]:
+        if not self._enabled:
+            yield None
+            return
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if self._active:
+                self._fold_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            scope = MemoryScope(name, current)
+            self._active.append(scope)
+            if len(self._active) > 1:
+                for active in self._active:
+                    active.shared = True
+        token = _scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _scope.reset(token)
+            with self._lock:
+                self._fold_peak()
+                self._active.remove(scope)
+            self._recorder.record(name, scope.peak_bytes / _MB)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        scope = _scope.get()
+        if scope is None or not tracemalloc.is_tracing():
+            yield
+            return
+        self._observe()
+        self._raise_if_rejected(scope, name)
+        start, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            used = max(0, self._observe() - start)
+            scope.stages[name] = max(scope.stages.get(name, 0), used)
+            self._recorder.record(f"{scope.name}.{name}", used / _MB)
+        self._raise_if_rejected(scope, name)
+
+    def summary(self) -> Dict[str, dict]:
+        return self._recorder.summary()
+
+    def reset(self) -> None:
+        self._recorder.reset()
+
+    def _observe(self) -> int:
+        # Fold the peak since the last reset into every active scope, then shed the newest scope if
+        # the process as a whole went over budget in that window.
+        with self._lock:
+            peak = self._fold_peak()
+            if self._budget_bytes and self._active:
+                used = peak - self._active[0].baseline
+                newest = self._active[-1]
+                if used > self._budget_bytes and not newest.over_budget_bytes:
+                    newest.over_budget_bytes = used
+        return peak
+
+    def _fold_peak(self) -> int:
+        # Caller holds the lock; starts a fresh peak window.
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for active in self._active:
+            active.peak = max(active.peak, peak)
+        return peak
+
+    def _raise_if_rejected(self, scope: MemoryScope, stage: str) -> None:
+        if scope.over_budget_bytes:
+            scope.exceeded = MemoryBudgetExceeded(stage, scope.over_budget_bytes, self._budget_bytes or 0)
+            raise scope.exceeded
+
+
+_profiler: Optional[MemoryProfiler] = None
+
+
+def get_memory_profiler() -> MemoryProfiler:
+    global _profiler
+    if _profiler is None:
+        budget_mb = float(os.getenv("MEMORY_BUDGET_MB") or 0)
+        _profiler = MemoryProfiler(
+            enabled=(os.getenv("MEMORY_PROFILING") or "false").strip().lower() in {"1", "true", "yes"},
+            budget_bytes=int(budget_mb * _MB) if budget_mb > 0 else None,
+        )
+    return _profiler
+
+
+def memory_stage(name: str):
+    """
+    Account the enclosed block as a named stage of the current request; a no-op when profiling is
+    off or outside a profiled request.
+    """
+    return get_memory_profiler().stage(name)
@@ -0,0 +1,237 @@
+# NOTE: This module is a provider-agnostic interface layer for LLM calls.
+# WHY: keep model-provider logic separate so ai_insights can swap or combine backends via config.
+
+import hashlib
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Deque, Iterator, Optional
+
+from instrumentation import get_recorder, percentile
+
+try:
+    from google import genai
+except Exception:  # pragma: no cover - optional dependency in dev
+    genai = None
+
+
+class LLMProvider(ABC):
+    name: str = "generic"
+
+    @abstractmethod
+    def generate(self, prompt: str, temperature: float = 0.4, max_output_tokens: int = 700) -> str:
+        ...
+
+    def stream(self, prompt: str, temperature: float = 0.4, max_output_tokens: int = 700) -> Iterator[str]:
+        # WHY: providers without native streaming still work with the SSE endpoint (one chunk).
+        yield self.generate(prompt, temperature, max_output_tokens)
+
+    def ping(self) -> dict:
+        text = self.generate("Return only the word OK.", temperature=0.0, max_output_tokens=5)
+        if text.lower().startswith("ok"):
+            return {"status": "ok"}
+        return {"status": "fallback", "reason": f"Unexpected response: {text}"}
+
+    def close(self) -> None:
+        # WHY: providers that own threads or connections release them when config replaces them.
+        pass
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, client, model: str):
+        self._client = client
+        self.model = model
+
+    @classmethod
+    def from_env(cls) -> Optional["GeminiProvider"]:
+        # WHY: lazy-init the client so missing API keys don't break non-AI flows.
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key or not genai:
+            return None
+        # WHY: a hard deadline keeps a hung provider from holding the request past the fallback budget.
+        timeout_ms = int(float(os.getenv("AI_TIMEOUT_SECONDS") or 10) * 1000)
+        client = genai.Client(api_key=api_key, http_options={"timeout": timeout_ms})
+        return cls(client, os.getenv("GEMINI_MODEL") or "gemini-2.5-flash")
+
+    def generate(self, prompt: str, temperature: float = 0.4, max_output_tokens: int = 700) -> str:
+        response = self._client.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config={"temperature": temperature, "max_output_tokens": max_output_tokens},
+        )
+        return (response.text or "").strip()
+
+    def stream(self, prompt: str, temperature: float = 0.4, max_output_tokens: int = 700) -> Iterator[str]:
+        chunks = self._client.models.generate_content_stream(
+            model=self.model,
+            contents=prompt,
+            config={"temperature": temperature, "max_output_tokens": max_output_tokens},
+        )
+        for chunk in chunks:
+            text = getattr(chunk, "text", None) or ""
+            if text:
+                yield text
+
+
+class FakeLLMProvider(LLMProvider):
+    # WHY: deterministic offline stand-in with latency and error injection for load and tail-latency tests.
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency_ms: float = 2000.0,
+        seed: Optional[int] = None,
+        response: Optional[str] = None,
+    ):
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self.slow_rate = float(slow_rate)
+        self.slow_latency_ms = float(slow_latency_ms)
+        self.response = response
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, temperature: float = 0.4, max_output_tokens: int = 700) -> str:
+        delay_ms, fail = self._next_outcome()
+        time.sleep(delay_ms / 1000)
+        if fail:
+            raise RuntimeError("FakeLLMProvider injected error")
+        return self._answer(prompt)
+
+    def stream(self, prompt: str, temperature: float = 0.4, max_output_tokens: int = 700) -> Iterator[str]:
+        delay_ms, fail = self._next_outcome()
+        words = self._answer(prompt).split(" ")
+        # WHY: spread the latency over chunks so time-to-first-token differs from total time.
+        per_chunk = delay_ms / max(len(words), 1) / 1000
+        for index, word in enumerate(words):
+            time.sleep(per_chunk)
+            if fail and index >= len(words) // 2:
+                raise RuntimeError("FakeLLMProvider injected error")
+            yield word if index == len(words) - 1 else word + " "
+
+    def ping(self) -> dict:
+        # The fake never echoes "OK"; a call that survives error injection counts as healthy.
+        self.generate("ping", temperature=0.0, max_output_tokens=5)
+        return {"status": "ok"}
+
+    def _next_outcome(self):
+        with self._lock:
+            slow = self._rng.random() < self.slow_rate
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self._rng.random() < self.error_rate
+        delay_ms = self.slow_latency_ms if slow else max(self.latency_ms + jitter, 0.0)
+        return delay_ms, fail
+
+    def _answer(self, prompt: str) -> str:
+        if self.response is not None:
+            return self.response
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"Fake insight {digest}: keep expenses below revenue and review cash flow weekly."
+
+
+class HedgedLLMProvider(LLMProvider):
+    # WHY: cut tail latency. If the primary hasn't answered by its recent p<hedge_percentile> latency,
+    # fire the secondary as well and return whichever succeeds first.
+    name = "hedged"
+
+    def __init__(
+        self,
+        primary: LLMProvider,
+        secondary: LLMProvider,
+        hedge_percentile: float = 95.0,
+        initial_delay_ms: float = 1000.0,
+        min_delay_ms: float = 10.0,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 16,
+    ):
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_percentile = float(hedge_percentile)
+        self.initial_delay_ms = float(initial_delay_ms)
+        self.min_delay_ms = float(min_delay_ms)
+        self.min_samples = int(min_samples)
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+        self._closed = False
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+
+    def hedge_delay_ms(self) -> float:
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            return self.initial_delay_ms
+        return max(percentile(samples, self.hedge_percentile), self.min_delay_ms)
+
+    def generate(self, prompt: str, temperature: float = 0.4, max_output_tokens: int = 700) -> str:
+        if self._closed:
+            # A caller that fetched this provider just before a config change finishes unhedged.
+            return self.primary.generate(prompt, temperature, max_output_tokens)
+        delay_ms = self.hedge_delay_ms()
+        started = time.perf_counter()
+        primary = self._executor.submit(self.primary.generate, prompt, temperature, max_output_tokens)
+        primary.add_done_callback(lambda future: self._record_primary(future, started))
+
+        done, _ = wait([primary], timeout=delay_ms / 1000)
+        if done and primary.exception() is None:
+            return primary.result()
+
+        # Primary is slow or already failed: race it against the secondary.
+        with self._lock:
+            self.hedges_fired += 1
+        secondary = self._executor.submit(self.secondary.generate, prompt, temperature, max_output_tokens)
+        pending = {primary, secondary}
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+
+    def stream(self, prompt: str, temperature: float = 0.4, max_output_tokens: int = 700) -> Iterator[str]:
+        # WHY: streams are not hedged (chunks can't be merged); the primary alone serves them.
+        yield from self.primary.stream(prompt, temperature, max_output_tokens)
+
+    def ping(self) -> dict:
+        return self.primary.ping()
+
+    def close(self) -> None:
+        # In-flight calls finish on their threads; the pool just stops taking new ones.
+        self._closed = True
+        self._executor.shutdown(wait=False)
+        self.primary.close()
+        self.secondary.close()
+
+    def stats(self) -> dict:
+        delay_ms = self.hedge_delay_ms()
+        with self._lock:
+            return {
+                "hedges_fired": self.hedges_fired,
+                "hedge_wins": self.hedge_wins,
+                "hedge_delay_ms": round(delay_ms, 2),
+            }
+
+    def _record_primary(self, future, started: float) -> None:
+        if future.exception() is None:
+            latency_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._latencies.append(latency_ms)
+            get_recorder().record("llm.primary", latency_ms)
@@ -1,8 +1,10 @@
 import os
-from typing import Dict, List
+import threading
+from typing import Dict, List, Optional
 
 from integrations.banking_api import MockBankingIntegration
 from integrations.gst_returns_api import MockGSTReturnsIntegration
+from integrations.llm_api import FakeLLMProvider, GeminiProvider, HedgedLLMProvider, LLMProvider
 
 
 def _parse_integrations(env_value: str) -> List[str]:
@@ -38,3 +40,70 @@ def get_banking_client():
 
 def get_gst_client():
     return MockGSTReturnsIntegration()
+
+
+_llm_providers: Dict[tuple, Optional[LLMProvider]] = {}
+_llm_lock = threading.Lock()
+
+
+def get_llm_provider() -> Optional[LLMProvider]:
+    # WHY: choose the AI backend by configuration (AI_PROVIDER, optional AI_SECONDARY_PROVIDER for
+    # hedging). The provider is cached for the current config so hedging keeps its latency history
+    # between calls; it is called from threadpool threads, hence the lock.
+    primary_name = (os.getenv("AI_PROVIDER") or "gemini").strip().lower()
+    secondary_name = (os.getenv("AI_SECONDARY_PROVIDER") or "").strip().lower()
+    key = (primary_name, secondary_name, _llm_env_fingerprint())
+    with _llm_lock:
+        if key in _llm_providers:
+            return _llm_providers[key]
+        primary = _build_llm_provider(primary_name)
+        secondary = _build_llm_provider(secondary_name) if secondary_name else None
+        if primary and secondary:
+            provider = HedgedLLMProvider(
+                primary,
+                secondary,
+                hedge_percentile=float(os.getenv("AI_HEDGE_PERCENTILE") or 95),
+                initial_delay_ms=float(os.getenv("AI_HEDGE_INITIAL_DELAY_MS") or 1000),
+            )
+        else:
+            provider = primary or secondary
+        # A changed config replaces the old provider for good; release its worker threads.
+        replaced = [old for old in _llm_providers.values() if old is not None]
+        _llm_providers.clear()
+        _llm_providers[key] = provider
+    for old in replaced:
+        old.close()
+    return provider
+
+
+def _build_llm_provider(name: str) -> Optional[LLMProvider]:
+    if name == "fake":
+        seed = os.getenv("AI_FAKE_SEED")
+        return FakeLLMProvider(
+            latency_ms=float(os.getenv("AI_FAKE_LATENCY_MS") or 50),
+            jitter_ms=float(os.getenv("AI_FAKE_JITTER_MS") or 0),
+            error_rate=float(os.getenv("AI_FAKE_ERROR_RATE") or 0),
+            slow_rate=float(os.getenv("AI_FAKE_SLOW_RATE") or 0),
+            slow_latency_ms=float(os.getenv("AI_FAKE_SLOW_LATENCY_MS") or 2000),
+            seed=int(seed) if seed else None,
+        )
+    if name == "gemini":
+        return GeminiProvider.from_env()
+    return None
+
+
+def _llm_env_fingerprint() -> tuple:
+    names = [
+        "GEMINI_API_KEY",
+        "GEMINI_MODEL",
+        "AI_TIMEOUT_SECONDS",
+        "AI_FAKE_LATENCY_MS",
+        "AI_FAKE_JITTER_MS",
+        "AI_FAKE_ERROR_RATE",
+        "AI_FAKE_SLOW_RATE",
+        "AI_FAKE_SLOW_LATENCY_MS",
+        "AI_FAKE_SEED",
+        "AI_HEDGE_PERCENTILE",
+        "AI_HEDGE_INITIAL_DELAY_MS",
+    ]
+    return tuple(os.getenv(name) for name in names)
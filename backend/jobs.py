@@ -0,0 +1,403 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import aliased
+
+from database import SessionLocal
+from models import AnalysisJob
+from security import EncryptionManager, get_encryption_manager
+
+TERMINAL_STATES = ("succeeded", "failed")
+
+# handler(params, input_path, progress) -> (status_code, content), mirroring the synchronous endpoint.
+JobHandler = Callable[[dict, Optional[str], Callable[[float, str], None]], Tuple[int, dict]]
+
+
+class JobQueue:
+    # WHY: large uploads and portfolio runs outlive the proxy's request timeout, so they run on
+    # worker threads while clients poll or subscribe. The queue lives in SQLite: a claim is one
+    # atomic UPDATE (safe across app processes), running jobs send heartbeats, and a job whose
+    # heartbeat goes stale (its process died or restarted) is requeued with its input still on disk.
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        input_dir: str = "jobs",
+        workers: int = 2,
+        per_tenant_limit: int = 2,
+        poll_seconds: float = 1.0,
+        heartbeat_seconds: float = 5.0,
+        stale_seconds: float = 30.0,
+        max_attempts: int = 3,
+        retention_seconds: float = 7 * 24 * 3600,
+        encryption: Optional[EncryptionManager] = None,
+    ):
+        self._session_factory = session_factory
+        self._input_dir = input_dir
+        self._workers = max(1, int(workers))
+        self._per_tenant_limit = max(1, int(per_tenant_limit))
+        self._poll_seconds = float(poll_seconds)
+        self._heartbeat_seconds = float(heartbeat_seconds)
+        self._stale_seconds = float(stale_seconds)
+        self._max_attempts = max(1, int(max_attempts))
+        self._retention_seconds = float(retention_seconds)
+        self._encryption = encryption or EncryptionManager(None)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._running: Dict[str, str] = {}  # job id -> claim token, for heartbeats
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, tenant: str, params: Optional[dict] = None, source: Optional[BinaryIO] = None) -> dict:
+        """
+        Queue a job; source (an already size-checked upload) is copied next to the queue so the
+        job can be rerun after a restart. Returns the job status.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        input_path = self._store_input(job_id, source) if source is not None else None
+        db = self._session_factory()
+        try:
+            db.add(
+                AnalysisJob(
+                    id=job_id,
+                    tenant=str(tenant),
+                    kind=kind,
+                    status="queued",
+                    # WHY: params can carry the full financial payload (portfolio jobs), so they are
+                    # encrypted at rest like the stored input and result.
+                    params=self._encryption.encrypt(json.dumps(params or {}, default=str)),
+                    input_path=input_path,
+                    progress=0.0,
+                    attempts=0,
+                    created_at=datetime.utcnow(),
+                )
+            )
+            db.commit()
+        except Exception:
+            _remove(input_path)
+            raise
+        finally:
+            db.close()
+        self._wake.set()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        db = self._session_factory()
+        try:
+            job = db.get(AnalysisJob, job_id)
+            return _status(job) if job is not None else None
+        finally:
+            db.close()
+
+    def result(self, job_id: str) -> Optional[Tuple[int, dict]]:
+        """
+        (status_code, content) of a finished job, or None while it is queued or running.
+        """
+        db = self._session_factory()
+        try:
+            job = db.get(AnalysisJob, job_id)
+            if job is None or job.status not in TERMINAL_STATES:
+                return None
+            if job.result is None:
+                return 500, {"status": "error", "message": job.error or "The job failed."}
+            return job.status_code or 200, json.loads(self._encryption.safe_decrypt(job.result))
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        os.makedirs(self._input_dir, exist_ok=True)
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            for index in range(self._workers)
+        ]
+        self._threads.append(threading.Thread(target=self._maintain, name="job-maintenance", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    def run_pending(self) -> int:
+        """
+        Run queued jobs on the calling thread until none can be claimed (tests, CLI draining).
+        """
+        count = 0
+        while True:
+            claimed = self._claim()
+            if claimed is None:
+                return count
+            self._execute(claimed)
+            count += 1
+
+    def requeue_stale(self) -> int:
+        """
+        Return jobs whose worker stopped sending heartbeats to the queue, or fail them once they
+        have been attempted max_attempts times (a job that keeps killing its worker).
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self._stale_seconds)
+        db = self._session_factory()
+        try:
+            stale = (
+                AnalysisJob.status == "running",
+                func.coalesce(AnalysisJob.heartbeat_at, AnalysisJob.started_at) < cutoff,
+            )
+            failed = db.execute(
+                update(AnalysisJob)
+                .where(*stale, AnalysisJob.attempts >= self._max_attempts)
+                .values(
+                    status="failed",
+                    worker=None,
+                    error="The job was interrupted too many times.",
+                    finished_at=datetime.utcnow(),
+                )
+            ).rowcount
+            requeued = db.execute(
+                update(AnalysisJob).where(*stale).values(status="queued", worker=None, stage="requeued")
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if requeued:
+            self._wake.set()
+        return requeued + failed
+
+    def _claim(self) -> Optional[dict]:
+        token = uuid.uuid4().hex
+        now = datetime.utcnow()
+        queued = aliased(AnalysisJob)
+        running = aliased(AnalysisJob)
+        busy = (
+            select(func.count())
+            .where(running.status == "running", running.tenant == queued.tenant)
+            .scalar_subquery()
+        )
+        # WHY: oldest queued job whose tenant is under its concurrency cap, so one tenant's
+        # backlog cannot occupy every worker.
+        candidate = (
+            select(queued.id)
+            .where(queued.status == "queued", busy < self._per_tenant_limit)
+            .order_by(queued.created_at, queued.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        db = self._session_factory()
+        try:
+            claimed = db.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id == candidate, AnalysisJob.status == "queued")
+                .values(
+                    status="running",
+                    worker=token,
+                    attempts=AnalysisJob.attempts + 1,
+                    stage="started",
+                    started_at=now,
+                    heartbeat_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return None
+            job = db.execute(select(AnalysisJob).where(AnalysisJob.worker == token)).scalar_one()
+            return {
+                "id": job.id,
+                "token": token,
+                "kind": job.kind,
+                "params": json.loads(self._encryption.safe_decrypt(job.params) if job.params else "{}"),
+                "input_path": job.input_path,
+            }
+        finally:
+            db.close()
+
+    def _execute(self, claimed: dict) -> None:
+        job_id, token = claimed["id"], claimed["token"]
+        with self._lock:
+            self._running[job_id] = token
+        try:
+            handler = self._handlers.get(claimed["kind"])
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {claimed['kind']}")
+            input_path = self._load_input(claimed["input_path"])
+            try:
+                status_code, content = handler(
+                    claimed["params"], input_path, lambda fraction, stage: self._progress(job_id, token, fraction, stage)
+                )
+            finally:
+                if input_path != claimed["input_path"]:
+                    _remove(input_path)
+            self._finish(job_id, token, status_code, content)
+        except Exception as e:
+            print("🔥 JOB ERROR:", job_id, str(e))
+            self._finish(job_id, token, 500, None, error="The analysis failed unexpectedly.")
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+            # A finished job frees a tenant slot; let idle workers look again.
+            self._wake.set()
+
+    def _progress(self, job_id: str, token: str, fraction: float, stage: str) -> None:
+        self._update(job_id, token, progress=max(0.0, min(1.0, float(fraction))), stage=stage, heartbeat_at=datetime.utcnow())
+
+    def _finish(self, job_id: str, token: str, status_code: int, content: Optional[dict], error: Optional[str] = None) -> None:
+        failed = content is None or status_code >= 400
+        if failed and error is None:
+            error = content.get("message") or content.get("status") or "The job failed."
+        updated = self._update(
+            job_id,
+            token,
+            status="failed" if failed else "succeeded",
+            progress=1.0,
+            stage="done",
+            status_code=status_code,
+            result=None if content is None else self._encryption.encrypt(json.dumps(content, default=str)),
+            error=error,
+            worker=None,
+            finished_at=datetime.utcnow(),
+        )
+        if updated:
+            self._remove_input(job_id)
+
+    def _update(self, job_id: str, token: str, **values) -> bool:
+        # WHY: match on the claim token so a worker whose job was requeued (stale heartbeat) cannot
+        # overwrite the state of the newer attempt.
+        db = self._session_factory()
+        try:
+            updated = db.execute(
+                update(AnalysisJob).where(AnalysisJob.id == job_id, AnalysisJob.worker == token).values(**values)
+            ).rowcount
+            db.commit()
+            return bool(updated)
+        finally:
+            db.close()
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = self._claim()
+            except Exception as exc:
+                print("🔥 JOB QUEUE ERROR:", str(exc))
+                claimed = None
+            if claimed is None:
+                self._wake.wait(self._poll_seconds)
+                self._wake.clear()
+                continue
+            self._execute(claimed)
+
+    def _maintain(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self._lock:
+                    running = dict(self._running)
+                for job_id, token in running.items():
+                    self._update(job_id, token, heartbeat_at=datetime.utcnow())
+                self.requeue_stale()
+                self._purge_expired()
+            except Exception as exc:
+                # WHY: keep heartbeating even if one maintenance pass fails (e.g. a locked database).
+                print("🔥 JOB QUEUE ERROR:", str(exc))
+            self._stop.wait(self._heartbeat_seconds)
+
+    def _purge_expired(self) -> None:
+        cutoff = datetime.utcnow() - timedelta(seconds=self._retention_seconds)
+        db = self._session_factory()
+        try:
+            expired = db.query(AnalysisJob).filter(
+                AnalysisJob.status.in_(TERMINAL_STATES), AnalysisJob.finished_at < cutoff
+            )
+            for job in expired:
+                _remove(job.input_path)
+            expired.delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _store_input(self, job_id: str, source: BinaryIO) -> str:
+        os.makedirs(self._input_dir, exist_ok=True)
+        path = os.path.join(self._input_dir, f"{job_id}.input" + (".enc" if self._encryption.enabled else ""))
+        with open(path, "wb") as handle:
+            self._encryption.encrypt_stream(source, handle)
+        return path
+
+    def _load_input(self, path: Optional[str]) -> Optional[str]:
+        # Encrypted inputs are decrypted to a scratch file that lives only while the handler runs.
+        if not path or not path.endswith(".enc"):
+            return path
+        scratch = path[: -len(".enc")] + f".{uuid.uuid4().hex}.tmp"
+        try:
+            with open(path, "rb") as encrypted, open(scratch, "wb") as handle:
+                self._encryption.decrypt_stream(encrypted, handle)
+        except Exception:
+            _remove(scratch)
+            raise
+        return scratch
+
+    def _remove_input(self, job_id: str) -> None:
+        db = self._session_factory()
+        try:
+            job = db.get(AnalysisJob, job_id)
+            if job is not None and job.input_path:
+                _remove(job.input_path)
+                job.input_path = None
+                db.commit()
+        finally:
+            db.close()
+
+
+def _status(job: AnalysisJob) -> dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "tenant": job.tenant,
+        "status": job.status,
+        "progress": round(job.progress or 0.0, 3),
+        "stage": job.stage,
+        "attempts": job.attempts or 0,
+        "error": job.error,
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "finished_at": _iso(job.finished_at),
+    }
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _remove(path: Optional[str]) -> None:
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(
+            input_dir=os.getenv("JOB_INPUT_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs"),
+            workers=int(os.getenv("JOB_WORKERS") or 2),
+            per_tenant_limit=int(os.getenv("JOB_MAX_PER_TENANT") or 2),
+            stale_seconds=float(os.getenv("JOB_STALE_SECONDS") or 30),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS") or 3),
+            retention_seconds=float(os.getenv("JOB_RETENTION_SECONDS") or 7 * 24 * 3600),
+            encryption=get_encryption_manager(),
+        )
+    return _queue
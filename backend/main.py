@@ -9,6 +9,11 @@ from models import Base
 
 Base.metadata.create_all(bind=engine)
 
+from services.search_service import ensure_transaction_search_index, search_transactions
+
+# WHY: the FTS index and its sync triggers live beside the ORM tables (SQLite only, idempotent).
+ensure_transaction_search_index(engine)
+
 load_dotenv()
 print("GEMINI KEY FOUND:", bool(os.getenv("GEMINI_API_KEY")))
 
@@ -16,27 +21,77 @@ print("GEMINI KEY FOUND:", bool(os.getenv("GEMINI_API_KEY")))
 # -----------------------------
 # NORMAL IMPORTS
 # -----------------------------
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional, Tuple
+from datetime import datetime
+import asyncio
 import pandas as pd
 
-from analysis import analyze_financials
-from ai_insights import generate_insights, check_ai_health
+from analysis import (
+    analyze_financials,
+    analyze_normalized_with_frame,
+    header_signature,
+    iter_transaction_rows,
+    merge_statements,
+    statement_from_normalized,
+    portfolio_records,
+    score_portfolio,
+)
+from ai_insights import (
+    check_ai_health,
+    generate_batch_insights,
+    generate_insights,
+    get_ai_health_prober,
+    stream_insights,
+)
+from instrumentation import MemoryBudgetExceeded, get_memory_profiler, get_recorder, memory_stage
 from security import get_encryption_manager, encryption_required, https_required
 from services.bookkeeping_services import categorize_transactions
-from services.forecasting_service import forecast_financials
+from services.rollup_service import category_rollup
+from services.forecasting_service import forecast_financials, simulate_runway
 from services.gst_compliance_service import check_gst_compliance
-from services.working_capital_service import working_capital_analysis
+from services.working_capital_service import working_capital_analysis, working_capital_metrics
+from services.anomaly_service import anomaly_records, detect_anomalies_batch
 from integrations.registry import get_enabled_integrations, get_banking_client, get_gst_client
 from models import IntegrationSnapshot
+from ingestion import IngestionError, ingest_upload, upload_limits
+from column_registry import build_confirmed_mapping, get_column_registry, parse_with_registry
+from archive import archive_user_transactions, get_archive
+from result_store import get_result_store
+from jobs import TERMINAL_STATES, get_job_queue
+from admission import admission_enabled, get_admission_controller, retry_after_header
+from sessions import get_session_store
+from serialization import FastJSONResponse, FastJSONRoute, dumps
 
 # -----------------------------
 # FASTAPI APP
 # -----------------------------
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # WHY: background workers start with the app and stop cleanly on shutdown.
+    prober = get_ai_health_prober()
+    prober.start()
+    # WHY: requeued and pending jobs resume as soon as the app is back up.
+    jobs = get_job_queue()
+    jobs.start()
+    admission = get_admission_controller()
+    admission.start(interval_seconds=float(os.getenv("ADMISSION_FLUSH_SECONDS") or 5))
+    try:
+        yield
+    finally:
+        admission.stop()
+        jobs.stop()
+        prober.stop()
+
+
+# WHY: serialize every endpoint through one fast encoder that understands NumPy/pandas values.
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
+app.router.route_class = FastJSONRoute
 
 app.add_middleware(
     CORSMiddleware,
@@ -62,6 +117,83 @@ async def enforce_https(request, call_next):
     return await call_next(request)
 
 
+@app.middleware("http")
+async def reject_oversized_upload(request, call_next):
+    # WHY: refuse a declared-oversized upload before its body is read or spooled. Compressed
+    # bodies are smaller than what they decompress to, so the decompressed cap is a safe bound.
+    if request.url.path in ("/upload", "/jobs/upload", "/upload/batch"):
+        declared = request.headers.get("content-length")
+        limits = upload_limits()
+        files = limits["max_files"] if request.url.path == "/upload/batch" else 1
+        limit = (limits["max_bytes"] + 1024 * 1024) * files  # multipart framing overhead per file
+        if declared and declared.isdigit() and int(declared) > limit:
+            return JSONResponse(
+                status_code=413,
+                content={"status": "error", "message": "Upload exceeds the configured size limit."},
+            )
+    return await call_next(request)
+
+
+_MEMORY_PROFILED_PATHS = {
+    path.strip()
+    for path in (
+        os.getenv("MEMORY_PROFILE_PATHS")
+        or "/upload,/upload/batch,/bookkeeping/categorize,/bookkeeping/rollup,/forecast,/forecast/runway"
+    ).split(",")
+    if path.strip()
+}
+
+
+@app.middleware("http")
+async def account_memory(request, call_next):
+    # WHY: opt-in (MEMORY_PROFILING / MEMORY_BUDGET_MB) peak-allocation accounting for analysis
+    # endpoints; an analysis over budget is replaced by a 413 whatever the endpoint did with the error.
+    profiler = get_memory_profiler()
+    path = request.url.path
+    if not profiler.enabled or path not in _MEMORY_PROFILED_PATHS:
+        return await call_next(request)
+    with profiler.request(path.strip("/").replace("/", "_")) as scope:
+        try:
+            response = await call_next(request)
+        except MemoryBudgetExceeded:
+            response = None
+    if scope.exceeded is not None:
+        return JSONResponse(status_code=413, content={"status": "error", "message": str(scope.exceeded)})
+    response.headers["X-Memory-Peak-MB"] = f"{scope.peak_bytes / (1024 * 1024):.1f}"
+    return response
+
+
+@app.middleware("http")
+async def admission_control(request, call_next):
+    # WHY: registered last so it runs first; a tenant over quota is refused before any parsing,
+    # model call or memory accounting, which keeps latency stable for well-behaved tenants.
+    if not admission_enabled():
+        return await call_next(request)
+    controller = get_admission_controller()
+    path = request.url.path
+    refresh = (request.query_params.get("refresh") or "").lower() in {"1", "true", "yes"}
+    cost = controller.cost(path, refresh=refresh)
+    if cost <= 0:
+        return await call_next(request)
+    tenant = controller.tenant_for(request.headers.get("x-api-key"), request.client.host if request.client else None)
+    if controller.needs_load(tenant):
+        await run_in_threadpool(controller.load, tenant)
+    allowed, retry_after, remaining = controller.admit(tenant, cost)
+    if not allowed:
+        return JSONResponse(
+            status_code=429,
+            content={
+                "status": "error",
+                "message": "Request quota exceeded for this client. Retry after the indicated delay.",
+                "retry_after_seconds": round(retry_after, 1),
+            },
+            headers={"Retry-After": retry_after_header(retry_after)},
+        )
+    response = await call_next(request)
+    response.headers["X-RateLimit-Remaining"] = str(int(remaining))
+    return response
+
+
 def _encryption_guard():
     # WHY: ensure at-rest encryption is enforced when required by policy.
     if encryption_required() and not get_encryption_manager().enabled:
@@ -78,19 +210,54 @@ def _encryption_guard():
 # REQUEST MODEL
 # -----------------------------
 class AIInsightRequest(BaseModel):
-    metrics: dict
-    conversation: list
+    metrics: Optional[dict] = None
+    conversation: Optional[list] = None
+    language: str = "en"
+    ai_mode: Optional[str] = None
+    # WHY: with a session_id the client sends only the new message; metrics and history live server-side.
+    session_id: Optional[str] = None
+    message: Optional[str] = None
+
+
+class BatchInsightRequest(BaseModel):
+    businesses: list
     language: str = "en"
     ai_mode: Optional[str] = None
 
 
+class AnomalyRequest(BaseModel):
+    transactions: list
+    config: Optional[dict] = None
+
+
 class GSTCheckRequest(BaseModel):
     revenue: float
     threshold: Optional[float] = None
 
 
+class ColumnMappingRequest(BaseModel):
+    headers: List[str]
+    columns: dict
+    user_id: int
+
+
+class RunwayRequest(BaseModel):
+    transactions: list
+    starting_balance: float
+    horizon_months: int = 24
+    paths: int = 20_000
+    seed: Optional[int] = None
+    method: str = "bootstrap"
+
+
 class WorkingCapitalRequest(BaseModel):
-    cash_flow: float
+    cash_flow: Optional[float] = None
+    invoices: Optional[list] = None
+    bills: Optional[list] = None
+    transactions: Optional[list] = None
+    as_of: Optional[str] = None
+    period_days: int = 365
+    inventory: Optional[float] = None
 
 
 class ForecastRequest(BaseModel):
@@ -102,6 +269,17 @@ class BookkeepingRequest(BaseModel):
     transactions: list
 
 
+class RollupRequest(BaseModel):
+    transactions: list
+    top_n: int = 10
+    config: Optional[dict] = None
+
+
+class PortfolioScoreRequest(BaseModel):
+    businesses: list
+    config: Optional[dict] = None
+
+
 class IntegrationSnapshotRequest(BaseModel):
     user_id: Optional[int] = None
     source: str
@@ -113,18 +291,54 @@ class IntegrationSnapshotRequest(BaseModel):
 # -----------------------------
 # AI INSIGHTS ENDPOINT
 # -----------------------------
+def _chat_context(payload: AIInsightRequest):
+    # WHY: resolve metrics/history from the server-side session when one is referenced.
+    if not payload.session_id:
+        return payload.metrics or {}, payload.conversation or [], None
+    session = get_session_store().get(payload.session_id)
+    if session is None:
+        return None, None, JSONResponse(
+            status_code=404,
+            content={
+                "status": "error",
+                "message": "Session not found or expired. Please upload the file again.",
+            },
+        )
+    conversation = list(session["conversation"])
+    if payload.message:
+        conversation.append({"role": "user", "text": payload.message})
+    return session["analysis"], conversation, None
+
+
+def _record_chat_turn(payload: AIInsightRequest, insights: str) -> None:
+    if not payload.session_id:
+        return
+    turns = [{"role": "user", "text": payload.message}] if payload.message else []
+    turns.append({"role": "assistant", "text": insights})
+    get_session_store().append_turns(payload.session_id, turns)
+
+
 @app.post("/ai-insights")
 async def ai_insights(payload: AIInsightRequest):
     try:
         guard = _encryption_guard()
         if guard:
             return guard
-        insights = generate_insights(
-            metrics=payload.metrics,
-            conversation=payload.conversation,
+        # WHY: persisted sessions read and write SQLite, which must not block the event loop.
+        metrics, conversation, error = await run_in_threadpool(_chat_context, payload)
+        if error:
+            return error
+        # WHY: the provider call blocks for seconds; keep it off the event loop like the session I/O.
+        insights = await run_in_threadpool(
+            generate_insights,
+            metrics=metrics,
+            conversation=conversation,
             language=payload.language,
             ai_mode=payload.ai_mode,
         )
+        await run_in_threadpool(_record_chat_turn, payload, insights)
+        if payload.session_id:
+            return {"insights": insights, "session_id": payload.session_id}
         return {"insights": insights}
 
     except Exception as e:
@@ -133,12 +347,81 @@ async def ai_insights(payload: AIInsightRequest):
         return {"insights": "Unable to generate insights"}
 
 
+@app.post("/ai-insights/stream")
+async def ai_insights_stream(payload: AIInsightRequest):
+    # WHY: forward model output as Server-Sent Events so users see text before generation finishes.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    metrics, conversation, error = await run_in_threadpool(_chat_context, payload)
+    if error:
+        return error
+
+    # Sync generator: StreamingResponse iterates it in a threadpool, so recording the turn is safe here.
+    def _events():
+        parts = []
+        for event in stream_insights(
+            metrics=metrics,
+            conversation=conversation,
+            language=payload.language,
+            ai_mode=payload.ai_mode,
+        ):
+            if event["event"] == "chunk":
+                parts.append(event["data"]["text"])
+            elif event["event"] == "fallback":
+                parts = [event["data"]["text"]]
+            elif event["event"] == "done":
+                _record_chat_turn(payload, "".join(parts))
+            yield b"event: " + event["event"].encode("utf-8") + b"\ndata: " + dumps(event["data"]) + b"\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/ai-insights/batch")
+async def ai_insights_batch(payload: BatchInsightRequest):
+    # WHY: portfolio views need one narrative per business without one model call per business.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    return await run_in_threadpool(
+        generate_batch_insights,
+        payload.businesses,
+        payload.language,
+        payload.ai_mode,
+    )
+
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    await run_in_threadpool(get_session_store().delete, session_id)
+    return {"status": "deleted", "session_id": session_id}
+
+
+@app.get("/metrics/latency")
+async def latency_metrics():
+    # WHY: expose in-process latency percentiles (e.g. AI time-to-first-token) for monitoring.
+    metrics = {"latency": get_recorder().summary()}
+    if admission_enabled():
+        metrics["admission"] = get_admission_controller().stats()
+    if get_memory_profiler().enabled:
+        # Peak MB per profiled request and per stage ("upload.parse", "upload.serialize", ...).
+        metrics["memory"] = get_memory_profiler().summary()
+    return metrics
+
+
 @app.get("/health/ai")
-async def ai_health():
-    # WHY: expose a simple health check for Gemini connectivity.
+async def ai_health(refresh: bool = False):
+    # WHY: expose a simple health check for Gemini connectivity; served from cache unless refresh=true.
     guard = _encryption_guard()
     if guard:
         return guard
+    if refresh:
+        # WHY: the live probe blocks on the provider, so keep it off the event loop.
+        return await run_in_threadpool(check_ai_health, True)
     return check_ai_health()
 # -----------------------------
 # FILE UPLOAD ENDPOINT
@@ -201,21 +484,140 @@ _UPLOAD_OPENAPI_EXAMPLES = {
         }
     },
 )
-async def upload_file(file: UploadFile = File(..., description="CSV file upload")):
+async def upload_file(
+    file: UploadFile = File(..., description="CSV file upload"),
+    mode: str = Query("full", description="'full' embeds all transactions; 'summary' returns a result_id instead"),
+    period: Optional[str] = Query(None, pattern="^(month|quarter)$", description="Add per-period metrics"),
+    rolling_window: Optional[int] = Query(None, ge=2, le=24, description="Rolling window size in periods"),
+    user_id: Optional[int] = Query(None, description="Owner of learned/confirmed column mappings"),
+):
     try:
         guard = _encryption_guard()
         if guard:
             return guard
-        df = pd.read_csv(file.file)
+        # WHY: decompression and spooling read the whole body; keep that off the event loop.
+        spooled, _ = await run_in_threadpool(ingest_upload, file.file, file.filename)
+        try:
+            # WHY: analysis and the session write (SQLite when persisted) run off the event loop.
+            status_code, result = await run_in_threadpool(
+                _analyze_upload, spooled, user_id, mode, period, rolling_window
+            )
+        finally:
+            spooled.close()
+        if status_code != 200:
+            return JSONResponse(status_code=status_code, content=result)
+        return result
+
+    except IngestionError as e:
+        return JSONResponse(status_code=e.status_code, content={"status": "error", "message": e.message})
+    except Exception as e:
+        print("🔥 BACKEND ERROR:", str(e))
+        return JSONResponse(status_code=400, content=_UPLOAD_ERROR)
+
+
+_UPLOAD_ERROR = {
+    "status": "error",
+    "message": "Unable to process the uploaded CSV. Please verify the file format.",
+}
+
+
+def _analyze_upload(
+    source,
+    user_id: Optional[int] = None,
+    mode: str = "full",
+    period: Optional[str] = None,
+    rolling_window: Optional[int] = None,
+    progress: Optional[Callable[[float, str], None]] = None,
+) -> Tuple[int, dict]:
+    # WHY: one pipeline for /upload and upload jobs; returns (status_code, content).
+    report = progress or (lambda fraction, stage: None)
+    report(0.1, "parse")
+    # WHY: a known header layout parses with its stored mapping and skips column detection.
+    # WHY: nothing from the parsed frame is printed; column names and rows are customer data.
+    _, normalized, layout = parse_with_registry(source, user_id, upload_limits()["max_rows"])
+
+    report(0.5, "analyze")
+    # WHY: summary mode returns metrics plus a handle; rows are fetched via /results/{id}/transactions.
+    result, frame = analyze_normalized_with_frame(
+        normalized, include_transactions=mode != "summary", period=period, rolling_window=rolling_window
+    )
+    if isinstance(result, dict) and result.get("status") == "clarification_needed":
+        # WHY: return actionable, user-friendly feedback instead of a raw exception.
+        # The signature and headers let the client confirm a mapping via /column-mappings.
+        return 422, {**result, "header_signature": layout["signature"], "headers": layout.get("headers", [])}
+    report(0.9, "finalize")
+    if mode == "summary" and frame is not None:
+        result["result_id"] = get_result_store().put(frame)
+    result["column_mapping"] = {"signature": layout["signature"], "status": layout["mapping"]}
+    # WHY: chat turns can reference this session instead of resending metrics every time.
+    result["session_id"] = get_session_store().create(result)
+    return 200, result
+
+
+def _parse_statement(upload: UploadFile, index: int) -> dict:
+    name = upload.filename or f"statement_{index + 1}.csv"
+    try:
+        spooled, _ = ingest_upload(upload.file, name)
+    except IngestionError as e:
+        return {"status": "error", "file": name, "message": e.message, "status_code": e.status_code}
+    try:
+        _, normalized, _ = parse_with_registry(spooled, max_rows=upload_limits()["max_rows"])
+    except IngestionError as e:
+        return {"status": "error", "file": name, "message": e.message, "status_code": e.status_code}
+    except Exception as e:
+        print("🔥 BACKEND ERROR:", name, str(e))
+        return {
+            "status": "error",
+            "file": name,
+            "message": f"Unable to read '{name}'. Please verify the file format.",
+        }
+    finally:
+        spooled.close()
+    return statement_from_normalized(normalized, name)
 
-        print("CSV columns:", df.columns.tolist())
-        print("First 5 rows:")
-        print(df.head())
 
-        result = analyze_financials(df)
-        if isinstance(result, dict) and result.get("status") == "clarification_needed":
-            # WHY: return actionable, user-friendly feedback instead of a raw exception.
+@app.post("/upload/batch")
+async def upload_files(
+    files: List[UploadFile] = File(..., description="One CSV statement per bank account"),
+    mode: str = Query("full", description="'full' embeds all transactions; 'summary' returns a result_id instead"),
+    period: Optional[str] = Query(None, pattern="^(month|quarter)$", description="Add per-period metrics"),
+    rolling_window: Optional[int] = Query(None, ge=2, le=24, description="Rolling window size in periods"),
+    remove_transfers: bool = Query(True, description="Drop transfers between the uploaded accounts"),
+):
+    # WHY: SMEs send one statement per account; consolidate them into one analysis.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    max_files = upload_limits()["max_files"]
+    if len(files) > max_files:
+        return JSONResponse(
+            status_code=413,
+            content={"status": "error", "message": f"Upload at most {max_files} files per batch."},
+        )
+    # WHY: parse and normalize every file in worker threads at once, so latency tracks the slowest
+    # file rather than the sum of all files.
+    statements = await asyncio.gather(
+        *(run_in_threadpool(_parse_statement, upload, index) for index, upload in enumerate(files))
+    )
+    for statement in statements:
+        if statement["status"] == "error":
+            return JSONResponse(status_code=statement.pop("status_code", 400), content=statement)
+        if statement["status"] == "clarification_needed":
+            return JSONResponse(status_code=422, content=statement)
+
+    try:
+        merged = merge_statements(statements, remove_transfers=remove_transfers)
+        result, frame = analyze_normalized_with_frame(
+            merged, include_transactions=mode != "summary", period=period, rolling_window=rolling_window
+        )
+        if result.get("status") == "clarification_needed":
             return JSONResponse(status_code=422, content=result)
+        result["files"] = merged["files"]
+        result["duplicates_removed"] = merged["duplicates_removed"]
+        result["transfers_removed"] = merged["transfers_removed"]
+        if mode == "summary":
+            result["result_id"] = get_result_store().put(frame)
+        result["session_id"] = await run_in_threadpool(get_session_store().create, result)
         return result
 
     except Exception as e:
@@ -224,11 +626,80 @@ async def upload_file(file: UploadFile = File(..., description="CSV file upload"
             status_code=400,
             content={
                 "status": "error",
-                "message": "Unable to process the uploaded CSV. Please verify the file format.",
+                "message": "Unable to process the uploaded files. Please verify the file formats.",
             },
         )
 
 
+@app.post("/column-mappings")
+async def confirm_column_mapping(payload: ColumnMappingRequest):
+    # WHY: a user confirms once how a nonstandard layout maps to our roles; later uploads with the
+    # same header skip detection instead of getting clarification_needed again.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    try:
+        mapping = build_confirmed_mapping(payload.headers, payload.columns)
+        signature = header_signature(payload.headers)
+        stored = get_column_registry().put(signature, mapping, payload.user_id, confirmed=True)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+    return {"status": "ok", "header_signature": signature, "mapping": stored}
+
+
+def _result_not_found(result_id: str):
+    return JSONResponse(
+        status_code=404,
+        content={
+            "status": "error",
+            "message": f"Result '{result_id}' was not found or has expired. Please upload the file again.",
+        },
+    )
+
+
+@app.get("/results/{result_id}/transactions")
+async def result_transactions(
+    result_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10_000),
+):
+    # WHY: cursor pagination keeps each response bounded regardless of file size.
+    frame = get_result_store().get(result_id)
+    if frame is None:
+        return _result_not_found(result_id)
+    try:
+        start = int(cursor) if cursor else 0
+        if start < 0:
+            # A negative start would slice from the end and hand back a bogus next_cursor.
+            raise ValueError(cursor)
+    except ValueError:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": "Invalid cursor value."},
+        )
+    stop = start + limit
+    items = list(iter_transaction_rows(frame, start=start, stop=stop))
+    return {
+        "items": items,
+        "next_cursor": str(stop) if stop < len(frame) else None,
+        "total": int(len(frame)),
+    }
+
+
+@app.get("/results/{result_id}/transactions/stream")
+async def result_transactions_stream(result_id: str):
+    # WHY: NDJSON lets clients start consuming rows immediately instead of waiting for one huge document.
+    frame = get_result_store().get(result_id)
+    if frame is None:
+        return _result_not_found(result_id)
+
+    def _lines():
+        for row in iter_transaction_rows(frame):
+            yield dumps(row) + b"\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
 @app.post("/bookkeeping/categorize")
 async def bookkeeping_categorize(payload: BookkeepingRequest):
     # WHY: support JSON-based testing without requiring CSV uploads.
@@ -237,7 +708,8 @@ async def bookkeeping_categorize(payload: BookkeepingRequest):
         if guard:
             return guard
         df = pd.DataFrame(payload.transactions)
-        result = categorize_transactions(df)
+        with memory_stage("categorize"):
+            result = categorize_transactions(df)
         if isinstance(result, dict) and result.get("error"):
             return JSONResponse(status_code=422, content=result)
         return {"categories": result}
@@ -251,6 +723,80 @@ async def bookkeeping_categorize(payload: BookkeepingRequest):
         )
 
 
+@app.post("/bookkeeping/rollup")
+async def bookkeeping_rollup(payload: RollupRequest):
+    # WHY: return per-category/vendor aggregates and savings suggestions instead of per-row labels,
+    # so clients never rebuild breakdowns from the full row list.
+    try:
+        guard = _encryption_guard()
+        if guard:
+            return guard
+        df = pd.DataFrame(payload.transactions)
+        with memory_stage("rollup"):
+            result = category_rollup(df, top_n=payload.top_n, config=payload.config)
+        if isinstance(result, dict) and result.get("error"):
+            return JSONResponse(status_code=422, content=result)
+        return result
+    except Exception as e:
+        print("🔥 BACKEND ERROR:", str(e))
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": "Unable to build the category rollup. Please verify the payload.",
+            },
+        )
+
+
+@app.post("/portfolio/score")
+async def portfolio_score(payload: PortfolioScoreRequest):
+    # WHY: re-score many businesses in one vectorized pass when analysis thresholds change.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    status_code, result = _score_portfolio(payload.businesses, payload.config)
+    if status_code != 200:
+        return JSONResponse(status_code=status_code, content=result)
+    return result
+
+
+def _score_portfolio(businesses: list, config: Optional[dict] = None) -> Tuple[int, dict]:
+    try:
+        scored = score_portfolio(pd.DataFrame(businesses), config=config)
+        return 200, {"results": portfolio_records(scored)}
+    except Exception:
+        return 400, {
+            "status": "error",
+            "message": "Unable to score portfolio. Each business needs revenue and expenses.",
+        }
+
+
+@app.post("/anomalies/detect")
+async def anomalies_detect(payload: AnomalyRequest):
+    # WHY: flag unusual amounts and frequencies per category/counterparty over a transaction history.
+    try:
+        guard = _encryption_guard()
+        if guard:
+            return guard
+        df = pd.DataFrame(payload.transactions)
+        if "amount" not in df.columns:
+            return JSONResponse(
+                status_code=422,
+                content={"status": "error", "message": "Transactions must contain an amount column."},
+            )
+        scored = detect_anomalies_batch(df, config=payload.config)
+        anomalies = anomaly_records(scored)
+        return {"checked": int(len(scored)), "count": len(anomalies), "anomalies": anomalies}
+    except Exception:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": "Unable to detect anomalies. Please verify the payload.",
+            },
+        )
+
+
 @app.post("/gst/check")
 async def gst_check(payload: GSTCheckRequest):
     # WHY: keep GST threshold configurable for regulatory changes.
@@ -268,7 +814,8 @@ async def forecast(payload: ForecastRequest):
         if guard:
             return guard
         df = pd.DataFrame([{"amount": a} for a in payload.amounts])
-        result = forecast_financials(df, growth_rate=payload.growth_rate)
+        with memory_stage("forecast"):
+            result = forecast_financials(df, growth_rate=payload.growth_rate)
         if isinstance(result, dict) and result.get("error"):
             return JSONResponse(status_code=422, content=result)
         return result
@@ -282,13 +829,73 @@ async def forecast(payload: ForecastRequest):
         )
 
 
+@app.post("/forecast/runway")
+async def forecast_runway(payload: RunwayRequest):
+    # WHY: answer "how many months of runway at 90% confidence" with a Monte Carlo distribution.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    # WHY: cap the simulation size so one request stays within an interactive latency budget. Cost
+    # and memory scale with paths x horizon, so the product is capped too (20k x 24 is ~70 ms, ~16 MB).
+    max_paths = int(os.getenv("RUNWAY_MAX_PATHS") or 100_000)
+    max_horizon = int(os.getenv("RUNWAY_MAX_HORIZON_MONTHS") or 120)
+    max_cells = int(os.getenv("RUNWAY_MAX_CELLS") or 20_000 * 24)
+    if not 1 <= payload.paths <= max_paths or not 1 <= payload.horizon_months <= max_horizon:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": f"paths must be 1-{max_paths} and horizon_months 1-{max_horizon}.",
+            },
+        )
+    if payload.paths * payload.horizon_months > max_cells:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": f"paths x horizon_months must not exceed {max_cells}; lower paths for long horizons.",
+            },
+        )
+    df = pd.DataFrame(payload.transactions)
+    result = await run_in_threadpool(
+        simulate_runway,
+        df,
+        payload.starting_balance,
+        horizon_months=payload.horizon_months,
+        paths=payload.paths,
+        seed=payload.seed,
+        method=payload.method,
+    )
+    if result.get("error"):
+        return JSONResponse(status_code=422, content=result)
+    return result
+
+
 @app.post("/working-capital")
 async def working_capital(payload: WorkingCapitalRequest):
     guard = _encryption_guard()
     if guard:
         return guard
-    result = working_capital_analysis(payload.cash_flow)
-    return {"status": result}
+    if payload.invoices is None and payload.bills is None:
+        if payload.cash_flow is None:
+            return JSONResponse(
+                status_code=400,
+                content={"status": "error", "message": "Provide invoices/bills or a cash_flow value."},
+            )
+        # WHY: keep the legacy single-number response for existing clients.
+        result = working_capital_analysis(payload.cash_flow)
+        return {"status": result}
+    try:
+        return working_capital_metrics(
+            invoices=payload.invoices,
+            bills=payload.bills,
+            transactions=payload.transactions,
+            as_of=payload.as_of,
+            period_days=payload.period_days,
+            inventory=payload.inventory,
+        )
+    except (ValueError, TypeError) as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
 
 
 @app.get("/integrations/status")
@@ -405,3 +1012,237 @@ async def list_integration_snapshots(user_id: Optional[int] = None, source: Opti
         }
     finally:
         db.close()
+
+
+@app.get("/transactions/search")
+async def transactions_search(
+    q: str,
+    user_id: int,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    # WHY: "all payments to X" via the FTS index instead of a LIKE scan over the whole ledger.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    try:
+        before_id = int(cursor) if cursor else None
+    except ValueError:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": "Invalid cursor value."},
+        )
+    db = SessionLocal()
+    try:
+        return search_transactions(
+            db,
+            q,
+            user_id=user_id,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=before_id,
+            limit=limit,
+        )
+    finally:
+        db.close()
+
+
+@app.post("/archive/{user_id}")
+async def archive_transactions(user_id: int, as_of: Optional[str] = None):
+    # WHY: closed months move to compressed columnar files so re-analysis skips the ORM.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    db = SessionLocal()
+    try:
+        months = await run_in_threadpool(archive_user_transactions, db, user_id, get_archive(), as_of)
+        return {"user_id": user_id, "archived_months": months}
+    except RuntimeError as e:
+        return JSONResponse(status_code=503, content={"status": "error", "message": str(e)})
+    finally:
+        db.close()
+
+
+@app.get("/archive/{user_id}/analysis")
+async def archive_analysis(
+    user_id: int,
+    start_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    end_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    period: Optional[str] = Query(None, pattern="^(month|quarter)$", description="Add per-period metrics"),
+    rolling_window: Optional[int] = Query(None, ge=2, le=24, description="Rolling window size in periods"),
+):
+    # WHY: multi-year analyses read only the months and columns the metrics need.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    try:
+        df = await run_in_threadpool(
+            get_archive().read,
+            user_id,
+            ["date", "description", "amount"],
+            start_month,
+            end_month,
+        )
+    except RuntimeError as e:
+        return JSONResponse(status_code=503, content={"status": "error", "message": str(e)})
+    # WHY: archived amounts are signed ledger values; explicit in/out columns keep expense-only
+    # ranges from being read as the ambiguous "all one sign" CSV case.
+    df["cash_in"] = df["amount"].clip(lower=0)
+    df["cash_out"] = -df["amount"].clip(upper=0)
+    result = analyze_financials(df.drop(columns=["amount"]), include_transactions=False, period=period, rolling_window=rolling_window)
+    if result.get("status") == "clarification_needed":
+        return JSONResponse(status_code=422, content=result)
+    result["months"] = get_archive().months(user_id, start_month, end_month)
+    return result
+
+
+# -----------------------------
+# ASYNC JOBS
+# -----------------------------
+def _run_upload_job(params: dict, input_path: Optional[str], progress) -> Tuple[int, dict]:
+    try:
+        # WHY: jobs run outside any request, so they get their own memory scope and budget.
+        with get_memory_profiler().request("job_upload"), open(input_path, "rb") as source:
+            return _analyze_upload(source, progress=progress, **params)
+    except MemoryBudgetExceeded as e:
+        return 413, {"status": "error", "message": str(e)}
+    except IngestionError as e:
+        return e.status_code, {"status": "error", "message": e.message}
+    except Exception as e:
+        print("🔥 BACKEND ERROR:", str(e))
+        return 400, _UPLOAD_ERROR
+
+
+def _run_portfolio_job(params: dict, input_path: Optional[str], progress) -> Tuple[int, dict]:
+    progress(0.1, "score")
+    return _score_portfolio(params["businesses"], params.get("config"))
+
+
+get_job_queue().register("upload", _run_upload_job)
+get_job_queue().register("portfolio_score", _run_portfolio_job)
+
+
+def _job_accepted(job: dict):
+    links = {
+        "status": f"/jobs/{job['job_id']}",
+        "events": f"/jobs/{job['job_id']}/events",
+        "result": f"/jobs/{job['job_id']}/result",
+    }
+    return JSONResponse(status_code=202, content={**job, "links": links}, headers={"Location": links["status"]})
+
+
+def _job_not_found(job_id: str):
+    return JSONResponse(
+        status_code=404,
+        content={"status": "error", "message": f"Job '{job_id}' was not found or has expired."},
+    )
+
+
+def _tenant(request: Request) -> str:
+    # WHY: the job cap follows the same tenant identity as admission control (registered API key,
+    # else client address); a client-sent user_id is spoofable and would pool all anonymous callers.
+    client_host = request.client.host if request.client else None
+    return get_admission_controller().tenant_for(request.headers.get("x-api-key"), client_host)
+
+
+@app.post("/jobs/upload")
+async def submit_upload_job(
+    request: Request,
+    file: UploadFile = File(..., description="CSV, XLSX or Parquet statement"),
+    mode: str = Query("full", description="'full' embeds all transactions; 'summary' returns a result_id instead"),
+    period: Optional[str] = Query(None, pattern="^(month|quarter)$", description="Add per-period metrics"),
+    rolling_window: Optional[int] = Query(None, ge=2, le=24, description="Rolling window size in periods"),
+    user_id: Optional[int] = Query(None, description="Owner of learned/confirmed column mappings"),
+):
+    # WHY: large files outlive the proxy timeout; accept the file now, analyze it on a worker.
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    try:
+        # Size limits and decompression are enforced up front so a bad file fails at submit time.
+        spooled, _ = await run_in_threadpool(ingest_upload, file.file, file.filename)
+    except IngestionError as e:
+        return JSONResponse(status_code=e.status_code, content={"status": "error", "message": e.message})
+    try:
+        params = {"user_id": user_id, "mode": mode, "period": period, "rolling_window": rolling_window}
+        job = await run_in_threadpool(get_job_queue().submit, "upload", _tenant(request), params, spooled)
+    finally:
+        spooled.close()
+    return _job_accepted(job)
+
+
+@app.post("/jobs/portfolio-score")
+async def submit_portfolio_job(request: Request, payload: PortfolioScoreRequest):
+    guard = _encryption_guard()
+    if guard:
+        return guard
+    params = {"businesses": payload.businesses, "config": payload.config}
+    job = await run_in_threadpool(get_job_queue().submit, "portfolio_score", _tenant(request), params)
+    return _job_accepted(job)
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await run_in_threadpool(get_job_queue().get, job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return job
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    queue = get_job_queue()
+    finished = await run_in_threadpool(queue.result, job_id)
+    if finished is None:
+        job = await run_in_threadpool(queue.get, job_id)
+        if job is None:
+            return _job_not_found(job_id)
+        return JSONResponse(
+            status_code=409,
+            content={"status": "error", "message": f"Job is {job['status']}; the result is not ready yet.", "job": job},
+        )
+    # WHY: the stored result carries the status code the synchronous endpoint would have returned.
+    status_code, content = finished
+    return JSONResponse(status_code=status_code, content=content) if status_code != 200 else content
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    # WHY: push progress as Server-Sent Events so clients need not poll; ends with a "done" event.
+    queue = get_job_queue()
+    if await run_in_threadpool(queue.get, job_id) is None:
+        return _job_not_found(job_id)
+    interval = float(os.getenv("JOB_EVENTS_POLL_SECONDS") or 0.5)
+
+    async def _events():
+        last = None
+        idle = 0.0
+        while True:
+            job = await run_in_threadpool(queue.get, job_id)
+            if job is None:
+                return
+            snapshot = (job["status"], job["progress"], job["stage"])
+            if snapshot != last:
+                last, idle = snapshot, 0.0
+                event = b"done" if job["status"] in TERMINAL_STATES else b"progress"
+                yield b"event: " + event + b"\ndata: " + dumps(job) + b"\n\n"
+                if event == b"done":
+                    return
+            elif idle >= 15:
+                # Comment lines keep idle proxies from closing the stream.
+                idle = 0.0
+                yield b": keep-alive\n\n"
+            await asyncio.sleep(interval)
+            idle += interval
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
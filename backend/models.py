@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -76,3 +76,63 @@ class IntegrationSnapshot(Base):
 
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", back_populates="integration_snapshots")
+
+# -----------------------------
+# ANALYSIS SESSION (CHAT STATE)
+# -----------------------------
+class AnalysisSession(Base):
+    __tablename__ = "analysis_sessions"
+
+    id = Column(String, primary_key=True, index=True)
+    payload = Column(String, nullable=False)  # JSON, encrypted when FINAI_DATA_KEY is set
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)
+
+# -----------------------------
+# COLUMN MAPPING (UPLOAD LAYOUTS)
+# -----------------------------
+class ColumnMapping(Base):
+    __tablename__ = "column_mappings"
+    __table_args__ = (UniqueConstraint("user_id", "signature", name="uq_column_mapping_user_signature"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    signature = Column(String, nullable=False, index=True)  # hash of the normalized header row
+    mapping = Column(String, nullable=False)  # JSON: source_format, columns, dtypes
+    confirmed = Column(Boolean, default=False)  # True when a user confirmed it (vs auto-detected)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+# -----------------------------
+# ANALYSIS JOB (ASYNC QUEUE)
+# -----------------------------
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    tenant = Column(String, nullable=False, index=True)
+    kind = Column(String, nullable=False)  # e.g., upload, portfolio_score
+    status = Column(String, nullable=False, index=True)  # queued, running, succeeded, failed
+    params = Column(String, nullable=False)  # JSON request parameters (encrypted when enabled)
+    input_path = Column(String, nullable=True)  # uploaded file, encrypted when FINAI_DATA_KEY is set
+    progress = Column(Float, default=0.0)
+    stage = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+    worker = Column(String, nullable=True)  # claim token of the worker running the job
+    status_code = Column(Integer, nullable=True)  # HTTP status the synchronous endpoint would return
+    result = Column(String, nullable=True)  # JSON, encrypted when FINAI_DATA_KEY is set
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+# -----------------------------
+# TENANT QUOTA (ADMISSION CONTROL)
+# -----------------------------
+class TenantQuota(Base):
+    __tablename__ = "tenant_quotas"
+
+    tenant = Column(String, primary_key=True)  # "key:<hash>" or "ip:<address>"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)  # epoch seconds of the last refill
@@ -0,0 +1,167 @@
+import importlib.util
+import zipfile
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ingestion import IngestionError, upload_limits
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except Exception:  # pragma: no cover - pyarrow may not be installed in dev
+    pa = None
+    pa_csv = None
+    pa_parquet = None
+
+_PARQUET_MAGIC = b"PAR1"
+_ZIP_MAGIC = b"PK\x03\x04"
+_OLE_MAGIC = b"\xd0\xcf\x11\xe0"  # legacy .xls (and other pre-2007 Office files)
+
+_ARROW_TYPES = {"float64": pa.float64(), "string": pa.string()} if pa is not None else {}
+
+# WHY: prefer the Rust calamine reader when installed; openpyxl (read-only mode via pandas) is the
+# always-available fallback.
+_XLSX_ENGINES = [
+    engine
+    for engine, module in (("calamine", "python_calamine"), ("openpyxl", "openpyxl"))
+    if importlib.util.find_spec(module)
+]
+
+
+def detect_format(source: BinaryIO) -> str:
+    """
+    Identify an upload as csv, xlsx or parquet from its leading bytes, never from the file name.
+    """
+    head = source.read(8)
+    source.seek(0)
+    if head.startswith(_PARQUET_MAGIC):
+        return "parquet"
+    if head.startswith(_ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(source) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile:
+            names = set()
+        finally:
+            source.seek(0)
+        if "[Content_Types].xml" in names and any(name.startswith("xl/") for name in names):
+            return "xlsx"
+        raise IngestionError("Unsupported zip content. Upload a CSV, XLSX or Parquet file.", status_code=415)
+    if head.startswith(_OLE_MAGIC):
+        raise IngestionError("Legacy .xls files are not supported. Save the sheet as .xlsx or CSV.", status_code=415)
+    return "csv"
+
+
+def read_header(source: BinaryIO) -> Tuple[str, List[str]]:
+    """
+    Detected format plus the header row only (no data rows are parsed), rewound afterwards.
+    """
+    file_format = detect_format(source)
+    try:
+        if file_format == "parquet":
+            if pa_parquet is None:
+                raise IngestionError("Parquet uploads need pyarrow installed on the server.", status_code=415)
+            columns = list(pa_parquet.ParquetFile(source).schema_arrow.names)
+        elif file_format == "xlsx":
+            columns = list(pd.read_excel(source, nrows=0, engine=_XLSX_ENGINES[0] if _XLSX_ENGINES else None).columns)
+        else:
+            columns = list(pd.read_csv(source, nrows=0).columns)
+    except IngestionError:
+        raise
+    except Exception:
+        # An unreadable header is reported by the full parse that follows.
+        columns = []
+    finally:
+        source.seek(0)
+    return file_format, [str(column) for column in columns]
+
+
+def read_table(
+    source: BinaryIO,
+    max_rows: Optional[int] = None,
+    engine: Optional[str] = None,
+    usecols: Optional[List[str]] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    Parse an upload into a DataFrame with the fastest available engine for its detected format,
+    falling back to pandas' default parser when the fast path fails. Pass engine to force one
+    (csv: pyarrow/pandas, xlsx: calamine/openpyxl). usecols/dtypes ("float64" or "string") come
+    from a stored column mapping and skip unused columns and type inference. Returns the frame and
+    {"file_format", "engine"}.
+    """
+    file_format = detect_format(source)
+    if file_format == "parquet":
+        df, used = _read_parquet(source, max_rows, usecols), "pyarrow"
+    elif file_format == "xlsx":
+        df, used = _read_xlsx(source, engine, usecols, dtypes, max_rows)
+    else:
+        df, used = _read_csv(source, engine, usecols, dtypes)
+    if max_rows is not None and len(df) > max_rows:
+        raise IngestionError(f"Upload exceeds the {max_rows:,} row limit.", status_code=413)
+    return df, {"file_format": file_format, "engine": used}
+
+
+def _read_csv(
+    source: BinaryIO, engine: Optional[str], usecols: Optional[List[str]], dtypes: Optional[Dict[str, str]]
+) -> Tuple[pd.DataFrame, str]:
+    if engine in (None, "pyarrow") and pa_csv is not None:
+        try:
+            # WHY: Arrow's CSV reader parses blocks on multiple threads and builds columns directly.
+            options = pa_csv.ConvertOptions(
+                include_columns=usecols,
+                column_types={column: _ARROW_TYPES[kind] for column, kind in (dtypes or {}).items()},
+            )
+            return pa_csv.read_csv(source, convert_options=options).to_pandas(), "pyarrow"
+        except Exception as e:
+            if engine == "pyarrow":
+                raise IngestionError(f"Unable to parse the CSV file: {e}") from e
+            # Arrow is stricter about ragged rows and mixed quoting; the C parser is more forgiving.
+            source.seek(0)
+    return pd.read_csv(source, usecols=usecols, dtype=_pandas_dtypes(dtypes)), "pandas"
+
+
+def _read_xlsx(
+    source: BinaryIO,
+    engine: Optional[str],
+    usecols: Optional[List[str]],
+    dtypes: Optional[Dict[str, str]],
+    max_rows: Optional[int] = None,
+) -> Tuple[pd.DataFrame, str]:
+    engines = [engine] if engine else _XLSX_ENGINES
+    if not engines:
+        raise IngestionError("XLSX uploads need openpyxl installed on the server.", status_code=415)
+    last_error: Optional[Exception] = None
+    for name in engines:
+        try:
+            # WHY: one row past the cap is enough for read_table to reject the sheet without parsing all of it.
+            nrows = None if max_rows is None else max_rows + 1
+            frame = pd.read_excel(source, engine=name, usecols=usecols, dtype=_pandas_dtypes(dtypes), nrows=nrows)
+            return frame, name
+        except Exception as e:
+            last_error = e
+            source.seek(0)
+    raise IngestionError(f"Unable to read the XLSX file: {last_error}") from last_error
+
+
+def _read_parquet(source: BinaryIO, max_rows: Optional[int], usecols: Optional[List[str]] = None) -> pd.DataFrame:
+    if pa_parquet is None:
+        raise IngestionError("Parquet uploads need pyarrow installed on the server.", status_code=415)
+    parquet_file = pa_parquet.ParquetFile(source)
+    # WHY: the footer carries the row count, so over-limit files fail before any column is decoded.
+    if max_rows is not None and parquet_file.metadata.num_rows > max_rows:
+        raise IngestionError(f"Upload exceeds the {max_rows:,} row limit.", status_code=413)
+    # Row groups record their uncompressed size, so a small file that decodes to gigabytes fails here too.
+    max_bytes = upload_limits()["max_bytes"]
+    metadata = parquet_file.metadata
+    if sum(metadata.row_group(index).total_byte_size for index in range(metadata.num_row_groups)) > max_bytes:
+        raise IngestionError(f"Upload exceeds the {max_bytes:,} byte limit.", status_code=413)
+    return parquet_file.read(columns=usecols).to_pandas()
+
+
+def _pandas_dtypes(dtypes: Optional[Dict[str, str]]) -> Optional[Dict[str, object]]:
+    if not dtypes:
+        return None
+    return {column: float if kind == "float64" else str for column, kind in dtypes.items()}
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+import pandas as pd
+
+
+class ResultStore:
+    # WHY: keep analyzed transaction frames server-side so /upload can return a small summary
+    # plus a handle, and rows are served later page by page or as a stream. Memory is bounded by
+    # entry count and frame bytes; the newest result is always kept.
+    def __init__(self, max_entries: int = 32, ttl_seconds: float = 900.0, max_bytes: int = 512 * 1024 * 1024):
+        self._max_entries = max(1, int(max_entries))
+        self._ttl_seconds = float(ttl_seconds)
+        self._max_bytes = int(max_bytes)
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, frame: pd.DataFrame) -> str:
+        result_id = uuid.uuid4().hex
+        # Deep sizing walks object columns, so it runs before taking the lock.
+        size = int(frame.memory_usage(deep=True).sum())
+        with self._lock:
+            self._evict_expired()
+            self._items[result_id] = (time.monotonic(), frame, size)
+            self._total_bytes += size
+            while len(self._items) > 1 and (
+                len(self._items) > self._max_entries or self._total_bytes > self._max_bytes
+            ):
+                # WHY: bound memory by dropping the least recently used result first.
+                self._drop(next(iter(self._items)))
+        return result_id
+
+    def get(self, result_id: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            self._evict_expired()
+            entry = self._items.get(result_id)
+            if entry is None:
+                return None
+            self._items.move_to_end(result_id)
+            return entry[1]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict_expired()
+            return len(self._items)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict_expired()
+            return {"results": len(self._items), "bytes": self._total_bytes, "max_bytes": self._max_bytes}
+
+    def _drop(self, result_id: str) -> None:
+        _, _, size = self._items.pop(result_id)
+        self._total_bytes -= size
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, (created, _, _) in self._items.items() if now - created > self._ttl_seconds]
+        for key in expired:
+            self._drop(key)
+
+
+_store: Optional[ResultStore] = None
+
+
+def get_result_store() -> ResultStore:
+    global _store
+    if _store is None:
+        _store = ResultStore(
+            max_entries=int(os.getenv("RESULT_STORE_MAX_ENTRIES") or 32),
+            ttl_seconds=float(os.getenv("RESULT_STORE_TTL_SECONDS") or 900),
+            max_bytes=int(os.getenv("RESULT_STORE_MAX_BYTES") or 512 * 1024 * 1024),
+        )
+    return _store
@@ -1,5 +1,10 @@
 import os
-from typing import Optional
+import shutil
+import struct
+from typing import BinaryIO, Optional
+
+_STREAM_CHUNK_BYTES = 1024 * 1024
+_FRAME_HEADER = struct.Struct(">I")
 
 
 try:
@@ -29,6 +34,43 @@ class EncryptionManager:
             return value
         return self._fernet.decrypt(value.encode("utf-8")).decode("utf-8")
 
+    def encrypt_bytes(self, value: bytes) -> bytes:
+        if not self._fernet:
+            return value
+        return self._fernet.encrypt(value)
+
+    def decrypt_bytes(self, value: bytes) -> bytes:
+        if not self._fernet:
+            return value
+        return self._fernet.decrypt(value)
+
+    def encrypt_stream(self, source: BinaryIO, target: BinaryIO, chunk_size: int = _STREAM_CHUNK_BYTES) -> None:
+        # WHY: Fernet seals whole messages; length-prefixed tokens per chunk keep memory flat for large files.
+        if not self._fernet:
+            shutil.copyfileobj(source, target)
+            return
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            token = self._fernet.encrypt(chunk)
+            target.write(_FRAME_HEADER.pack(len(token)))
+            target.write(token)
+
+    def decrypt_stream(self, source: BinaryIO, target: BinaryIO) -> None:
+        if not self._fernet:
+            shutil.copyfileobj(source, target)
+            return
+        while True:
+            header = source.read(_FRAME_HEADER.size)
+            if not header:
+                break
+            (length,) = _FRAME_HEADER.unpack(header)
+            token = source.read(length)
+            if len(header) != _FRAME_HEADER.size or len(token) != length:
+                raise InvalidToken()
+            target.write(self._fernet.decrypt(token))
+
     def safe_decrypt(self, value: str) -> str:
         if not self._fernet:
             return value
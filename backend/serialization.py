@@ -0,0 +1,113 @@
+import datetime
+import decimal
+import functools
+import inspect
+import json
+import math
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from starlette.responses import JSONResponse, Response
+
+from instrumentation import memory_stage
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency in dev
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # WHY: pandas/NumPy scalars leak out of analysis results; convert them instead of failing the response.
+    if value is pd.NaT:
+        return None
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        number = float(value)
+        return None if math.isnan(number) or math.isinf(number) else number
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, pd.Timedelta):
+        return value.total_seconds()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize API content to JSON bytes, using orjson when installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    # WHY: single response class for the whole app so every endpoint gets the fast path.
+    def render(self, content: Any) -> bytes:
+        with memory_stage("serialize"):
+            return dumps(content)
+
+
+def _wrap_endpoint(endpoint: Callable, status_code: int) -> Callable:
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            return FastJSONResponse(result, status_code=status_code)
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        result = endpoint(*args, **kwargs)
+        if isinstance(result, Response):
+            return result
+        return FastJSONResponse(result, status_code=status_code)
+
+    return sync_wrapper
+
+
+class FastJSONRoute(APIRoute):
+    # WHY: FastAPI runs jsonable_encoder on every plain dict before the response class sees it,
+    # which is slow for large row lists and rejects NumPy scalars. Returning a ready Response skips it.
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        if _uses_default_serialization(endpoint, kwargs.get("response_model")):
+            endpoint = _wrap_endpoint(endpoint, kwargs.get("status_code") or 200)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _uses_default_serialization(endpoint: Callable, response_model: Any) -> bool:
+    # WHY: leave generators and routes with declared response models to FastAPI's own validation.
+    if inspect.isgeneratorfunction(endpoint) or inspect.isasyncgenfunction(endpoint):
+        return False
+    if response_model is not None and not (
+        isinstance(response_model, DefaultPlaceholder) and response_model.value is None
+    ):
+        return False
+    return inspect.signature(endpoint).return_annotation is inspect.Signature.empty
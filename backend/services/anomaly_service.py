@@ -0,0 +1,314 @@
+import math
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.bookkeeping_services import categorize_description, categorize_series
+
+_NON_LETTERS = re.compile(r"[^a-z\s]")
+
+DEFAULT_ANOMALY_CONFIG: Dict[str, float] = {
+    # WHY: thresholds are overrideable per call; defaults favour few, high-confidence flags.
+    "amount_z_threshold": 3.5,
+    "iqr_multiplier": 3.0,
+    "frequency_z_threshold": 3.5,
+    "min_history": 8,
+}
+
+
+class RunningStats:
+    # WHY: Welford's algorithm gives a numerically stable mean/variance with O(1) memory and updates.
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def zscore(self, value: float) -> Optional[float]:
+        std = math.sqrt(self.variance)
+        if self.count < 2 or std == 0:
+            return None
+        return (value - self.mean) / std
+
+
+class P2Quantile:
+    # WHY: the P-squared algorithm (Jain & Chlamtac) tracks a quantile with five markers, so robust
+    # thresholds cost O(1) memory and time per transaction instead of keeping every amount.
+    __slots__ = ("p", "_initial", "_q", "_n", "_np", "_dn")
+
+    def __init__(self, p: float):
+        self.p = p
+        self._initial: List[float] = []
+        self._q: List[float] = []
+        self._n: List[int] = []
+        self._np: List[float] = []
+        self._dn = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def update(self, value: float) -> None:
+        if len(self._initial) < 5:
+            self._initial.append(value)
+            if len(self._initial) == 5:
+                self._q = sorted(self._initial)
+                self._n = [0, 1, 2, 3, 4]
+                self._np = [0.0, 2 * self.p, 4 * self.p, 2 + 2 * self.p, 4.0]
+            return
+
+        q, n = self._q, self._n
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= value < q[i + 1])
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._np[i] += self._dn[i]
+
+        for i in range(1, 4):
+            d = self._np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = candidate
+                n[i] += step
+
+    def value(self) -> Optional[float]:
+        if self._q:
+            return self._q[2]
+        if not self._initial:
+            return None
+        ordered = sorted(self._initial)
+        return ordered[min(int(round(self.p * (len(ordered) - 1))), len(ordered) - 1)]
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._q, self._n
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+
+class _AmountProfile:
+    __slots__ = ("stats", "q1", "q3")
+
+    def __init__(self):
+        self.stats = RunningStats()
+        self.q1 = P2Quantile(0.25)
+        self.q3 = P2Quantile(0.75)
+
+    def update(self, value: float) -> None:
+        self.stats.update(value)
+        self.q1.update(value)
+        self.q3.update(value)
+
+
+class AnomalyDetector:
+    """
+    Streaming transaction anomaly detector. Each update scores a transaction against the history
+    seen so far for its category and counterparty, then folds it in; all work is O(1) per row.
+    """
+
+    def __init__(self, config: Optional[Dict[str, float]] = None):
+        self.config = {**DEFAULT_ANOMALY_CONFIG, **(config or {})}
+        self._amounts: Dict[tuple, _AmountProfile] = {}
+        self._gaps: Dict[str, RunningStats] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._sequence = 0
+
+    def update(self, description, amount, timestamp: Optional[float] = None) -> dict:
+        """
+        Score one transaction. timestamp is in days (e.g. from a date); without it the arrival
+        order is used. Returns {"is_anomaly", "reasons", "category", "counterparty", ...scores}.
+        """
+        cfg = self.config
+        amount_value = float(amount)
+        value = abs(amount_value)
+        category = categorize_description(description, amount_value)
+        counterparty = counterparty_key(description)
+        timestamp = float(self._sequence if timestamp is None else timestamp)
+        self._sequence += 1
+
+        reasons = []
+        scores = {}
+        for scope, group in (("category", category), ("counterparty", counterparty)):
+            key = (scope, group)
+            profile = self._amounts.get(key)
+            if profile is None:
+                profile = self._amounts[key] = _AmountProfile()
+            if profile.stats.count >= cfg["min_history"]:
+                z = profile.stats.zscore(value)
+                scores[f"amount_z_{scope}"] = round(z, 3) if z is not None else None
+                if z is not None and abs(z) > cfg["amount_z_threshold"]:
+                    reasons.append(f"Amount is unusual for this {scope}")
+                elif scope == "counterparty" and _outside_fence(value, profile.q1.value(), profile.q3.value(), cfg):
+                    reasons.append("Amount is outside the usual range for this counterparty")
+            profile.update(value)
+
+        last = self._last_seen.get(counterparty)
+        if last is not None:
+            gap = timestamp - last
+            gaps = self._gaps.setdefault(counterparty, RunningStats())
+            if gaps.count >= cfg["min_history"]:
+                z = gaps.zscore(gap)
+                scores["gap_z"] = round(z, 3) if z is not None else None
+                if z is not None and abs(z) > cfg["frequency_z_threshold"]:
+                    reasons.append("Unusual frequency for this counterparty")
+            gaps.update(gap)
+        self._last_seen[counterparty] = timestamp
+
+        return {
+            "is_anomaly": bool(reasons),
+            "reasons": reasons,
+            "category": category,
+            "counterparty": counterparty,
+            **scores,
+        }
+
+
+def detect_anomalies_batch(df: pd.DataFrame, config: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Vectorized backfill over a full history (description, amount, optional date). Z-scores and IQR
+    fences use only prior rows per group, like the streaming detector.
+    """
+    cfg = {**DEFAULT_ANOMALY_CONFIG, **(config or {})}
+    frame = pd.DataFrame(
+        {
+            "description": df["description"] if "description" in df.columns else "",
+            "amount": pd.to_numeric(df["amount"], errors="coerce").fillna(0.0).astype(float),
+        },
+        index=df.index,
+    )
+    if "date" in df.columns:
+        dates = pd.to_datetime(df["date"], errors="coerce")
+        frame["timestamp"] = (dates - pd.Timestamp(0)) / pd.Timedelta(days=1)
+    else:
+        frame["timestamp"] = np.arange(len(frame), dtype=float)
+
+    # WHY: score in time order so "prior history" means earlier transactions, then restore input order.
+    frame = frame.sort_values("timestamp", kind="stable")
+    value = frame["amount"].abs()
+    frame["category"] = categorize_series(frame["description"], frame["amount"])
+    frame["counterparty"] = counterparty_keys(frame["description"])
+
+    reasons = pd.Series([[] for _ in range(len(frame))], index=frame.index, dtype=object)
+    flagged = pd.Series(False, index=frame.index)
+    for scope in ("category", "counterparty"):
+        z, history = _prior_zscores(value, frame[scope])
+        frame[f"amount_z_{scope}"] = z.round(3)
+        hit = (history >= cfg["min_history"]) & (z.abs() > cfg["amount_z_threshold"])
+        _append_reason(reasons, hit, f"Amount is unusual for this {scope}")
+        flagged |= hit
+        if scope == "counterparty":
+            q1, q3 = _prior_quantiles(value, frame[scope], (0.25, 0.75))
+            iqr = q3 - q1
+            fence = (history >= cfg["min_history"]) & ~hit & (
+                (value > q3 + cfg["iqr_multiplier"] * iqr) | (value < q1 - cfg["iqr_multiplier"] * iqr)
+            ) & (iqr > 0)
+            _append_reason(reasons, fence, "Amount is outside the usual range for this counterparty")
+            flagged |= fence
+
+    gaps = frame.groupby("counterparty")["timestamp"].diff()
+    has_gap = gaps.notna()
+    gap_z, gap_history = _prior_zscores(gaps[has_gap], frame.loc[has_gap, "counterparty"])
+    frame["gap_z"] = gap_z.reindex(frame.index).round(3)
+    gap_hit = ((gap_history >= cfg["min_history"]) & (gap_z.abs() > cfg["frequency_z_threshold"])).reindex(
+        frame.index, fill_value=False
+    )
+    _append_reason(reasons, gap_hit, "Unusual frequency for this counterparty")
+    flagged |= gap_hit
+
+    frame["reasons"] = reasons
+    frame["is_anomaly"] = flagged
+    return frame.drop(columns=["timestamp"]).reindex(df.index)
+
+
+def anomaly_records(scored: pd.DataFrame) -> List[dict]:
+    # WHY: return only flagged rows, with JSON-safe scores, so responses stay small on long histories.
+    flagged = scored[scored["is_anomaly"]]
+    records = []
+    for index, row in zip(flagged.index.tolist(), flagged.to_dict("records")):
+        records.append(
+            {
+                "index": index,
+                "description": str(row["description"]),
+                "amount": round(float(row["amount"]), 2),
+                "category": row["category"],
+                "counterparty": row["counterparty"],
+                "reasons": row["reasons"],
+                "amount_z_category": _finite(row.get("amount_z_category")),
+                "amount_z_counterparty": _finite(row.get("amount_z_counterparty")),
+                "gap_z": _finite(row.get("gap_z")),
+            }
+        )
+    return records
+
+
+def _finite(value) -> Optional[float]:
+    if value is None or not np.isfinite(value):
+        return None
+    return float(value)
+
+
+def counterparty_key(description) -> str:
+    # WHY: group "UPI/ACME TRADERS/123" and "Acme Traders 456" under one counterparty.
+    words = _NON_LETTERS.sub(" ", str(description).lower()).split()
+    return " ".join(words[:3])
+
+
+def counterparty_keys(descriptions: pd.Series) -> pd.Series:
+    words = descriptions.astype(str).str.lower().str.replace(_NON_LETTERS, " ", regex=True).str.split()
+    return words.str[:3].str.join(" ")
+
+
+def _prior_zscores(values: pd.Series, keys: pd.Series):
+    # Running mean/variance of the rows *before* each row within its group, via grouped cumsums.
+    # WHY: sums of squares cancel catastrophically on large amounts (1e9 +/- 1 gives NaN), so each
+    # group is shifted by its first value first; variance is shift-invariant and the deviations
+    # stay small, which keeps the result in line with the streaming Welford update.
+    history = values.groupby(keys).cumcount()
+    centered = values - values.groupby(keys).transform("first")
+    prior_sum = centered.groupby(keys).cumsum() - centered
+    prior_sq = (centered * centered).groupby(keys).cumsum() - centered * centered
+    mean = prior_sum / history.where(history > 0)
+    variance = (prior_sq - history * mean * mean) / (history - 1).where(history > 1)
+    std = np.sqrt(variance.clip(lower=0))
+    z = (centered - mean) / std.where(std > 1e-9)
+    return z, history
+
+
+def _prior_quantiles(values: pd.Series, keys: pd.Series, quantiles) -> List[pd.Series]:
+    # Expanding quantiles of the rows *before* each row within its group, so a row is never judged
+    # against itself or later rows (the streaming P-squared markers only see the past).
+    prior = values.groupby(keys).shift()
+    expanding = prior.groupby(keys).expanding()
+    return [expanding.quantile(q).droplevel(0).reindex(values.index) for q in quantiles]
+
+
+def _outside_fence(value: float, q1: Optional[float], q3: Optional[float], cfg: Dict[str, float]) -> bool:
+    if q1 is None or q3 is None or q3 <= q1:
+        return False
+    iqr = q3 - q1
+    return value > q3 + cfg["iqr_multiplier"] * iqr or value < q1 - cfg["iqr_multiplier"] * iqr
+
+
+def _append_reason(reasons: pd.Series, mask: pd.Series, reason: str) -> None:
+    for index in mask[mask].index:
+        reasons.at[index] = reasons.at[index] + [reason]
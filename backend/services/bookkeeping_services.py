@@ -1,3 +1,7 @@
+import numpy as np
+import pandas as pd
+
+
 def categorize_transactions(df):
     if df is None or "description" not in df.columns or "amount" not in df.columns:
         return {"error": "CSV must contain description and amount columns"}
@@ -11,16 +15,37 @@ def categorize_transactions(df):
         except (TypeError, ValueError):
             amount_value = 0
 
-        if "rent" in desc:
-            cat = "Rent"
-        elif "salary" in desc:
-            cat = "Salary"
-        elif amount_value > 0:
-            cat = "Revenue"
-        else:
-            cat = "Other Expense"
+        cat = categorize_description(desc, amount_value)
 
         categories.append(
             {"description": row.get("description", ""), "amount": amount_value, "category": cat}
         )
     return categories
+
+
+def categorize_description(description, amount):
+    desc = str(description).lower()
+    if "rent" in desc:
+        return "Rent"
+    if "salary" in desc:
+        return "Salary"
+    if amount > 0:
+        return "Revenue"
+    return "Other Expense"
+
+
+def categorize_series(descriptions, amounts):
+    # WHY: vectorized form of categorize_description for large frames (same rules, same order).
+    desc = descriptions.astype(str).str.lower()
+    return pd.Series(
+        np.select(
+            [
+                desc.str.contains("rent", regex=False, na=False),
+                desc.str.contains("salary", regex=False, na=False),
+                amounts > 0,
+            ],
+            ["Rent", "Salary", "Revenue"],
+            default="Other Expense",
+        ),
+        index=descriptions.index,
+    )
@@ -1,3 +1,11 @@
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+RUNWAY_METHODS = ("bootstrap", "normal")
+
+
 def forecast_financials(df, growth_rate=0.05):
     # WHY: allow growth rate to be configurable for different business conditions.
     if df is None or "amount" not in df.columns:
@@ -9,3 +17,98 @@ def forecast_financials(df, growth_rate=0.05):
         "next_month": round(monthly_avg * (1 + float(growth_rate)), 2),
         "three_months": round(monthly_avg * 3, 2),
     }
+
+
+def simulate_runway(
+    df,
+    starting_balance: float,
+    horizon_months: int = 24,
+    paths: int = 20_000,
+    seed: Optional[int] = None,
+    method: str = "bootstrap",
+    quantiles: Sequence[float] = (0.1, 0.25, 0.5, 0.75, 0.9),
+    min_months: int = 3,
+):
+    """
+    Monte Carlo cash runway. Monthly inflow/outflow totals come from the ledger (date plus a signed
+    amount, or cash_in/cash_out). "bootstrap" resamples whole historical months (keeping each month's
+    inflow and outflow together); "normal" draws net flow from a normal fit. Every path is simulated
+    at once as a (paths, horizon) array; pass seed for reproducible results.
+    """
+    if method not in RUNWAY_METHODS:
+        return {"error": f"Unsupported method '{method}'. Use one of: {', '.join(RUNWAY_METHODS)}"}
+    monthly = _monthly_flows(df)
+    if isinstance(monthly, dict):
+        return monthly
+    if len(monthly) < min_months:
+        return {"error": f"At least {min_months} months of dated transactions are needed to simulate runway"}
+
+    rng = np.random.default_rng(seed)
+    inflow = monthly["inflow"].to_numpy(dtype=float)
+    outflow = monthly["outflow"].to_numpy(dtype=float)
+    if method == "bootstrap":
+        picks = rng.integers(0, len(monthly), size=(paths, horizon_months))
+        net = inflow[picks] - outflow[picks]
+    else:
+        history = inflow - outflow
+        net = rng.normal(history.mean(), history.std(ddof=1), size=(paths, horizon_months))
+
+    balances = float(starting_balance) + np.cumsum(net, axis=1)
+    short = balances < 0
+    ran_out = short.any(axis=1)
+    # WHY: runway is the first month the balance goes negative; paths that never do are censored at
+    # horizon + 1 and their quantiles are reported as None ("beyond horizon"), not a made-up number.
+    runway = np.where(ran_out, short.argmax(axis=1) + 1, horizon_months + 1)
+    shortfall_by_month = np.cumsum(np.bincount(runway, minlength=horizon_months + 2)[1:-1]) / paths
+    fan = np.percentile(balances, [10, 50, 90], axis=0)
+
+    return {
+        "method": method,
+        "paths": int(paths),
+        "horizon_months": int(horizon_months),
+        "seed": seed,
+        "history_months": int(len(monthly)),
+        "mean_monthly_inflow": round(float(inflow.mean()), 2),
+        "mean_monthly_outflow": round(float(outflow.mean()), 2),
+        "probability_of_shortfall": round(float(ran_out.mean()), 4),
+        "runway_quantiles": {
+            f"p{int(round(q * 100))}": _runway_value(np.quantile(runway, q, method="lower"), horizon_months)
+            for q in quantiles
+        },
+        "shortfall_curve": [
+            {"month": month, "probability": round(float(p), 4)}
+            for month, p in enumerate(shortfall_by_month, start=1)
+        ],
+        "balance_bands": [
+            {"month": month, "p10": round(float(low), 2), "p50": round(float(mid), 2), "p90": round(float(high), 2)}
+            for month, (low, mid, high) in enumerate(zip(*fan), start=1)
+        ],
+    }
+
+
+def _monthly_flows(df):
+    if df is None or df.empty or "date" not in df.columns:
+        return {"error": "Missing 'date' column for runway simulation"}
+    dates = pd.to_datetime(df["date"], errors="coerce")
+    if "cash_in" in df.columns and "cash_out" in df.columns:
+        inflow = pd.to_numeric(df["cash_in"], errors="coerce").fillna(0.0).abs()
+        outflow = pd.to_numeric(df["cash_out"], errors="coerce").fillna(0.0).abs()
+    elif "amount" in df.columns:
+        amount = pd.to_numeric(df["amount"], errors="coerce").fillna(0.0)
+        inflow = amount.clip(lower=0)
+        outflow = -amount.clip(upper=0)
+    else:
+        return {"error": "Missing 'amount' (or cash_in/cash_out) columns for runway simulation"}
+
+    dated = dates.notna()
+    months = dates[dated].dt.to_period("M")
+    monthly = pd.DataFrame({"inflow": inflow[dated], "outflow": outflow[dated]}).groupby(months).sum()
+    if not monthly.empty:
+        # WHY: months with no activity are real zero-flow months and must be resampled too.
+        full_range = pd.period_range(monthly.index.min(), monthly.index.max(), freq="M")
+        monthly = monthly.reindex(full_range, fill_value=0.0)
+    return monthly
+
+
+def _runway_value(value, horizon_months: int):
+    return None if value > horizon_months else int(value)
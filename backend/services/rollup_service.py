@@ -0,0 +1,247 @@
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from services.anomaly_service import counterparty_keys
+from services.bookkeeping_services import categorize_series
+
+DEFAULT_ROLLUP_CONFIG: Dict[str, float] = {
+    # WHY: suggestion thresholds are overrideable per call; defaults favour few, material suggestions.
+    "vendor_concentration_share": 25.0,  # % of total spend with one vendor
+    "category_spike_pct": 20.0,  # month-over-month increase in a category
+    "category_spike_min_amount": 1000.0,
+    "recurring_min_months": 3,
+    "recurring_max_variation": 0.15,  # coefficient of variation of monthly spend
+    "uncategorized_share": 40.0,  # % of spend left in "Other Expense"
+    "negotiation_savings_rate": 0.05,
+    "recurring_savings_rate": 0.10,
+    "max_suggestions": 8,
+}
+
+# WHY: rent and payroll recur and concentrate by nature; vendor-style advice does not apply to them.
+_FIXED_CATEGORIES = {"Rent", "Salary"}
+_UNCATEGORIZED = "Other Expense"
+
+
+def category_rollup(df: pd.DataFrame, top_n: int = 10, config: Optional[Dict[str, float]] = None) -> dict:
+    """
+    Per-category and per-counterparty totals, share of spend, month-over-month deltas (when dates
+    are present) and top-N vendors from signed transactions (description, amount, optional date and
+    category), plus rule-based cost-saving suggestions. Rows are grouped once by
+    (category, counterparty, month); every other figure is derived from that small aggregate.
+    """
+    if df is None or "description" not in df.columns or "amount" not in df.columns:
+        return {"error": "Transactions must contain description and amount columns"}
+    cfg = {**DEFAULT_ROLLUP_CONFIG, **(config or {})}
+
+    amount = pd.to_numeric(df["amount"], errors="coerce").fillna(0.0).astype(float)
+    descriptions = df["description"].fillna("").astype(str)
+    category = categorize_series(descriptions, amount)
+    if "category" in df.columns:
+        # WHY: keep labels the user already assigned; the rules only fill the gaps.
+        given = df["category"].astype("string").str.strip()
+        category = given.where(given.notna() & (given != ""), category).astype(str)
+    month = pd.Series("", index=df.index)
+    if "date" in df.columns:
+        periods = pd.to_datetime(df["date"], errors="coerce").dt.to_period("M")
+        month = periods.astype(str).where(periods.notna(), "")
+
+    frame = pd.DataFrame(
+        {
+            "category": category.values,
+            "counterparty": counterparty_keys(descriptions).replace("", "unknown").values,
+            "month": month.values,
+            "spend": (-amount).clip(lower=0).values,
+            "inflow": amount.clip(lower=0).values,
+        }
+    )
+    base = frame.groupby(["category", "counterparty", "month"], sort=False).agg(
+        spend=("spend", "sum"), inflow=("inflow", "sum"), count=("spend", "size")
+    )
+
+    total_spend = float(base["spend"].sum())
+    total_inflow = float(base["inflow"].sum())
+    months = sorted(value for value in base.index.unique(level="month") if value)
+    latest = months[-1] if months else None
+    previous = str(pd.Period(latest, freq="M") - 1) if latest else None
+
+    category_months = _monthly_spend(base, "category", months)
+    categories = base.groupby(level="category").sum().sort_values("spend", ascending=False)
+    category_rows = []
+    for name, row in categories.iterrows():
+        item = {
+            "category": name,
+            "spend": round(float(row["spend"]), 2),
+            "inflow": round(float(row["inflow"]), 2),
+            "net": round(float(row["inflow"] - row["spend"]), 2),
+            "count": int(row["count"]),
+            "share_of_spend": _share(row["spend"], total_spend),
+        }
+        if latest:
+            item.update(_month_over_month(category_months, name, latest, previous))
+        category_rows.append(item)
+
+    vendors = _vendor_table(base, months, latest, previous, total_spend)
+    top_vendors = vendors.head(max(0, int(top_n)))
+
+    result = {
+        "transaction_count": int(base["count"].sum()),
+        "total_spend": round(total_spend, 2),
+        "total_inflow": round(total_inflow, 2),
+        "net": round(total_inflow - total_spend, 2),
+        "period": {"months": months, "latest_month": latest, "previous_month": previous} if months else None,
+        "categories": category_rows,
+        "vendor_count": int(len(vendors)),
+        "top_vendors": [_vendor_record(name, row, latest) for name, row in top_vendors.iterrows()],
+        "monthly": _monthly_totals(base, months),
+    }
+    result["suggestions"] = _suggestions(result, vendors, cfg)
+    return result
+
+
+def _share(amount: float, total: float) -> float:
+    return round(float(amount) / total * 100, 2) if total else 0.0
+
+
+def _monthly_spend(base: pd.DataFrame, level: str, months: List[str]) -> pd.DataFrame:
+    # Wide (key x month) spend table; rows without a date are left out of month-over-month figures.
+    wide = base["spend"].groupby(level=[level, "month"]).sum().unstack(fill_value=0.0)
+    return wide.reindex(columns=months, fill_value=0.0)
+
+
+def _month_over_month(wide: pd.DataFrame, key, latest: str, previous: str) -> dict:
+    current = float(wide.at[key, latest]) if latest in wide.columns else 0.0
+    prior = float(wide.at[key, previous]) if previous in wide.columns else 0.0
+    return {
+        "latest_month_spend": round(current, 2),
+        "previous_month_spend": round(prior, 2),
+        "mom_change": round(current - prior, 2),
+        "mom_change_pct": round((current - prior) / prior * 100, 1) if prior > 0 else None,
+    }
+
+
+def _vendor_table(
+    base: pd.DataFrame, months: List[str], latest: Optional[str], previous: Optional[str], total_spend: float
+) -> pd.DataFrame:
+    spend_rows = base[base["spend"] > 0]
+    if spend_rows.empty:
+        return pd.DataFrame(columns=["spend", "count", "category", "share_of_spend"])
+    vendors = spend_rows.groupby(level="counterparty")[["spend", "count"]].sum()
+    by_category = spend_rows["spend"].groupby(level=["counterparty", "category"]).sum()
+    vendors["category"] = by_category.groupby(level="counterparty").idxmax().map(lambda key: key[1])
+    vendors["share_of_spend"] = vendors["spend"] / total_spend * 100 if total_spend else 0.0
+
+    monthly = _monthly_spend(spend_rows, "counterparty", months).reindex(vendors.index, fill_value=0.0)
+    active = monthly.where(monthly > 0)
+    vendors["months_active"] = active.count(axis=1)
+    vendors["avg_monthly_spend"] = active.mean(axis=1)
+    # WHY: low variation across many months marks subscription-like charges.
+    vendors["variation"] = active.std(axis=1, ddof=0) / vendors["avg_monthly_spend"]
+    vendors["latest_month_spend"] = monthly[latest] if latest in monthly.columns else 0.0
+    vendors["previous_month_spend"] = monthly[previous] if previous in monthly.columns else 0.0
+    return vendors.sort_values("spend", ascending=False)
+
+
+def _vendor_record(name: str, row: pd.Series, latest: Optional[str]) -> dict:
+    record = {
+        "counterparty": name,
+        "category": row["category"],
+        "spend": round(float(row["spend"]), 2),
+        "count": int(row["count"]),
+        "share_of_spend": round(float(row["share_of_spend"]), 2),
+    }
+    if latest:
+        current, prior = float(row["latest_month_spend"]), float(row["previous_month_spend"])
+        record.update(
+            {
+                "months_active": int(row["months_active"]),
+                "avg_monthly_spend": round(float(row["avg_monthly_spend"]), 2),
+                "latest_month_spend": round(current, 2),
+                "mom_change": round(current - prior, 2),
+                "mom_change_pct": round((current - prior) / prior * 100, 1) if prior > 0 else None,
+            }
+        )
+    return record
+
+
+def _monthly_totals(base: pd.DataFrame, months: List[str]) -> List[dict]:
+    totals = base[["spend", "inflow"]].groupby(level="month").sum().reindex(months, fill_value=0.0)
+    return [
+        {"month": month, "spend": round(float(row["spend"]), 2), "inflow": round(float(row["inflow"]), 2)}
+        for month, row in totals.iterrows()
+    ]
+
+
+def _suggestions(result: dict, vendors: pd.DataFrame, cfg: Dict[str, float]) -> List[dict]:
+    suggestions = []
+    variable = vendors[~vendors["category"].isin(_FIXED_CATEGORIES)] if not vendors.empty else vendors
+
+    for name, row in variable[variable["share_of_spend"] >= cfg["vendor_concentration_share"]].iterrows():
+        suggestions.append(
+            {
+                "type": "vendor_concentration",
+                "target": name,
+                "message": (
+                    f"{row['share_of_spend']:.0f}% of spend goes to '{name}'. Ask for volume pricing "
+                    "or get competing quotes."
+                ),
+                "estimated_savings": round(float(row["spend"]) * cfg["negotiation_savings_rate"], 2),
+            }
+        )
+
+    if not vendors.empty and result["period"] and len(result["period"]["months"]) >= cfg["recurring_min_months"]:
+        recurring = variable[
+            (variable["months_active"] >= cfg["recurring_min_months"])
+            & (variable["variation"] <= cfg["recurring_max_variation"])
+        ]
+        for name, row in recurring.iterrows():
+            suggestions.append(
+                {
+                    "type": "recurring_charge",
+                    "target": name,
+                    "message": (
+                        f"'{name}' charges about {row['avg_monthly_spend']:,.0f} every month. Confirm it is "
+                        "still needed, or switch to annual billing for a discount."
+                    ),
+                    "estimated_savings": round(float(row["spend"]) * cfg["recurring_savings_rate"], 2),
+                }
+            )
+
+    for item in result["categories"]:
+        change_pct = item.get("mom_change_pct")
+        if (
+            item["category"] not in _FIXED_CATEGORIES
+            and change_pct is not None
+            and change_pct >= cfg["category_spike_pct"]
+            and item["mom_change"] >= cfg["category_spike_min_amount"]
+        ):
+            suggestions.append(
+                {
+                    "type": "category_spike",
+                    "target": item["category"],
+                    "message": (
+                        f"{item['category']} spend rose {change_pct:.0f}% in {result['period']['latest_month']} "
+                        f"(+{item['mom_change']:,.0f}). Review the new charges."
+                    ),
+                    "estimated_savings": item["mom_change"],
+                }
+            )
+        if item["category"] == _UNCATEGORIZED and item["share_of_spend"] >= cfg["uncategorized_share"]:
+            suggestions.append(
+                {
+                    "type": "uncategorized_spend",
+                    "target": item["category"],
+                    "message": (
+                        f"{item['share_of_spend']:.0f}% of spend is uncategorized. Label it so that "
+                        "savings opportunities become visible."
+                    ),
+                    "estimated_savings": None,
+                }
+            )
+
+    suggestions.sort(key=lambda item: -(item["estimated_savings"] or 0.0))
+    if not suggestions:
+        suggestions.append(
+            {"type": "none", "target": None, "message": "No cost optimization opportunities detected", "estimated_savings": None}
+        )
+    return suggestions[: int(cfg["max_suggestions"])]
@@ -0,0 +1,149 @@
+import re
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, bindparam, text
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# WHY: an external-content FTS5 table indexes descriptions without duplicating them, and the
+# triggers keep it in sync with every insert/update/delete on transactions.
+_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description,
+        content='transactions',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_id ON transactions (user_id, id)",
+]
+
+
+def ensure_transaction_search_index(engine) -> bool:
+    """
+    Create the FTS5 index and sync triggers (SQLite only). Returns False when full-text search is
+    unavailable, in which case search_transactions falls back to a LIKE scan.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        with engine.begin() as conn:
+            existed = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions_fts'")
+            ).first()
+            for statement in _FTS_DDL:
+                conn.execute(text(statement))
+            if not existed:
+                # WHY: index rows that were inserted before the FTS table existed.
+                conn.execute(text("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')"))
+        return True
+    except Exception:
+        # WHY: SQLite builds without FTS5 still work, just without the fast path.
+        return False
+
+
+def search_transactions(
+    db,
+    query: str,
+    user_id: int,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+) -> dict:
+    """
+    Prefix search over one user's transaction descriptions (every word must match the start of a
+    token), newest first, with amount/date filters and keyset pagination on the transaction id.
+    """
+    if user_id is None:
+        # WHY: an unscoped search would return every tenant's transactions.
+        raise ValueError("Transaction search must be scoped to a user_id")
+    tokens = _TOKEN.findall(query or "")
+    if not tokens:
+        return {"items": [], "next_cursor": None}
+
+    fts = _has_fts(db)
+    filters = []
+    params = {"limit": int(limit) + 1}
+    for name, column, op, value in (
+        ("user_id", "t.user_id", "=", user_id),
+        ("min_amount", "t.amount", ">=", min_amount),
+        ("max_amount", "t.amount", "<=", max_amount),
+        ("start_date", "t.date", ">=", start_date),
+        ("end_date", "t.date", "<=", end_date),
+        ("cursor", "f.rowid" if fts else "t.id", "<", cursor),
+    ):
+        if value is not None:
+            filters.append(f"{column} {op} :{name}")
+            params[name] = value
+
+    if fts:
+        params["match"] = " AND ".join('"' + token.replace('"', '""') + '"*' for token in tokens)
+        # WHY: CROSS JOIN pins the FTS table as the outer loop, so SQLite walks matching rowids
+        # newest-first (cursor bound pushed into the index) and stops at the page limit instead of
+        # probing the full-text index once per candidate transaction.
+        sql = (
+            "SELECT t.id, t.description, t.amount, t.category, t.date, t.user_id "
+            "FROM transactions_fts AS f CROSS JOIN transactions AS t ON t.id = f.rowid "
+            "WHERE f.transactions_fts MATCH :match"
+        )
+        order = "f.rowid"
+    else:
+        # Fallback for databases without FTS5: substring match per word (full scan).
+        like_filters = []
+        for index, token in enumerate(tokens):
+            params[f"like_{index}"] = f"%{token.lower()}%"
+            like_filters.append(f"lower(t.description) LIKE :like_{index}")
+        sql = (
+            "SELECT t.id, t.description, t.amount, t.category, t.date, t.user_id "
+            "FROM transactions t WHERE " + " AND ".join(like_filters)
+        )
+        order = "t.id"
+    if filters:
+        sql += " AND " + " AND ".join(filters)
+    sql += f" ORDER BY {order} DESC LIMIT :limit"
+
+    statement = text(sql)
+    date_params = [name for name in ("start_date", "end_date") if name in params]
+    if date_params:
+        # WHY: bind dates through the column type so SQLite compares them in its stored format.
+        statement = statement.bindparams(*(bindparam(name, type_=DateTime) for name in date_params))
+    rows = db.execute(statement, params).mappings().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [dict(row) for row in rows],
+        "next_cursor": str(rows[-1]["id"]) if has_more and rows else None,
+    }
+
+
+def _has_fts(db) -> bool:
+    bind = db.get_bind() if hasattr(db, "get_bind") else db.engine
+    if bind.dialect.name != "sqlite":
+        return False
+    return db.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions_fts'")
+    ).first() is not None
@@ -1,3 +1,25 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# WHY: aging buckets are (label, lower, upper) days past due; "current" covers items not yet due.
+AGING_BUCKETS = [
+    ("current", -np.inf, 0),
+    ("1-30", 0, 30),
+    ("31-60", 30, 60),
+    ("61-90", 60, 90),
+    ("90+", 90, np.inf),
+]
+
+_ISSUE_COLUMNS = ["invoice_date", "bill_date", "issue_date", "date"]
+_DUE_COLUMNS = ["due_date", "due"]
+_PAID_COLUMNS = ["paid_date", "payment_date", "settled_date"]
+_AMOUNT_COLUMNS = ["amount", "total", "amount_due"]
+_PAID_AMOUNT_COLUMNS = ["paid_amount", "amount_paid"]
+_PARTY_COLUMNS = ["customer", "vendor", "party", "counterparty", "name"]
+
+
 def working_capital_analysis(cash_flow):
     try:
         cash_flow_value = float(cash_flow)
@@ -7,3 +29,250 @@ def working_capital_analysis(cash_flow):
     if cash_flow_value < 0:
         return "Improve collections or consider short-term working capital loan"
     return "Working capital position is healthy"
+
+
+def working_capital_metrics(
+    invoices: Optional[List[dict]] = None,
+    bills: Optional[List[dict]] = None,
+    transactions: Optional[List[dict]] = None,
+    as_of=None,
+    period_days: int = 365,
+    default_terms_days: int = 30,
+    inventory: Optional[float] = None,
+) -> dict:
+    """
+    Receivable/payable aging, DSO/DPO(/DIO), cash conversion cycle and a monthly trend from invoices
+    (receivables) and bills (payables). Each item needs an issue date and amount; due_date defaults
+    to issue + default_terms_days, and an item counts as settled from paid_date (paid_amount defaults
+    to the full amount). Optional signed transactions (date, amount) add monthly cash in/out.
+    """
+    receivables = _documents(invoices, default_terms_days)
+    payables = _documents(bills, default_terms_days)
+    cash = _cash_frame(transactions)
+    as_of = _resolve_as_of(as_of, receivables, payables, cash)
+    window_start = as_of - pd.Timedelta(days=period_days)
+
+    ar_open = _open_amounts(receivables, as_of)
+    ap_open = _open_amounts(payables, as_of)
+    sales = _issued_between(receivables, window_start, as_of)
+    purchases = _issued_between(payables, window_start, as_of)
+
+    dso = _days_ratio(ar_open.sum(), sales, period_days)
+    dpo = _days_ratio(ap_open.sum(), purchases, period_days)
+    # WHY: without inventory data DIO is taken as 0 (a services business), so CCC = DSO - DPO.
+    dio = _days_ratio(inventory, purchases, period_days) if inventory is not None else 0.0
+    ccc = round(dso + dio - dpo, 1) if dso is not None and dpo is not None and dio is not None else None
+
+    result = {
+        "as_of": as_of.date().isoformat(),
+        "period_days": int(period_days),
+        "receivables": _aging_summary(receivables, ar_open, as_of, "customer"),
+        "payables": _aging_summary(payables, ap_open, as_of, "vendor"),
+        "sales": round(sales, 2),
+        "purchases": round(purchases, 2),
+        "dso": dso,
+        "dpo": dpo,
+        "dio": dio,
+        "cash_conversion_cycle": ccc,
+        "trend": _monthly_trend(receivables, payables, cash, as_of),
+    }
+    result["recommendations"] = _recommendations(result)
+    return result
+
+
+def _documents(items: Optional[List[dict]], default_terms_days: int) -> pd.DataFrame:
+    frame = pd.DataFrame(items or [])
+    if frame.empty:
+        return pd.DataFrame(
+            {
+                "issued": pd.Series(dtype="datetime64[ns]"),
+                "due": pd.Series(dtype="datetime64[ns]"),
+                "paid": pd.Series(dtype="datetime64[ns]"),
+                "amount": pd.Series(dtype=float),
+                "paid_amount": pd.Series(dtype=float),
+                "party": pd.Series(dtype=object),
+            }
+        )
+    frame.columns = frame.columns.astype(str).str.strip().str.lower().str.replace(" ", "_")
+    issued = _dates(frame, _ISSUE_COLUMNS)
+    amount_col = _pick(frame, _AMOUNT_COLUMNS)
+    if issued is None or amount_col is None:
+        raise ValueError("Invoices and bills need an issue date and an amount.")
+
+    due = _dates(frame, _DUE_COLUMNS)
+    due = issued + pd.Timedelta(days=default_terms_days) if due is None else due.fillna(
+        issued + pd.Timedelta(days=default_terms_days)
+    )
+    paid = _dates(frame, _PAID_COLUMNS)
+    paid = pd.Series(pd.NaT, index=frame.index, dtype="datetime64[ns]") if paid is None else paid
+    amount = pd.to_numeric(frame[amount_col], errors="coerce").fillna(0.0).abs()
+    paid_amount_col = _pick(frame, _PAID_AMOUNT_COLUMNS)
+    if paid_amount_col:
+        paid_amount = pd.to_numeric(frame[paid_amount_col], errors="coerce")
+        paid_amount = np.minimum(paid_amount.fillna(amount.where(paid.notna(), 0.0)).clip(lower=0), amount)
+    else:
+        paid_amount = amount.where(paid.notna(), 0.0)
+    party_col = _pick(frame, _PARTY_COLUMNS)
+    documents = pd.DataFrame(
+        {
+            "issued": issued,
+            "due": due,
+            "paid": paid,
+            "amount": amount,
+            "paid_amount": paid_amount,
+            "party": frame[party_col].astype(str) if party_col else "unknown",
+        }
+    )
+    return documents[documents["issued"].notna()]
+
+
+def _cash_frame(transactions: Optional[List[dict]]) -> pd.DataFrame:
+    frame = pd.DataFrame(transactions or [])
+    if frame.empty or "date" not in frame.columns or "amount" not in frame.columns:
+        return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "amount": pd.Series(dtype=float)})
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(frame["date"], errors="coerce"),
+            "amount": pd.to_numeric(frame["amount"], errors="coerce").fillna(0.0),
+        }
+    ).dropna(subset=["date"])
+
+
+def _resolve_as_of(as_of, receivables: pd.DataFrame, payables: pd.DataFrame, cash: pd.DataFrame) -> pd.Timestamp:
+    if as_of is not None:
+        return pd.Timestamp(as_of).normalize()
+    latest = [
+        frame[column].max()
+        for frame, column in ((receivables, "issued"), (payables, "issued"), (cash, "date"))
+        if not frame.empty
+    ]
+    latest = [value for value in latest if pd.notna(value)]
+    return max(latest).normalize() if latest else pd.Timestamp.today().normalize()
+
+
+def _open_amounts(documents: pd.DataFrame, as_of: pd.Timestamp) -> pd.Series:
+    # WHY: a payment only counts if it happened on or before as_of, so past dates can be re-evaluated.
+    issued = documents["issued"] <= as_of
+    settled = documents["paid"].notna() & (documents["paid"] <= as_of)
+    unsettled_paid = documents["paid_amount"].where(documents["paid"].isna(), 0.0)
+    open_amount = documents["amount"] - documents["paid_amount"].where(settled, 0.0) - unsettled_paid
+    return open_amount.where(issued, 0.0).clip(lower=0)
+
+
+def _issued_between(documents: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> float:
+    mask = (documents["issued"] > start) & (documents["issued"] <= end)
+    return float(documents.loc[mask, "amount"].sum())
+
+
+def _days_ratio(balance, flow: float, days: int) -> Optional[float]:
+    if balance is None or flow <= 0:
+        return None
+    return round(float(balance) / flow * days, 1)
+
+
+def _aging_summary(documents: pd.DataFrame, open_amount: pd.Series, as_of: pd.Timestamp, party_label: str) -> dict:
+    outstanding = open_amount > 0
+    days_past_due = (as_of - documents.loc[outstanding, "due"]).dt.days
+    amounts = open_amount[outstanding]
+    edges = [bucket[1] for bucket in AGING_BUCKETS] + [np.inf]
+    labels = [bucket[0] for bucket in AGING_BUCKETS]
+    buckets = pd.cut(days_past_due, bins=edges, labels=labels, right=True)
+    grouped = amounts.groupby(buckets, observed=False).agg(["sum", "size"])
+    top = amounts.groupby(documents.loc[outstanding, "party"]).sum().nlargest(5)
+    overdue = float(amounts[days_past_due > 0].sum())
+    weighted_days = float((days_past_due.clip(lower=0) * amounts).sum() / amounts.sum()) if amounts.sum() else 0.0
+    return {
+        "outstanding": round(float(amounts.sum()), 2),
+        "overdue": round(overdue, 2),
+        "open_items": int(outstanding.sum()),
+        "weighted_days_past_due": round(weighted_days, 1),
+        "aging": [
+            {"bucket": label, "amount": round(float(grouped.loc[label, "sum"]), 2), "count": int(grouped.loc[label, "size"])}
+            for label in labels
+        ],
+        f"top_{party_label}s": [{party_label: party, "amount": round(float(value), 2)} for party, value in top.items()],
+    }
+
+
+def _monthly_trend(
+    receivables: pd.DataFrame, payables: pd.DataFrame, cash: pd.DataFrame, as_of: pd.Timestamp
+) -> List[dict]:
+    starts = [frame[column].min() for frame, column in ((receivables, "issued"), (payables, "issued"), (cash, "date"))]
+    starts = [value for value in starts if pd.notna(value)]
+    if not starts:
+        return []
+    months = pd.period_range(min(starts).to_period("M"), as_of.to_period("M"), freq="M")
+
+    ar_issued, ar_balance = _monthly_balances(receivables, months)
+    ap_issued, ap_balance = _monthly_balances(payables, months)
+    cash_months = cash["date"].dt.to_period("M")
+    cash_in = cash["amount"].clip(lower=0).groupby(cash_months).sum().reindex(months, fill_value=0.0)
+    cash_out = (-cash["amount"].clip(upper=0)).groupby(cash_months).sum().reindex(months, fill_value=0.0)
+
+    days = months.days_in_month.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dso = np.where(ar_issued > 0, ar_balance / ar_issued * days, np.nan)
+        dpo = np.where(ap_issued > 0, ap_balance / ap_issued * days, np.nan)
+    ccc = dso - dpo
+
+    trend = []
+    for i, month in enumerate(months):
+        trend.append(
+            {
+                "month": str(month),
+                "sales": round(float(ar_issued[i]), 2),
+                "purchases": round(float(ap_issued[i]), 2),
+                "receivables": round(float(ar_balance[i]), 2),
+                "payables": round(float(ap_balance[i]), 2),
+                "dso": _rounded(dso[i]),
+                "dpo": _rounded(dpo[i]),
+                "cash_conversion_cycle": _rounded(ccc[i]),
+                "cash_in": round(float(cash_in.iloc[i]), 2),
+                "cash_out": round(float(cash_out.iloc[i]), 2),
+            }
+        )
+    return trend
+
+
+def _monthly_balances(documents: pd.DataFrame, months: pd.PeriodIndex):
+    # WHY: month-end balances as a running sum of (issued - settled) per month: one grouped pass over
+    # the documents instead of re-filtering every document for every month.
+    issued_month = documents["issued"].dt.to_period("M")
+    issued = documents["amount"].groupby(issued_month).sum().reindex(months, fill_value=0.0)
+    settled_at = documents["paid"].where(documents["paid"].notna(), documents["issued"])
+    settled = documents["paid_amount"].groupby(settled_at.dt.to_period("M")).sum().reindex(months, fill_value=0.0)
+    # Settlements dated before the first month or after as_of fall outside the reindexed range.
+    balance = (issued - settled).cumsum().clip(lower=0)
+    return issued.to_numpy(dtype=float), balance.to_numpy(dtype=float)
+
+
+def _recommendations(result: dict) -> List[str]:
+    recommendations = []
+    receivables = result["receivables"]
+    if receivables["outstanding"] and receivables["overdue"] / receivables["outstanding"] > 0.3:
+        recommendations.append("Over 30% of receivables are overdue; tighten collections on the oldest invoices.")
+    if result["dso"] is not None and result["dpo"] is not None and result["dso"] > result["dpo"] + 15:
+        recommendations.append("Customers pay much slower than you pay suppliers; negotiate longer supplier terms.")
+    if result["cash_conversion_cycle"] is not None and result["cash_conversion_cycle"] > 60:
+        recommendations.append("Cash conversion cycle exceeds 60 days; consider invoice discounting or a working capital loan.")
+    if not recommendations:
+        recommendations.append("Working capital position is healthy")
+    return recommendations
+
+
+def _dates(frame: pd.DataFrame, candidates: List[str]) -> Optional[pd.Series]:
+    column = _pick(frame, candidates)
+    if column is None:
+        return None
+    return pd.to_datetime(frame[column], errors="coerce").astype("datetime64[ns]")
+
+
+def _pick(frame: pd.DataFrame, candidates: List[str]) -> Optional[str]:
+    for name in candidates:
+        if name in frame.columns:
+            return name
+    return None
+
+
+def _rounded(value: float) -> Optional[float]:
+    return round(float(value), 1) if np.isfinite(value) else None
@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from database import SessionLocal
+from models import AnalysisSession
+from security import get_encryption_manager
+
+
+class SessionStore:
+    # WHY: keep the analysis result and chat history server-side so chat turns send only the new
+    # message. Memory is bounded by entry count and approximate bytes (LRU eviction) plus a sliding
+    # TTL; with persist=True sessions are also written to SQLite and survive eviction or restarts.
+    def __init__(
+        self,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_turns: int = 500,
+        persist: bool = False,
+        purge_every: int = 100,
+    ):
+        self._ttl_seconds = float(ttl_seconds)
+        self._max_entries = max(1, int(max_entries))
+        self._max_bytes = int(max_bytes)
+        self._max_turns = int(max_turns)
+        self._persist = persist
+        self._purge_every = max(1, int(purge_every))
+        self._writes = 0
+        self._items: "OrderedDict[str, dict]" = OrderedDict()
+        self._sizes: dict = {}
+        self._expires: dict = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        # WHY: append_turns is a read-modify-write; two turns on one session must not interleave.
+        # Striped locks bound memory without tracking a lock per session (in-process only).
+        self._turn_locks = [threading.Lock() for _ in range(64)]
+
+    def create(self, analysis: dict) -> str:
+        session_id = uuid.uuid4().hex
+        # WHY: row-level transactions are served via result handles; sessions keep only metrics.
+        metrics = {key: value for key, value in analysis.items() if key != "transactions"}
+        self._save(session_id, {"analysis": metrics, "conversation": []})
+        return session_id
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            self._evict_expired()
+            session = self._items.get(session_id)
+            if session is not None:
+                self._items.move_to_end(session_id)
+                self._expires[session_id] = time.monotonic() + self._ttl_seconds
+                return session
+        if not self._persist:
+            return None
+        session = _load_persisted(session_id)
+        if session is not None:
+            self._cache(session_id, session)
+        return session
+
+    def append_turns(self, session_id: str, turns: List[dict]) -> Optional[dict]:
+        """
+        Append chat turns atomically per session. Blocking when persisted (SQLite write); async
+        callers run it in a threadpool.
+        """
+        with self._turn_locks[hash(session_id) % len(self._turn_locks)]:
+            session = self.get(session_id)
+            if session is None:
+                return None
+            conversation = (session["conversation"] + list(turns))[-self._max_turns:]
+            updated = {**session, "conversation": conversation}
+            self._save(session_id, updated)
+            return updated
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._drop(session_id)
+        if self._persist:
+            _delete_persisted(session_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict_expired()
+            return {"sessions": len(self._items), "bytes": self._total_bytes, "max_bytes": self._max_bytes}
+
+    def _save(self, session_id: str, session: dict) -> None:
+        encoded = self._cache(session_id, session)
+        if self._persist:
+            _persist(session_id, encoded, self._ttl_seconds)
+            # WHY: expired rows are otherwise removed only when looked up again; sweep every Nth
+            # write so abandoned sessions do not pile up in SQLite.
+            with self._lock:
+                self._writes += 1
+                purge = self._writes % self._purge_every == 0
+            if purge:
+                _purge_expired()
+
+    def _cache(self, session_id: str, session: dict) -> str:
+        encoded = json.dumps(session, default=str)
+        with self._lock:
+            self._drop(session_id)
+            self._items[session_id] = session
+            self._sizes[session_id] = len(encoded)
+            self._expires[session_id] = time.monotonic() + self._ttl_seconds
+            self._total_bytes += len(encoded)
+            while len(self._items) > 1 and (
+                len(self._items) > self._max_entries or self._total_bytes > self._max_bytes
+            ):
+                self._drop(next(iter(self._items)))
+        return encoded
+
+    def _drop(self, session_id: str) -> None:
+        if session_id in self._items:
+            del self._items[session_id]
+            self._total_bytes -= self._sizes.pop(session_id, 0)
+            self._expires.pop(session_id, None)
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for session_id in [key for key, expires in self._expires.items() if expires < now]:
+            self._drop(session_id)
+
+
+def _persist(session_id: str, encoded: str, ttl_seconds: float) -> None:
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        row = db.get(AnalysisSession, session_id) or AnalysisSession(id=session_id)
+        row.payload = get_encryption_manager().encrypt(encoded)
+        row.updated_at = now
+        row.expires_at = now + timedelta(seconds=ttl_seconds)
+        db.merge(row)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _load_persisted(session_id: str) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        row = db.get(AnalysisSession, session_id)
+        if row is None:
+            return None
+        if row.expires_at and row.expires_at < datetime.utcnow():
+            db.delete(row)
+            db.commit()
+            return None
+        return json.loads(get_encryption_manager().safe_decrypt(row.payload))
+    finally:
+        db.close()
+
+
+def _delete_persisted(session_id: str) -> None:
+    db = SessionLocal()
+    try:
+        db.query(AnalysisSession).filter(AnalysisSession.id == session_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def _purge_expired() -> None:
+    db = SessionLocal()
+    try:
+        db.query(AnalysisSession).filter(AnalysisSession.expires_at < datetime.utcnow()).delete(
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    global _store
+    if _store is None:
+        _store = SessionStore(
+            ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS") or 3600),
+            max_entries=int(os.getenv("SESSION_MAX_ENTRIES") or 1000),
+            max_bytes=int(os.getenv("SESSION_MAX_BYTES") or 64 * 1024 * 1024),
+            max_turns=int(os.getenv("SESSION_MAX_TURNS") or 500),
+            persist=(os.getenv("SESSION_BACKEND") or "memory").strip().lower() == "sqlite",
+            purge_every=int(os.getenv("SESSION_PURGE_EVERY") or 100),
+        )
+    return _store
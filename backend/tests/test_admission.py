@@ -0,0 +1,53 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from admission import AdmissionController
+from models import Base
+
+
+def test_token_bucket_weights_refill_and_retry_after():
+    controller = AdmissionController(rate_per_second=2.0, burst=20.0)
+    assert controller.cost("/ai-insights") == 10 and controller.cost("/gst/check") == 1
+    assert controller.cost("/health/ai") == 1 and controller.cost("/health/ai", refresh=True) == 10
+    assert controller.cost("/integrations/status") == 0
+
+    assert controller.admit("user:1", 10, now=0.0)[0]
+    assert controller.admit("user:1", 10, now=0.0)[0]
+    allowed, retry_after, _ = controller.admit("user:1", 10, now=1.0)
+    assert not allowed and retry_after == 4.0
+    # Other tenants keep their own full bucket.
+    assert controller.admit("user:2", 10, now=1.0)[0]
+    assert controller.admit("user:1", 10, now=5.0)[0]
+    assert controller.stats()["top_rejected"] == [{"tenant": "user:1", "rejected": 1}]
+
+
+def test_buckets_persist_across_restarts_and_idle_tenants_are_pruned():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    first = AdmissionController(rate_per_second=1.0, burst=10.0, persist=True, session_factory=factory)
+    first.admit("key:abc", 10, now=100.0)
+    assert first.flush() == 1
+
+    restarted = AdmissionController(rate_per_second=1.0, burst=10.0, persist=True, session_factory=factory)
+    allowed, retry_after, _ = restarted.admit("key:abc", 5, now=102.0)
+    assert not allowed and retry_after == 3.0
+
+    small = AdmissionController(rate_per_second=1.0, burst=10.0, max_tenants=2)
+    small.admit("a", 1, now=0.0)
+    small.admit("b", 9, now=50.0)
+    small.admit("c", 1, now=55.0)
+    assert small.stats()["tenants"] == 2 and small.admit("b", 10, now=55.0)[0] is False
+
+
+def test_only_registered_api_keys_get_their_own_bucket():
+    controller = AdmissionController(rate_per_second=1.0, burst=10.0, api_keys=["issued-key"])
+    issued = controller.tenant_for("issued-key", "1.2.3.4")
+    assert issued.startswith("key:") and "issued-key" not in issued
+    assert controller.tenant_for(None, "1.2.3.4") == "ip:1.2.3.4"
+
+    # A client rotating made-up keys stays on its IP bucket and is throttled.
+    outcomes = [controller.admit(controller.tenant_for(f"random-{i}", "5.6.7.8"), 5, now=0.0)[0] for i in range(4)]
+    assert outcomes == [True, True, False, False]
+    assert controller.admit(issued, 10, now=0.0)[0]
@@ -0,0 +1,80 @@
+import ai_insights
+from ai_insights import build_conversation_context, estimate_tokens
+from integrations.llm_api import FakeLLMProvider
+
+
+def _conversation(turns):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "text": f"Turn {i} about cash flow planning. More detail here."}
+        for i in range(turns)
+    ]
+
+
+def test_conversation_context_keeps_recent_turns_and_summarizes_older():
+    context = build_conversation_context(_conversation(10), budget_tokens=500, recent_turns=2)
+
+    assert context.startswith("Summary of earlier conversation:")
+    assert "User asked: Turn 0 about cash flow planning" in context
+    assert context.endswith(
+        "User: Turn 8 about cash flow planning. More detail here.\n"
+        "Assistant: Turn 9 about cash flow planning. More detail here."
+    )
+
+
+def test_conversation_context_respects_budget_for_long_sessions():
+    for turns in (10, 200, 2000):
+        context = build_conversation_context(_conversation(turns), budget_tokens=300)
+        assert estimate_tokens(context) <= 300
+
+
+def test_cached_summary_matches_a_cold_build():
+    conversation = _conversation(120)
+    warm = [build_conversation_context(conversation[:turns], budget_tokens=300) for turns in range(1, 121)]
+    ai_insights._SUMMARY_CACHE.clear()
+    assert build_conversation_context(conversation, budget_tokens=300) == warm[-1]
+    assert len(ai_insights._SUMMARY_CACHE) <= ai_insights._SUMMARY_WINDOW
+
+
+def test_stream_insights_falls_back_when_provider_fails_mid_stream(monkeypatch):
+    provider = FakeLLMProvider(latency_ms=0, error_rate=1.0, response="Partial answer then failure")
+    monkeypatch.setattr(ai_insights, "_get_provider", lambda: provider)
+
+    events = list(ai_insights.stream_insights({"revenue": 100, "risks": []}, [], ai_mode="always"))
+
+    assert [e["event"] for e in events] == ["chunk", "chunk", "fallback", "done"]
+    assert events[0]["data"]["text"] == "Partial "
+    assert events[2]["data"]["text"].startswith("Quick financial summary")
+    assert events[3]["data"]["source"] == "local"
+
+
+def test_health_prober_serves_cached_result_until_refreshed():
+    calls = []
+
+    def _probe():
+        calls.append(1)
+        return {"status": "ok"}
+
+    prober = ai_insights.AIHealthProber(probe=_probe, interval_seconds=0)
+
+    assert prober.current()["status"] == "unknown"
+    assert prober.refresh()["status"] == "ok"
+    cached = prober.current()
+
+    assert cached["status"] == "ok" and cached["age_seconds"] >= 0 and cached["last_latency_ms"] >= 0
+    assert len(calls) == 1
+
+
+def test_batch_insights_parses_answers_and_falls_back_per_item(monkeypatch):
+    provider = FakeLLMProvider(
+        latency_ms=0,
+        response='```json\n[{"id": "a", "insight": "Cut rent."}, {"id": "b", "insight": ""}]\n```',
+    )
+    monkeypatch.setattr(ai_insights, "_get_provider", lambda: provider)
+
+    batch = ai_insights.generate_batch_insights(
+        [{"id": "a", "metrics": {"revenue": 10}}, {"id": "b", "metrics": {"revenue": 20}}]
+    )
+
+    assert batch["results"][0] == {"id": "a", "insights": "Cut rent.", "source": "fake"}
+    assert batch["results"][1]["source"] == "local"
+    assert batch["stats"]["model_calls"] == 1 and batch["stats"]["fallbacks"] == 1
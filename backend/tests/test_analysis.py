@@ -0,0 +1,151 @@
+import pandas as pd
+
+from analysis import (
+    analyze_financials,
+    analyze_financials_with_frame,
+    analyze_normalized_with_frame,
+    iter_transaction_rows,
+    merge_statements,
+    normalize_statement,
+    portfolio_records,
+    score_portfolio,
+)
+from result_store import ResultStore
+
+
+def _signed_df():
+    return pd.DataFrame(
+        [
+            {"description": "Sales Invoice", "amount": 25000},
+            {"description": "Office Rent", "amount": -8000},
+            {"description": "Utilities", "amount": -1200},
+        ]
+    )
+
+
+def test_summary_mode_matches_full_analysis():
+    full = analyze_financials(_signed_df())
+    summary, frame = analyze_financials_with_frame(_signed_df(), include_transactions=False)
+
+    assert "transactions" not in summary
+    assert summary["transaction_count"] == 3
+    assert {k: v for k, v in full.items() if k != "transactions"} == {
+        k: v for k, v in summary.items() if k != "transaction_count"
+    }
+    assert list(iter_transaction_rows(frame)) == full["transactions"]
+    assert list(iter_transaction_rows(frame, start=1, stop=2, chunk_size=1)) == full["transactions"][1:2]
+
+
+def test_result_store_evicts_oldest_entry():
+    store = ResultStore(max_entries=1)
+    first = store.put(pd.DataFrame())
+    second = store.put(pd.DataFrame())
+
+    assert store.get(first) is None
+    assert store.get(second) is not None
+
+
+def test_result_store_is_bounded_by_frame_bytes():
+    frame = pd.DataFrame({"description": ["Sales invoice"] * 1000, "amount": [1.0] * 1000})
+    size = int(frame.memory_usage(deep=True).sum())
+    store = ResultStore(max_bytes=size * 2)
+    first, second, third = (store.put(frame.copy()) for _ in range(3))
+
+    assert store.get(first) is None
+    assert store.get(second) is not None and store.get(third) is not None
+    assert store.stats()["bytes"] == size * 2
+
+
+def test_period_metrics_groups_by_month_with_rolling_window():
+    df = pd.DataFrame(
+        [
+            {"date": "2025-01-05", "description": "Sales", "amount": 1000},
+            {"date": "2025-01-20", "description": "Rent", "amount": -400},
+            {"date": "2025-03-02", "description": "Sales", "amount": 500},
+            {"date": "not a date", "description": "Misc", "amount": -50},
+        ]
+    )
+
+    result = analyze_financials(df, period="month", rolling_window=2)
+    metrics = result["period_metrics"]
+
+    assert metrics["undated_rows"] == 1
+    assert [p["period"] for p in metrics["periods"]] == ["2025-01", "2025-02", "2025-03"]
+    january, february, march = metrics["periods"]
+    assert (january["revenue"], january["expenses"], january["profit_margin"]) == (1000.0, 400.0, 60.0)
+    assert january["health_score"] == 100
+    assert february["transaction_count"] == 0 and february["health_score"] == 25
+    assert march["rolling"]["revenue"] == 500.0 and march["rolling"]["expenses"] == 0.0
+
+
+def test_period_metrics_reads_day_first_dates_and_drops_outlier_years():
+    df = pd.DataFrame(
+        [
+            {"date": "05/01/2025", "description": "Sales", "amount": 1000},
+            {"date": "20/01/2025", "description": "Rent", "amount": -400},
+            {"date": "02/03/2025", "description": "Sales", "amount": 500},
+            {"date": "02/03/1900", "description": "Misc", "amount": -50},
+        ]
+    )
+
+    metrics = analyze_financials(df, period="month")["period_metrics"]
+
+    assert [p["period"] for p in metrics["periods"]] == ["2025-01", "2025-02", "2025-03"]
+    assert metrics["out_of_range_rows"] == 1 and metrics["undated_rows"] == 0
+
+
+def test_score_portfolio_matches_scalar_analysis():
+    businesses = [
+        (25000, 9200),
+        (1000, 960),
+        (0, 500),
+        (0, 0),
+        (1000, 1200),
+        (1000, 880),
+        (1000, 940),
+    ]
+    scored = score_portfolio(
+        {
+            "business_id": list(range(len(businesses))),
+            "revenue": [b[0] for b in businesses],
+            "expenses": [b[1] for b in businesses],
+        }
+    )
+    records = portfolio_records(scored)
+
+    for record, (revenue, expenses) in zip(records, businesses):
+        expected = analyze_financials(
+            pd.DataFrame({"credit": [revenue], "debit": [expenses]}), include_transactions=False
+        )
+        for key in ("profit_margin", "cash_flow", "health_score", "creditworthiness", "risks", "recommended_products"):
+            assert record[key] == expected[key]
+
+
+def test_merge_statements_drops_overlap_and_internal_transfers():
+    current = pd.DataFrame(
+        {
+            "date": ["2025-01-05", "2025-01-05", "2025-01-06", "2025-01-07"],
+            "description": ["Coffee", "Coffee", "Transfer to savings", "Sales Invoice"],
+            "amount": [-5, -5, -1000, 4000],
+        }
+    )
+    savings = pd.DataFrame(
+        {
+            "txn_date": ["05/01/2025", "06/01/2025", "07/01/2025"],
+            "description": ["coffee", "Transfer from current", "Interest"],
+            "credit": [0, 1000, 12],
+            "debit": [5, 0, 0],
+        }
+    )
+    savings["txn_date"] = pd.to_datetime(savings["txn_date"], dayfirst=True)
+
+    merged = merge_statements([normalize_statement(current, "current.csv"), normalize_statement(savings, "savings.csv")])
+
+    assert merged["source_format"] == "mixed"
+    # The savings file repeats one of the two same-day coffees; the other is a real second purchase.
+    assert merged["duplicates_removed"] == 1
+    assert merged["transfers_removed"] == 2
+    assert sorted(merged["data"]["description"]) == ["Coffee", "Coffee", "Interest", "Sales Invoice"]
+
+    result, _ = analyze_normalized_with_frame(merged, include_transactions=False)
+    assert (result["revenue"], result["expenses"]) == (4012.0, 10.0)
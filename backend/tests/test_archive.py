@@ -0,0 +1,39 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+from cryptography.fernet import Fernet
+
+from archive import TransactionArchive
+from security import EncryptionManager
+
+
+def _ledger():
+    return pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "date": ["2025-01-05", "2025-01-20", "2025-02-03", "2025-03-01"],
+            "description": ["Sales", "Rent", "Sales", "Open month"],
+            "amount": [1000.0, -400.0, 700.0, -50.0],
+            "category": ["Income", "Rent", "Income", None],
+        }
+    )
+
+
+@pytest.mark.parametrize("encrypted", [False, True])
+def test_archive_writes_closed_months_and_projects_columns(tmp_path, encrypted):
+    key = Fernet.generate_key().decode("utf-8") if encrypted else None
+    archive = TransactionArchive(str(tmp_path), EncryptionManager(key))
+
+    assert archive.archive_closed_months(7, _ledger(), as_of="2025-03-15") == ["2025-01", "2025-02"]
+    assert archive.months(7) == ["2025-01", "2025-02"]
+    suffix = ".arrow.enc" if encrypted else ".arrow"
+    assert sorted(os.listdir(tmp_path / "user=7")) == [f"month=2025-01{suffix}", f"month=2025-02{suffix}"]
+
+    projected = archive.read(7, columns=["description", "amount"], start_month="2025-02")
+    assert list(projected.columns) == ["description", "amount"]
+    assert projected.to_dict("records") == [{"description": "Sales", "amount": 700.0}]
+    assert archive.read(7)["id"].tolist() == [1, 2, 3]
+    assert archive.read(8).empty
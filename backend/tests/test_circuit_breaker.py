@@ -0,0 +1,36 @@
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_opens_then_lets_one_probe_through():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30, clock=clock)
+
+    breaker.record_failure("boom")
+    breaker.record_failure("boom")
+    assert breaker.snapshot()["state"] == OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 31
+    assert breaker.allow_request()
+    assert breaker.snapshot()["state"] == HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success(latency_ms=100)
+    assert breaker.snapshot()["state"] == CLOSED
+    assert breaker.allow_request()
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_ms=500, clock=_Clock())
+
+    breaker.record_success(latency_ms=900)
+
+    assert breaker.snapshot()["state"] == OPEN
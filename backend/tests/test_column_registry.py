@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+import column_registry
+from analysis import header_signature
+from column_registry import ColumnMappingRegistry, build_confirmed_mapping, parse_with_registry
+
+ODD = b"Value Dt,Narration,Txn Amt,Dr/Cr,Branch\n2025-01-05,Sales,100,Cr,X\n2025-01-06,Rent,40,Dr,Y\n"
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ColumnMappingRegistry(persist=False)
+    monkeypatch.setattr(column_registry, "_registry", registry)
+    return registry
+
+
+def test_detected_layout_is_learned_then_reused(registry):
+    csv = b"date,description,amount,notes\n2025-01-05,Sales,100,a\n2025-01-06,Rent,-40,b\n"
+
+    _, first, layout = parse_with_registry(io.BytesIO(csv))
+    assert layout["mapping"] == "learned"
+    df, second, layout = parse_with_registry(io.BytesIO(csv))
+    assert layout["mapping"] == "reused"
+    # The stored mapping reads only the mapped columns, with pinned dtypes.
+    assert sorted(df.columns) == ["amount", "date", "description"]
+    assert second["data"][["cash_in", "cash_out"]].values.tolist() == first["data"][["cash_in", "cash_out"]].values.tolist()
+
+
+def test_confirmed_mapping_resolves_nonstandard_headers(registry):
+    _, normalized, layout = parse_with_registry(io.BytesIO(ODD))
+    assert normalized["status"] == "clarification_needed"
+
+    mapping = build_confirmed_mapping(
+        layout["headers"], {"amount": "Txn Amt", "type": "Dr/Cr", "description": "Narration", "date": "Value Dt"}
+    )
+    with pytest.raises(ValueError):
+        registry.put(header_signature(layout["headers"]), mapping, confirmed=True)
+    registry.put(header_signature(layout["headers"]), mapping, user_id=7, confirmed=True)
+    # Another caller's uploads with the same header are not remapped by user 7's confirmation.
+    assert parse_with_registry(io.BytesIO(ODD))[1]["status"] == "clarification_needed"
+    df, normalized, layout = parse_with_registry(io.BytesIO(ODD), user_id=7)
+
+    assert layout["mapping"] == "reused" and "Branch" not in df.columns
+    assert normalized["source_format"] == "amount+type"
+    assert normalized["data"]["cash_in"].tolist() == [100, 0] and normalized["data"]["cash_out"].tolist() == [0, 40]
+    with pytest.raises(ValueError):
+        build_confirmed_mapping(layout["headers"], {"type": "Dr/Cr"})
@@ -0,0 +1,41 @@
+import gzip
+import io
+import zipfile
+
+import pytest
+
+from ingestion import IngestionError, ingest_upload
+
+CSV = b"date,description,amount\n" + b"2025-01-05,Sales,100\n" * 50
+
+
+def _zip(payload: bytes, name: str = "statement.csv") -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(name, payload)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "payload,filename,compression",
+    [(CSV, "s.csv", "none"), (gzip.compress(CSV), "s.csv.gz", "gzip"), (_zip(CSV), "s.zip", "zip")],
+)
+def test_ingest_upload_decompresses_and_spools(payload, filename, compression):
+    spooled, info = ingest_upload(io.BytesIO(payload), filename, spool_threshold=256)
+
+    assert spooled.read() == CSV
+    assert info == {"compression": compression, "bytes": len(CSV), "lines": 51, "spooled_to_disk": True}
+
+
+def test_ingest_upload_rejects_over_limit_before_parsing():
+    with pytest.raises(IngestionError) as too_big:
+        ingest_upload(io.BytesIO(gzip.compress(b"x" * 10_000)), "bomb.csv.gz", max_bytes=1000)
+    assert too_big.value.status_code == 413
+
+    with pytest.raises(IngestionError) as too_many_rows:
+        ingest_upload(io.BytesIO(CSV), "s.csv", max_rows=10)
+    assert too_many_rows.value.status_code == 413
+
+    with pytest.raises(IngestionError) as corrupt:
+        ingest_upload(io.BytesIO(b"\x1f\x8b not gzip"), "s.csv.gz")
+    assert corrupt.value.status_code == 400
@@ -0,0 +1,77 @@
+import threading
+import tracemalloc
+
+import pytest
+
+from instrumentation import MemoryBudgetExceeded, MemoryProfiler
+
+
+@pytest.fixture(autouse=True)
+def _stop_tracing():
+    yield
+    tracemalloc.stop()
+
+
+def test_memory_profiler_records_stages_and_enforces_budget():
+    profiler = MemoryProfiler(budget_bytes=4 * 1024 * 1024)
+
+    with profiler.request("upload") as scope:
+        with profiler.stage("parse"):
+            small = bytearray(1024 * 1024)
+        with pytest.raises(MemoryBudgetExceeded) as excinfo:
+            with profiler.stage("rows"):
+                large = bytearray(8 * 1024 * 1024)
+        del small, large
+
+    assert excinfo.value.stage == "rows" and scope.exceeded is excinfo.value
+    assert scope.stages["parse"] < scope.stages["rows"]
+    summary = profiler.summary()
+    assert set(summary) == {"upload", "upload.parse", "upload.rows"}
+    assert summary["upload.rows"]["max_mb"] >= 8
+
+
+def test_budget_caps_concurrent_scopes_and_rejects_the_newest():
+    profiler = MemoryProfiler(budget_bytes=4 * 1024 * 1024)
+    entered, allocate, allocated, release = (threading.Event() for _ in range(4))
+    outcome = {}
+
+    def _job():
+        with profiler.request("job") as scope:
+            with profiler.stage("parse"):
+                held = bytearray(3 * 1024 * 1024)
+            entered.set()
+            allocate.wait(5)
+            with profiler.stage("rows"):
+                spike = bytearray(3 * 1024 * 1024)
+                del spike
+            allocated.set()
+            release.wait(5)
+            del held
+        outcome["job"] = scope
+
+    worker = threading.Thread(target=_job)
+    worker.start()
+    entered.wait(5)
+    try:
+        with profiler.request("upload") as scope:
+            with profiler.stage("parse"):
+                bytearray(1024)
+            # The older job pushes the process over budget; the newest admission is the one refused.
+            allocate.set()
+            allocated.wait(5)
+            with pytest.raises(MemoryBudgetExceeded):
+                with profiler.stage("rows"):
+                    bytearray(1024)
+    finally:
+        allocate.set()
+        release.set()
+        worker.join()
+    assert scope.shared and scope.exceeded is not None
+    assert outcome["job"].exceeded is None and outcome["job"].peak_bytes > 4 * 1024 * 1024
+
+
+def test_stages_outside_a_profiled_request_are_noops():
+    profiler = MemoryProfiler(enabled=False)
+    with profiler.request("upload") as scope, profiler.stage("parse"):
+        bytearray(1024)
+    assert scope is None and profiler.summary() == {}
@@ -0,0 +1,51 @@
+import time
+
+from integrations import registry
+from integrations.llm_api import FakeLLMProvider, HedgedLLMProvider
+
+
+def test_fake_provider_is_deterministic_with_seed():
+    first = FakeLLMProvider(latency_ms=0, error_rate=0.5, seed=3)
+    second = FakeLLMProvider(latency_ms=0, error_rate=0.5, seed=3)
+
+    def outcomes(provider):
+        results = []
+        for _ in range(20):
+            try:
+                results.append(provider.generate("prompt"))
+            except RuntimeError:
+                results.append("error")
+        return results
+
+    assert outcomes(first) == outcomes(second)
+    assert "error" in outcomes(first)
+
+
+def test_hedged_provider_returns_secondary_when_primary_is_slow():
+    primary = FakeLLMProvider(latency_ms=500, response="primary")
+    secondary = FakeLLMProvider(latency_ms=10, response="secondary")
+    hedged = HedgedLLMProvider(primary, secondary, initial_delay_ms=20)
+
+    started = time.perf_counter()
+    answer = hedged.generate("prompt")
+
+    assert answer == "secondary"
+    assert time.perf_counter() - started < 0.4
+    assert hedged.stats()["hedges_fired"] == 1 and hedged.stats()["hedge_wins"] == 1
+
+
+def test_config_change_replaces_and_closes_the_hedged_provider(monkeypatch):
+    monkeypatch.setattr(registry, "_llm_providers", {})
+    monkeypatch.setenv("AI_PROVIDER", "fake")
+    monkeypatch.setenv("AI_SECONDARY_PROVIDER", "fake")
+    monkeypatch.setenv("AI_FAKE_LATENCY_MS", "0")
+    first = registry.get_llm_provider()
+    assert isinstance(first, HedgedLLMProvider) and registry.get_llm_provider() is first
+
+    monkeypatch.setenv("AI_HEDGE_PERCENTILE", "90")
+    second = registry.get_llm_provider()
+    assert second is not first and list(registry._llm_providers.values()) == [second]
+    assert first._executor._shutdown
+    # A caller still holding the replaced provider gets an unhedged answer instead of an error.
+    assert first.generate("prompt").startswith("Fake insight")
+    second.close()
@@ -0,0 +1,88 @@
+import io
+
+from cryptography.fernet import Fernet
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from jobs import JobQueue
+from models import AnalysisJob, Base
+from security import EncryptionManager
+
+
+def _queue(tmp_path, **kwargs) -> JobQueue:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    queue = JobQueue(session_factory=sessionmaker(bind=engine), input_dir=str(tmp_path), **kwargs)
+
+    def _count_lines(params, input_path, progress):
+        progress(0.5, "count")
+        with open(input_path, "rb") as handle:
+            return 200, {"lines": handle.read().count(b"\n") * params["scale"]}
+
+    queue.register("count", _count_lines)
+    queue.register("fail", lambda params, input_path, progress: (422, {"status": "error", "message": "bad input"}))
+    return queue
+
+
+def test_jobs_run_store_results_and_clean_up_input(tmp_path):
+    queue = _queue(tmp_path)
+    job = queue.submit("count", "acme", {"scale": 2}, io.BytesIO(b"a\nb\nc\n"))
+    failing = queue.submit("fail", "acme")
+    assert job["status"] == "queued" and queue.result(job["job_id"]) is None
+
+    assert queue.run_pending() == 2
+    assert queue.result(job["job_id"]) == (200, {"lines": 6})
+    assert queue.get(job["job_id"])["status"] == "succeeded"
+    assert queue.get(failing["job_id"])["error"] == "bad input"
+    assert queue.result(failing["job_id"])[0] == 422
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_claims_respect_tenant_cap_and_stale_jobs_are_requeued(tmp_path):
+    queue = _queue(tmp_path, per_tenant_limit=1, stale_seconds=-1, max_attempts=2)
+    first = queue.submit("fail", "busy")
+    queue.submit("fail", "busy")
+    other = queue.submit("fail", "quiet")
+
+    claimed = queue._claim()
+    assert claimed["id"] == first["job_id"]
+    # The second "busy" job waits for its tenant's slot; the other tenant goes ahead.
+    assert queue._claim()["id"] == other["job_id"]
+    assert queue._claim() is None
+
+    # A worker that stopped heartbeating loses its jobs, and its late result is discarded.
+    queue.requeue_stale()
+    assert queue.get(first["job_id"])["status"] == "queued"
+    queue._execute(claimed)
+    assert queue.get(first["job_id"])["status"] == "queued"
+
+    queue._claim()
+    queue.requeue_stale()
+    assert queue.get(first["job_id"])["status"] == "failed"
+
+
+def test_params_inputs_and_results_are_encrypted_at_rest(tmp_path):
+    queue = _queue(tmp_path, encryption=EncryptionManager(Fernet.generate_key().decode()))
+    job = queue.submit("count", "acme", {"scale": 3, "businesses": "revenue-secret"}, io.BytesIO(b"a\nb\n"))
+
+    db = queue._session_factory()
+    try:
+        stored = db.get(AnalysisJob, job["job_id"])
+        assert "revenue-secret" not in stored.params and stored.input_path.endswith(".enc")
+    finally:
+        db.close()
+    assert queue.run_pending() == 1
+    assert queue.result(job["job_id"]) == (200, {"lines": 6})
+
+
+def test_encrypted_streams_round_trip_across_chunks():
+    manager = EncryptionManager(Fernet.generate_key().decode())
+    payload = b"date,amount\n" + b"2025-01-05,100\n" * 1000
+    encrypted, restored = io.BytesIO(), io.BytesIO()
+
+    manager.encrypt_stream(io.BytesIO(payload), encrypted, chunk_size=4096)
+    assert payload[:64] not in encrypted.getvalue()
+    encrypted.seek(0)
+    manager.decrypt_stream(encrypted, restored)
+    assert restored.getvalue() == payload
@@ -0,0 +1,67 @@
+import io
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from analysis import analyze_financials
+from ingestion import IngestionError, ingest_upload
+from readers import detect_format, read_table
+
+FRAME = pd.DataFrame(
+    {
+        "date": ["2025-01-05", "2025-01-06", "2025-01-07"],
+        "description": ["Sales Invoice", "Office Rent", "Utilities"],
+        "amount": [25000.0, -8000.0, -1200.0],
+    }
+)
+
+
+def _encoded(file_format: str) -> io.BytesIO:
+    buffer = io.BytesIO()
+    if file_format == "csv":
+        buffer.write(FRAME.to_csv(index=False).encode("utf-8"))
+    elif file_format == "xlsx":
+        FRAME.to_excel(buffer, index=False)
+    else:
+        FRAME.to_parquet(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.parametrize("file_format", ["csv", "xlsx", "parquet"])
+def test_read_table_detects_format_and_feeds_normalization(file_format):
+    df, info = read_table(_encoded(file_format))
+
+    assert info["file_format"] == file_format
+    result = analyze_financials(df, include_transactions=False)
+    assert (result["revenue"], result["expenses"]) == (25000.0, 9200.0)
+
+
+def test_read_table_falls_back_and_enforces_limits():
+    ragged = io.BytesIO(b"description,amount\nSales,100\nRent\n")
+    with pytest.raises(IngestionError):
+        read_table(io.BytesIO(ragged.getvalue()), engine="pyarrow")
+    _, info = read_table(ragged)
+    assert info["engine"] == "pandas"
+
+    with pytest.raises(IngestionError) as too_many:
+        read_table(_encoded("parquet"), max_rows=2)
+    assert too_many.value.status_code == 413
+    with pytest.raises(IngestionError):
+        detect_format(io.BytesIO(b"\xd0\xcf\x11\xe0legacy"))
+
+    with pytest.raises(IngestionError) as long_sheet:
+        read_table(_encoded("xlsx"), max_rows=2)
+    assert long_sheet.value.status_code == 413
+
+
+def test_ingest_upload_bounds_the_expanded_size_of_xlsx():
+    workbook = _encoded("xlsx").getvalue()
+    with pytest.raises(IngestionError) as too_big:
+        ingest_upload(io.BytesIO(workbook), "statement.xlsx", max_bytes=len(workbook))
+    assert too_big.value.status_code == 413
+
+    spooled, info = ingest_upload(io.BytesIO(workbook), "statement.xlsx")
+    assert spooled.read() == workbook and info["compression"] == "none"
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, Transaction
+from services.search_service import ensure_transaction_search_index, search_transactions
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    assert ensure_transaction_search_index(engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_search_prefix_filters_and_cursor_pagination():
+    db = _session()
+    db.add_all(
+        [
+            Transaction(description="UPI Acme Traders invoice", amount=-500, date=datetime(2025, 1, 5), user_id=1),
+            Transaction(description="Acme Traders refund", amount=200, date=datetime(2025, 2, 5), user_id=1),
+            Transaction(description="ACME traders monthly", amount=-900, date=datetime(2025, 3, 5), user_id=1),
+            Transaction(description="Office Rent", amount=-8000, date=datetime(2025, 3, 6), user_id=1),
+            Transaction(description="Acme Traders", amount=-100, date=datetime(2025, 3, 7), user_id=2),
+        ]
+    )
+    db.commit()
+
+    first = search_transactions(db, "acm trad", user_id=1, limit=2)
+    assert [row["description"] for row in first["items"]] == ["ACME traders monthly", "Acme Traders refund"]
+    second = search_transactions(db, "acm trad", user_id=1, cursor=int(first["next_cursor"]), limit=2)
+    assert [row["description"] for row in second["items"]] == ["UPI Acme Traders invoice"]
+    assert second["next_cursor"] is None
+
+    filtered = search_transactions(
+        db, "acme", user_id=1, max_amount=0, start_date=datetime(2025, 2, 1), end_date=datetime(2025, 12, 31)
+    )
+    assert [row["amount"] for row in filtered["items"]] == [-900]
+
+    # Triggers keep the index in sync with updates and deletes.
+    rent = db.query(Transaction).filter(Transaction.description == "Office Rent").one()
+    rent.description = "Acme office rent"
+    db.commit()
+    assert len(search_transactions(db, "acme", user_id=1)["items"]) == 4
+    db.delete(rent)
+    db.commit()
+    assert len(search_transactions(db, "office", user_id=1)["items"]) == 0
+    assert [row["user_id"] for row in search_transactions(db, "acme", user_id=2)["items"]] == [2]
+    with pytest.raises(ValueError):
+        search_transactions(db, "acme", user_id=None)
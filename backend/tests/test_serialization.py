@@ -0,0 +1,29 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from serialization import dumps
+
+
+def test_dumps_handles_numpy_pandas_and_datetimes():
+    payload = {
+        "count": np.int64(3),
+        "ratio": np.float32(0.5),
+        "missing": np.float64("nan"),
+        "flag": np.bool_(True),
+        "values": np.array([1, 2]),
+        "at": pd.Timestamp("2025-01-05 10:00:00"),
+        "created_at": datetime(2025, 1, 5, 10, 0, 0),
+    }
+
+    assert json.loads(dumps(payload)) == {
+        "count": 3,
+        "ratio": 0.5,
+        "missing": None,
+        "flag": True,
+        "values": [1, 2],
+        "at": "2025-01-05T10:00:00",
+        "created_at": "2025-01-05T10:00:00",
+    }
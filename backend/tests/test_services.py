@@ -1,9 +1,13 @@
+import numpy as np
 import pandas as pd
+import pytest
 
 from services.bookkeeping_services import categorize_transactions
-from services.forecasting_service import forecast_financials
+from services.forecasting_service import forecast_financials, simulate_runway
 from services.gst_compliance_service import check_gst_compliance
-from services.working_capital_service import working_capital_analysis
+from services.working_capital_service import working_capital_analysis, working_capital_metrics
+from services.anomaly_service import AnomalyDetector, detect_anomalies_batch
+from services.rollup_service import category_rollup
 
 
 def test_categorize_transactions():
@@ -46,3 +50,103 @@ def test_working_capital_analysis():
         == "Improve collections or consider short-term working capital loan"
     )
     assert working_capital_analysis(0) == "Working capital position is healthy"
+
+
+def test_anomaly_detector_streaming_matches_batch():
+    rows = [{"description": f"Acme Traders {i}", "amount": -1000 - (i % 5) * 10} for i in range(20)]
+    rows.append({"description": "Acme Traders 99", "amount": -25000})
+    df = pd.DataFrame(rows)
+
+    detector = AnomalyDetector()
+    streamed = [detector.update(row["description"], row["amount"]) for row in rows]
+    batch = detect_anomalies_batch(df)
+
+    assert [r["is_anomaly"] for r in streamed] == batch["is_anomaly"].tolist()
+    assert streamed[-1]["is_anomaly"] and not any(r["is_anomaly"] for r in streamed[:-1])
+    assert streamed[-1]["counterparty"] == "acme traders"
+
+
+def test_anomaly_batch_matches_streaming_on_large_amounts():
+    rng = np.random.default_rng(3)
+    amounts = 1e9 + rng.normal(0, 1, 300)
+    amounts[150] += 60
+    amounts[250] -= 40
+    df = pd.DataFrame({"description": "Acme Traders", "amount": -amounts})
+
+    detector = AnomalyDetector()
+    streamed = [detector.update(row.description, row.amount) for row in df.itertuples()]
+    batch = detect_anomalies_batch(df)
+
+    assert [r["is_anomaly"] for r in streamed] == batch["is_anomaly"].tolist()
+    assert {150, 250} <= set(batch.index[batch["is_anomaly"]])
+    assert batch.loc[150, "amount_z_counterparty"] == pytest.approx(streamed[150]["amount_z_counterparty"], rel=1e-3)
+
+
+def test_working_capital_metrics_aging_and_cycle():
+    invoices = [
+        {"invoice_date": "2025-01-01", "due_date": "2025-01-31", "amount": 1000, "paid_date": "2025-02-10", "customer": "A"},
+        {"invoice_date": "2025-02-01", "due_date": "2025-03-03", "amount": 600, "customer": "B"},
+        {"invoice_date": "2025-03-10", "amount": 400, "paid_amount": 100, "customer": "A"},
+    ]
+    bills = [{"bill_date": "2025-01-15", "amount": 900, "paid_date": "2025-03-01", "vendor": "V"}]
+
+    result = working_capital_metrics(invoices, bills, as_of="2025-03-31", period_days=90)
+
+    receivables = result["receivables"]
+    assert receivables["outstanding"] == 900.0
+    aging = {bucket["bucket"]: bucket["amount"] for bucket in receivables["aging"]}
+    # B is 28 days past due; the March invoice (due by default 30 days after issue) is current.
+    assert aging == {"current": 300.0, "1-30": 600.0, "31-60": 0.0, "61-90": 0.0, "90+": 0.0}
+    assert result["dso"] == round(900 / 2000 * 90, 1)
+    assert result["dpo"] == 0.0 and result["cash_conversion_cycle"] == result["dso"]
+    assert [m["receivables"] for m in result["trend"]] == [1000.0, 600.0, 900.0]
+
+
+def test_simulate_runway_is_seeded_and_consistent():
+    # Steady 1000/month burn (with one month of zero activity) against a 2500 balance.
+    df = pd.DataFrame(
+        {
+            "date": ["2025-01-10", "2025-01-20", "2025-02-10", "2025-04-10"],
+            "amount": [2000, -3000, -1000, -1000],
+        }
+    )
+
+    first = simulate_runway(df, starting_balance=2500, horizon_months=6, paths=5000, seed=7)
+    assert first == simulate_runway(df, starting_balance=2500, horizon_months=6, paths=5000, seed=7)
+
+    assert first["history_months"] == 4
+    curve = [point["probability"] for point in first["shortfall_curve"]]
+    assert curve == sorted(curve) and curve[-1] == first["probability_of_shortfall"]
+    assert first["runway_quantiles"]["p10"] <= first["runway_quantiles"]["p50"]
+
+    steady = pd.DataFrame({"date": ["2025-01-01", "2025-02-01", "2025-03-01"], "amount": [-1000] * 3})
+    certain = simulate_runway(steady, starting_balance=5500, horizon_months=12, paths=100, seed=1)
+    assert certain["runway_quantiles"]["p10"] == certain["runway_quantiles"]["p90"] == 6
+    assert simulate_runway(steady, starting_balance=5500, horizon_months=3, paths=100, seed=1)["runway_quantiles"]["p50"] is None
+
+
+def test_category_rollup_totals_deltas_and_suggestions():
+    rows = []
+    for month, acme in (("2025-01", 400), ("2025-02", 400), ("2025-03", 900)):
+        rows += [
+            {"date": f"{month}-05", "description": "Office Rent", "amount": -1000},
+            {"date": f"{month}-06", "description": "UPI/ZOOM VIDEO/991", "amount": -50},
+            {"date": f"{month}-07", "description": "Acme Traders 12", "amount": -acme},
+            {"date": f"{month}-08", "description": "Client payment", "amount": 3000, "category": "Sales"},
+        ]
+
+    result = category_rollup(pd.DataFrame(rows), top_n=2, config={"category_spike_min_amount": 100})
+
+    assert result["total_spend"] == 4850 and result["total_inflow"] == 9000
+    categories = {item["category"]: item for item in result["categories"]}
+    assert categories["Sales"]["inflow"] == 9000
+    assert categories["Other Expense"]["mom_change"] == 500
+    assert categories["Rent"]["share_of_spend"] == round(3000 / 4850 * 100, 2)
+    assert [vendor["counterparty"] for vendor in result["top_vendors"]] == ["office rent", "acme traders"]
+    assert result["vendor_count"] == 3
+    suggestions = {(item["type"], item["target"]) for item in result["suggestions"]}
+    assert ("category_spike", "Other Expense") in suggestions
+    assert ("vendor_concentration", "acme traders") in suggestions
+    assert ("recurring_charge", "upi zoom video") in suggestions
+    # Rent recurs and dominates spend by nature; it gets no vendor advice.
+    assert all(target != "office rent" for _, target in suggestions)
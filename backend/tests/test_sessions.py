@@ -0,0 +1,79 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sessions
+from models import AnalysisSession, Base
+from sessions import SessionStore
+
+
+def test_session_store_keeps_metrics_and_appends_turns():
+    store = SessionStore()
+    session_id = store.create({"revenue": 100.0, "transactions": [{"amount": 1}]})
+
+    store.append_turns(session_id, [{"role": "user", "text": "hi"}, {"role": "assistant", "text": "hello"}])
+    session = store.get(session_id)
+
+    assert session["analysis"] == {"revenue": 100.0}
+    assert [turn["text"] for turn in session["conversation"]] == ["hi", "hello"]
+
+
+def test_session_store_is_memory_bounded():
+    store = SessionStore(max_bytes=200)
+    first = store.create({"notes": "x" * 120})
+    second = store.create({"notes": "y" * 120})
+
+    assert store.get(first) is None
+    assert store.get(second) is not None
+    assert store.stats()["bytes"] <= 200
+
+
+def test_concurrent_turns_on_one_session_are_not_lost():
+    store = SessionStore()
+    session_id = store.create({"revenue": 100.0})
+    original_get = store.get
+    barrier = threading.Barrier(8)
+
+    def slow_get(key):
+        # Widen the read-modify-write window so unsynchronized appends would overwrite each other.
+        session = original_get(key)
+        threading.Event().wait(0.01)
+        return session
+
+    store.get = slow_get
+
+    def append(index):
+        barrier.wait()
+        store.append_turns(session_id, [{"role": "user", "text": f"turn {index}"}])
+
+    threads = [threading.Thread(target=append, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    texts = sorted(turn["text"] for turn in original_get(session_id)["conversation"])
+    assert texts == sorted(f"turn {index}" for index in range(8))
+
+
+def test_persisted_writes_periodically_purge_expired_rows(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(sessions, "SessionLocal", factory)
+    store = SessionStore(persist=True, purge_every=2)
+
+    abandoned = store.create({"revenue": 1.0})
+    db = factory()
+    db.get(AnalysisSession, abandoned).expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    db.close()
+    store.create({"revenue": 2.0})
+
+    db = factory()
+    try:
+        assert db.get(AnalysisSession, abandoned) is None and db.query(AnalysisSession).count() == 1
+    finally:
+        db.close()